@@ -17,6 +17,14 @@ class ComplianceAgent(BaseAgent):
     合规Agent
     """
 
+    TASK_HANDLERS = {
+        "policy_check": ("check_policies", "平台政策检查", {"platform": "str", "market": "str", "content": "dict"}),
+        "risk_assessment": ("assess_risk", "风险评估", {"entity": "str", "entity_id": "str", "market": "str"}),
+        "content_review": ("review_content", "内容审核", {"content": "dict", "content_type": "str", "market": "str"}),
+        "regulation_monitoring": ("monitor_regulations", "法规监控", {"market": "str", "category": "str"}),
+        "compliance_report": ("generate_compliance_report", "合规报告", {"period": "str", "market": "str"})
+    }
+
     def __init__(self, agent_id: str = "compliance", config: Optional[Dict] = None):
         super().__init__(
             agent_id=agent_id,
@@ -42,18 +50,7 @@ class ComplianceAgent(BaseAgent):
         self.status = "busy"
         
         try:
-            if task_type == "policy_check":
-                result = await self.check_policies(task.get("parameters", {}))
-            elif task_type == "risk_assessment":
-                result = await self.assess_risk(task.get("parameters", {}))
-            elif task_type == "content_review":
-                result = await self.review_content(task.get("parameters", {}))
-            elif task_type == "regulation_monitoring":
-                result = await self.monitor_regulations(task.get("parameters", {}))
-            elif task_type == "compliance_report":
-                result = await self.generate_compliance_report(task.get("parameters", {}))
-            else:
-                result = {"error": f"Unknown task type: {task_type}"}
+            result = await self.dispatch_task(task_type, task.get("parameters", {}))
             
             self.status = "ready"
             return result
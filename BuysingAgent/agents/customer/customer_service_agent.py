@@ -17,6 +17,15 @@ class CustomerServiceAgent(BaseAgent):
     客服Agent
     """
 
+    TASK_HANDLERS = {
+        "message_response": ("respond_to_message", "客户消息回复", {"customer_id": "str", "message": "str", "language": "str", "platform": "str"}),
+        "image_analysis": ("analyze_image", "图片问题分析", {"image_url": "str", "customer_id": "str", "issue_type": "str"}),
+        "issue_resolution": ("resolve_issue", "问题处理", {"issue_id": "str", "customer_id": "str", "issue_type": "str", "resolution_type": "str"}),
+        "refund_processing": ("process_refund", "退款处理", {"order_id": "str", "customer_id": "str", "amount": "float", "reason": "str"}),
+        "sentiment_analysis": ("analyze_sentiment", "情感分析", {"text": "str"}),
+        "bulk_sentiment_analysis": ("analyze_sentiment_bulk", "批量情感评分", {"texts": "list"})
+    }
+
     def __init__(self, agent_id: str = "customer_service", config: Optional[Dict] = None):
         super().__init__(
             agent_id=agent_id,
@@ -42,18 +51,7 @@ class CustomerServiceAgent(BaseAgent):
         self.status = "busy"
         
         try:
-            if task_type == "message_response":
-                result = await self.respond_to_message(task.get("parameters", {}))
-            elif task_type == "image_analysis":
-                result = await self.analyze_image(task.get("parameters", {}))
-            elif task_type == "issue_resolution":
-                result = await self.resolve_issue(task.get("parameters", {}))
-            elif task_type == "refund_processing":
-                result = await self.process_refund(task.get("parameters", {}))
-            elif task_type == "sentiment_analysis":
-                result = await self.analyze_sentiment(task.get("parameters", {}))
-            else:
-                result = {"error": f"Unknown task type: {task_type}"}
+            result = await self.dispatch_task(task_type, task.get("parameters", {}))
             
             self.status = "ready"
             return result
@@ -302,8 +300,39 @@ class CustomerServiceAgent(BaseAgent):
             "data": sentiment_result
         }
 
+    async def analyze_sentiment_bulk(self, parameters: Dict) -> Dict[str, Any]:
+        """
+        批量情感评分（CPU密集，适合通过进程池执行）
+        
+        Args:
+            parameters: 参数字典
+            
+        Returns:
+            每条文本的情感标签及汇总
+        """
+        texts = parameters.get("texts", [])
+        logger.info(f"Scoring sentiment for {len(texts)} texts")
+        
+        labels = [self._score_sentiment(text) for text in texts]
+        summary = {"positive": 0, "negative": 0, "neutral": 0}
+        for label in labels:
+            summary[label] += 1
+        
+        return {
+            "status": "success",
+            "data": {
+                "count": len(texts),
+                "summary": summary,
+                "labels": labels
+            }
+        }
+
     async def _analyze_sentiment(self, text: str) -> str:
         """分析文本情感"""
+        return self._score_sentiment(text)
+
+    def _score_sentiment(self, text: str) -> str:
+        """基于关键词的情感打分"""
         negative_words = ["disappointed", "angry", "frustrated", "terrible", "worst", "hate"]
         positive_words = ["happy", "great", "excellent", "love", "amazing", "wonderful"]
         
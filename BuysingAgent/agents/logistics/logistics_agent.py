@@ -17,6 +17,14 @@ class LogisticsAgent(BaseAgent):
     物流Agent
     """
 
+    TASK_HANDLERS = {
+        "inventory_check": ("check_inventory", "库存检查", {"product_id": "str", "warehouse": "str"}),
+        "reorder": ("create_reorder", "补货下单", {"product_id": "str", "quantity": "int", "supplier_id": "str", "priority": "str"}),
+        "shipment_tracking": ("track_shipment", "物流跟踪", {"shipment_id": "str"}),
+        "demand_forecast": ("forecast_demand", "需求预测", {"product_id": "str", "period": "str"}),
+        "supplier_management": ("manage_suppliers", "供应商管理", {"action": "str", "supplier_id": "str"})
+    }
+
     def __init__(self, agent_id: str = "logistics", config: Optional[Dict] = None):
         super().__init__(
             agent_id=agent_id,
@@ -43,18 +51,7 @@ class LogisticsAgent(BaseAgent):
         self.status = "busy"
         
         try:
-            if task_type == "inventory_check":
-                result = await self.check_inventory(task.get("parameters", {}))
-            elif task_type == "reorder":
-                result = await self.create_reorder(task.get("parameters", {}))
-            elif task_type == "shipment_tracking":
-                result = await self.track_shipment(task.get("parameters", {}))
-            elif task_type == "demand_forecast":
-                result = await self.forecast_demand(task.get("parameters", {}))
-            elif task_type == "supplier_management":
-                result = await self.manage_suppliers(task.get("parameters", {}))
-            else:
-                result = {"error": f"Unknown task type: {task_type}"}
+            result = await self.dispatch_task(task_type, task.get("parameters", {}))
             
             self.status = "ready"
             return result
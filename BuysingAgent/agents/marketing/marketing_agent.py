@@ -17,6 +17,14 @@ class MarketingAgent(BaseAgent):
     营销Agent
     """
 
+    TASK_HANDLERS = {
+        "content_generation": ("generate_content", "营销内容生成", {"product": "dict", "market": "str", "content_type": "str"}),
+        "ad_creation": ("create_ad_campaign", "广告活动创建", {"campaign": "dict", "platforms": "list"}),
+        "ad_optimization": ("optimize_ads", "广告优化", {"campaign_id": "str", "goals": "list"}),
+        "translation": ("translate_content", "多语言翻译", {"content": "dict", "languages": "list"}),
+        "seo_optimization": ("optimize_seo", "SEO优化", {"product": "dict", "market": "str"})
+    }
+
     def __init__(self, agent_id: str = "marketing", config: Optional[Dict] = None):
         super().__init__(
             agent_id=agent_id,
@@ -26,7 +34,7 @@ class MarketingAgent(BaseAgent):
         )
         self.content_templates = {}
         self.ad_campaigns = {}
-        self.performance_metrics = {}
+        self.campaign_metrics = {}
 
     async def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -42,18 +50,7 @@ class MarketingAgent(BaseAgent):
         self.status = "busy"
         
         try:
-            if task_type == "content_generation":
-                result = await self.generate_content(task.get("parameters", {}))
-            elif task_type == "ad_creation":
-                result = await self.create_ad_campaign(task.get("parameters", {}))
-            elif task_type == "ad_optimization":
-                result = await self.optimize_ads(task.get("parameters", {}))
-            elif task_type == "translation":
-                result = await self.translate_content(task.get("parameters", {}))
-            elif task_type == "seo_optimization":
-                result = await self.optimize_seo(task.get("parameters", {}))
-            else:
-                result = {"error": f"Unknown task type: {task_type}"}
+            result = await self.dispatch_task(task_type, task.get("parameters", {}))
             
             self.status = "ready"
             return result
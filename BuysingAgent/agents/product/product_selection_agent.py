@@ -17,6 +17,13 @@ class ProductSelectionAgent(BaseAgent):
     智能选品Agent
     """
 
+    TASK_HANDLERS = {
+        "trend_analysis": ("analyze_trends", "全网趋势预测", {"region": "str", "timeframe": "str"}),
+        "competitor_analysis": ("analyze_competitors", "竞品分析", {"category": "str", "competitors": "list"}),
+        "product_testing": ("test_product", "AI测款", {"product": "dict", "platforms": "list"}),
+        "recommendation": ("generate_recommendations", "选品推荐", {"market": "str", "budget": "float"})
+    }
+
     def __init__(self, agent_id: str = "product_selection", config: Optional[Dict] = None):
         super().__init__(
             agent_id=agent_id,
@@ -42,16 +49,7 @@ class ProductSelectionAgent(BaseAgent):
         self.status = "busy"
         
         try:
-            if task_type == "trend_analysis":
-                result = await self.analyze_trends(task.get("parameters", {}))
-            elif task_type == "competitor_analysis":
-                result = await self.analyze_competitors(task.get("parameters", {}))
-            elif task_type == "product_testing":
-                result = await self.test_product(task.get("parameters", {}))
-            elif task_type == "recommendation":
-                result = await self.generate_recommendations(task.get("parameters", {}))
-            else:
-                result = {"error": f"Unknown task type: {task_type}"}
+            result = await self.dispatch_task(task_type, task.get("parameters", {}))
             
             self.status = "ready"
             return result
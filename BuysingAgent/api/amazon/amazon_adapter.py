@@ -2,13 +2,25 @@
 Amazon API Adapter - 亚马逊平台API集成
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
+import asyncio
+import json
 import logging
+import time
 from core.tools.base_api_adapter import BaseAPIAdapter
+from api.amazon.amazon_models import Order, GetOrdersResponse
+from core.tools.pagination import next_token_params
+from core.tools.resilience import APIError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+FEEDS_PATH = "/feeds/2021-06-30"
+FEED_CONTENT_TYPE = "application/json; charset=UTF-8"
+FEED_TERMINAL_STATUSES = ("DONE", "CANCELLED", "FATAL")
+# listing 补丁可能改变的只读端点，feed 结束后使其响应缓存失效
+FEED_AFFECTED_ENDPOINTS = ("/products/pricing/v0/price", "/inventory/v1/inventory")
+
 
 class AmazonAPIAdapter(BaseAPIAdapter):
     """
@@ -18,6 +30,11 @@ class AmazonAPIAdapter(BaseAPIAdapter):
     def __init__(self, api_key: str, base_url: str = "https://sellingpartnerapi-na.amazon.com", config: Optional[Dict] = None):
         super().__init__(api_key, base_url, config)
         self.marketplace_id = config.get("marketplace_id", "ATVPDKIKX0DER") if config else "ATVPDKIKX0DER"
+        self.seller_id = self.config.get("seller_id", "")
+        self.feed_max_messages = self.config.get("feed_max_messages", 10000)
+        self.feed_max_bytes = self.config.get("feed_max_bytes", 10 * 1024 * 1024)
+        self.feed_poll_interval = self.config.get("feed_poll_interval", 30.0)
+        self.feed_poll_timeout = self.config.get("feed_poll_timeout", 3600.0)
 
     async def authenticate(self):
         """认证"""
@@ -33,6 +50,9 @@ class AmazonAPIAdapter(BaseAPIAdapter):
             
         Returns:
             产品列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -41,10 +61,31 @@ class AmazonAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response.get("payload", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get products: {e}")
             return []
 
+    def iter_products(self, params: Optional[Dict] = None, prefetch: int = 1) -> AsyncIterator[Dict]:
+        """
+        流式遍历全部产品（按 pagination.nextToken / pageToken 翻页，后台预取下一页）
+        
+        Args:
+            params: 查询参数
+            prefetch: 预取页数
+            
+        Returns:
+            逐条产出产品的异步迭代器，请求失败时抛出 APIError
+        """
+        return self._paginate(
+            f"/products/v0/listings/{self.marketplace_id}",
+            lambda response: response.get("payload", []),
+            next_token_params(["pagination", "nextToken"], "pageToken"),
+            params=params,
+            prefetch=prefetch
+        )
+
     async def create_product(self, product_data: Dict) -> Dict:
         """
         创建产品
@@ -88,27 +129,78 @@ class AmazonAPIAdapter(BaseAPIAdapter):
             logger.error(f"Failed to update product: {e}")
             return {"error": str(e)}
 
-    async def get_orders(self, params: Optional[Dict] = None) -> List[Dict]:
+    async def get_orders(self, params: Optional[Dict] = None, typed: bool = False) -> List[Dict]:
         """
         获取订单列表
         
         Args:
             params: 查询参数
+            typed: 为 True 时解码为 Order 对象（只构造 Order 声明的字段）
             
         Returns:
             订单列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
+            if typed:
+                response = await self._make_request(
+                    "GET",
+                    f"/orders/v0/orders",
+                    params=params,
+                    response_type=GetOrdersResponse
+                )
+                return response.payload.Orders if response and response.payload else []
             response = await self._make_request(
                 "GET",
                 f"/orders/v0/orders",
                 params=params
             )
             return response.get("payload", {}).get("Orders", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get orders: {e}")
             return []
 
+    def stream_orders(self, params: Optional[Dict] = None, typed: bool = False) -> AsyncIterator[Any]:
+        """
+        流式解码一页订单，适合单页很大的响应（如大 MaxResultsPerPage 或报告导出）
+        
+        Args:
+            params: 查询参数
+            typed: 为 True 时产出 Order 对象
+            
+        Returns:
+            逐条产出订单的异步迭代器，请求失败时抛出 APIError
+        """
+        return self._stream_items(
+            "/orders/v0/orders",
+            ["payload", "Orders"],
+            params=params,
+            item_type=Order if typed else None
+        )
+
+    def iter_orders(self, params: Optional[Dict] = None, prefetch: int = 1) -> AsyncIterator[Dict]:
+        """
+        流式遍历全部订单（按 NextToken 翻页，后台预取下一页）
+        
+        Args:
+            params: 查询参数
+            prefetch: 预取页数
+            
+        Returns:
+            逐条产出订单的异步迭代器，请求失败时抛出 APIError
+        """
+        return self._paginate(
+            "/orders/v0/orders",
+            lambda response: response.get("payload", {}).get("Orders", []),
+            next_token_params(["payload", "NextToken"], "NextToken"),
+            params=params,
+            prefetch=prefetch
+        )
+
     async def get_analytics(self, params: Optional[Dict] = None) -> Dict:
         """
         获取分析数据
@@ -118,6 +210,9 @@ class AmazonAPIAdapter(BaseAPIAdapter):
             
         Returns:
             分析数据
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -126,6 +221,8 @@ class AmazonAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get analytics: {e}")
             return {}
@@ -140,6 +237,9 @@ class AmazonAPIAdapter(BaseAPIAdapter):
             
         Returns:
             评论列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -148,6 +248,8 @@ class AmazonAPIAdapter(BaseAPIAdapter):
                 params={"asin": product_id, **(params or {})}
             )
             return response.get("reviews", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get reviews: {e}")
             return []
@@ -161,6 +263,9 @@ class AmazonAPIAdapter(BaseAPIAdapter):
             
         Returns:
             库存数据
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -169,6 +274,8 @@ class AmazonAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get inventory: {e}")
             return {}
@@ -204,6 +311,9 @@ class AmazonAPIAdapter(BaseAPIAdapter):
             
         Returns:
             价格数据
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -212,6 +322,8 @@ class AmazonAPIAdapter(BaseAPIAdapter):
                 params={"SellerSKU": sku, "MarketplaceId": self.marketplace_id}
             )
             return response
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get pricing: {e}")
             return {}
@@ -236,4 +348,150 @@ class AmazonAPIAdapter(BaseAPIAdapter):
             return response
         except Exception as e:
             logger.error(f"Failed to update pricing: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
+
+    async def bulk_update_pricing(self, prices: Dict[str, float], currency: str = "USD") -> Dict[str, Dict]:
+        """
+        批量更新价格（JSON_LISTINGS_FEED 的 purchasable_offer 补丁）
+        
+        Args:
+            prices: SKU -> 价格
+            currency: 货币代码
+            
+        Returns:
+            SKU -> {"status": "accepted" / "error", "feed_id", "issues"}
+        """
+        messages = [
+            (sku, "/attributes/purchasable_offer", [{
+                "marketplace_id": self.marketplace_id,
+                "currency": currency,
+                "our_price": [{"schedule": [{"value_with_tax": price}]}]
+            }])
+            for sku, price in prices.items()
+        ]
+        return await self.submit_listings_feed(messages)
+
+    async def bulk_update_inventory(self, quantities: Dict[str, int]) -> Dict[str, Dict]:
+        """
+        批量更新库存（JSON_LISTINGS_FEED 的 fulfillment_availability 补丁）
+        
+        Args:
+            quantities: SKU -> 数量
+            
+        Returns:
+            SKU -> {"status": "accepted" / "error", "feed_id", "issues"}
+        """
+        messages = [
+            (sku, "/attributes/fulfillment_availability", [{"fulfillment_channel_code": "DEFAULT", "quantity": quantity}])
+            for sku, quantity in quantities.items()
+        ]
+        return await self.submit_listings_feed(messages)
+
+    async def submit_listings_feed(self, patches: List[Tuple[str, str, List[Dict]]]) -> Dict[str, Dict]:
+        """
+        以 JSON_LISTINGS_FEED 批量提交 listing 补丁
+        
+        按 feed_max_messages 条 / feed_max_bytes 字节切分为多个feed并发提交，
+        提交和状态查询经过适配器的限速器与在途窗口；单个feed失败时其中的SKU标记为 error。
+        全部feed结束后（包括失败，部分补丁可能已生效）价格和库存的响应缓存失效。
+        
+        Args:
+            patches: [(SKU, 属性路径, 新值), ...]
+            
+        Returns:
+            SKU -> {"status": "accepted" / "error", "feed_id", "issues"}
+        """
+        chunks = self._chunk_feed_messages(patches)
+        outcomes = await asyncio.gather(*(self._submit_feed_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        for endpoint in FEED_AFFECTED_ENDPOINTS:
+            self.response_cache.invalidate(endpoint)
+        results: Dict[str, Dict] = {}
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Listings feed with {len(chunk)} messages failed: {outcome}")
+                for sku, _ in chunk:
+                    results[sku] = {"status": "error", "feed_id": None, "issues": [{"message": str(outcome)}]}
+            else:
+                results.update(outcome)
+        return results
+
+    def _chunk_feed_messages(self, patches: List[Tuple[str, str, List[Dict]]]) -> List[List[Tuple[str, str]]]:
+        """
+        把补丁序列化为feed消息并按条数和字节数切分
+        
+        Returns:
+            [[(SKU, 不含 messageId 的消息JSON), ...], ...]
+        """
+        chunks: List[List[Tuple[str, str]]] = []
+        current: List[Tuple[str, str]] = []
+        size = 0
+        # 预留给 header 和数组括号的空间
+        budget = self.feed_max_bytes - 512
+        for sku, path, value in patches:
+            message = json.dumps({
+                "sku": sku,
+                "operationType": "PATCH",
+                "productType": "PRODUCT",
+                "patches": [{"op": "replace", "path": path, "value": value}]
+            }, separators=(",", ":"))
+            # messageId 在组装文档时按feed内序号补上，这里按最长的序号预留
+            message_size = len(message.encode()) + 24
+            if current and (len(current) >= self.feed_max_messages or size + message_size > budget):
+                chunks.append(current)
+                current, size = [], 0
+            current.append((sku, message))
+            size += message_size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _submit_feed_chunk(self, chunk: List[Tuple[str, str]]) -> Dict[str, Dict]:
+        """上传feed文档、创建feed、等待处理完成并解析处理报告"""
+        header = json.dumps({"sellerId": self.seller_id, "version": "2.0", "issueLocale": "en_US"})
+        messages = ",".join(f'{{"messageId":{message_id},{message[1:]}' for message_id, (_, message) in enumerate(chunk, 1))
+        body = f'{{"header":{header},"messages":[{messages}]}}'
+        
+        document = await self._make_request("POST", f"{FEEDS_PATH}/documents", data={"contentType": FEED_CONTENT_TYPE})
+        await self._transfer_document("PUT", document["url"], body.encode())
+        feed = await self._make_request("POST", f"{FEEDS_PATH}/feeds", data={
+            "feedType": "JSON_LISTINGS_FEED",
+            "marketplaceIds": [self.marketplace_id],
+            "inputFeedDocumentId": document["feedDocumentId"]
+        })
+        feed_id = feed["feedId"]
+        status = await self._wait_for_feed(feed_id)
+        if status.get("processingStatus") != "DONE" or not status.get("resultFeedDocumentId"):
+            raise APIError(f"Feed {feed_id} ended with status {status.get('processingStatus')}", endpoint=f"{FEEDS_PATH}/feeds")
+        
+        result_document = await self._make_request("GET", f"{FEEDS_PATH}/documents/{status['resultFeedDocumentId']}")
+        report = json.loads(await self._transfer_document("GET", result_document["url"]))
+        issues_by_message: Dict[int, List[Dict]] = {}
+        for issue in report.get("issues", []):
+            issues_by_message.setdefault(issue.get("messageId"), []).append(issue)
+        
+        results = {}
+        for message_id, (sku, _) in enumerate(chunk, 1):
+            issues = issues_by_message.get(message_id, [])
+            failed = any(issue.get("severity") == "ERROR" for issue in issues)
+            results[sku] = {"status": "error" if failed else "accepted", "feed_id": feed_id, "issues": issues}
+        return results
+
+    async def _wait_for_feed(self, feed_id: str) -> Dict:
+        """按 feed_poll_interval 轮询feed状态直到处理结束"""
+        deadline = time.monotonic() + self.feed_poll_timeout
+        while True:
+            status = await self._make_request("GET", f"{FEEDS_PATH}/feeds/{feed_id}")
+            if status.get("processingStatus") in FEED_TERMINAL_STATUSES:
+                return status
+            if time.monotonic() >= deadline:
+                raise APIError(f"Feed {feed_id} not processed within {self.feed_poll_timeout}s",
+                               endpoint=f"{FEEDS_PATH}/feeds", error_class="timeout")
+            await asyncio.sleep(self.feed_poll_interval)
+
+    async def _transfer_document(self, method: str, url: str, content: Optional[bytes] = None) -> bytes:
+        """上传或下载feed文档（预签名URL，不带授权头，不经过API限速）"""
+        headers = {"Content-Type": FEED_CONTENT_TYPE} if content is not None else None
+        async with self.session.request(method, url, data=content, headers=headers) as response:
+            if response.status >= 400:
+                raise APIError(f"Feed document {method} failed: {response.status}", status=response.status, endpoint=url)
+            return await response.read()
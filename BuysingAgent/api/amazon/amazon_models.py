@@ -0,0 +1,41 @@
+"""
+Amazon Models - 亚马逊API热点接口的响应类型
+字段名与 Selling Partner API 的JSON键一致，类型化解码时只构造这里声明的字段
+"""
+
+from typing import List, Optional
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Money:
+    """金额"""
+    CurrencyCode: str = ""
+    Amount: str = "0"
+
+
+@dataclass
+class Order:
+    """订单（getOrders 中的 Order）"""
+    AmazonOrderId: str
+    PurchaseDate: str = ""
+    LastUpdateDate: str = ""
+    OrderStatus: str = ""
+    FulfillmentChannel: str = ""
+    MarketplaceId: str = ""
+    OrderTotal: Optional[Money] = None
+    NumberOfItemsShipped: int = 0
+    NumberOfItemsUnshipped: int = 0
+
+
+@dataclass
+class OrdersPayload:
+    """getOrders 响应的 payload"""
+    Orders: List[Order] = field(default_factory=list)
+    NextToken: Optional[str] = None
+
+
+@dataclass
+class GetOrdersResponse:
+    """getOrders 响应"""
+    payload: Optional[OrdersPayload] = None
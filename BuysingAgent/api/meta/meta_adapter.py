@@ -2,9 +2,10 @@
 Meta API Adapter - Meta (Facebook/Instagram) API集成
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator
 import logging
 from core.tools.base_api_adapter import BaseAPIAdapter
+from core.tools.resilience import APIError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -34,6 +35,9 @@ class MetaAPIAdapter(BaseAPIAdapter):
             
         Returns:
             产品列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -42,10 +46,31 @@ class MetaAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response.get("data", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get products: {e}")
             return []
 
+    def iter_products(self, params: Optional[Dict] = None, prefetch: int = 1) -> AsyncIterator[Dict]:
+        """
+        流式遍历全部产品目录（按 paging.cursors.after 翻页，后台预取下一页）
+        
+        Args:
+            params: 查询参数
+            prefetch: 预取页数
+            
+        Returns:
+            逐条产出结果的异步迭代器，请求失败时抛出 APIError
+        """
+        return self._paginate(
+            f"/{self.page_id}/product_catalogs",
+            lambda response: response.get("data", []),
+            _next_cursor_params,
+            params=params,
+            prefetch=prefetch
+        )
+
     async def create_product(self, product_data: Dict) -> Dict:
         """
         创建产品
@@ -98,6 +123,9 @@ class MetaAPIAdapter(BaseAPIAdapter):
             
         Returns:
             订单列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -106,6 +134,8 @@ class MetaAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response.get("data", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get orders: {e}")
             return []
@@ -119,6 +149,9 @@ class MetaAPIAdapter(BaseAPIAdapter):
             
         Returns:
             分析数据
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -127,6 +160,8 @@ class MetaAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get analytics: {e}")
             return {}
@@ -204,6 +239,9 @@ class MetaAPIAdapter(BaseAPIAdapter):
             
         Returns:
             表现数据
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -212,6 +250,8 @@ class MetaAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get ad performance: {e}")
             return {}
@@ -247,6 +287,9 @@ class MetaAPIAdapter(BaseAPIAdapter):
             
         Returns:
             受众洞察数据
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -255,6 +298,8 @@ class MetaAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get audience insights: {e}")
             return {}
@@ -278,4 +323,13 @@ class MetaAPIAdapter(BaseAPIAdapter):
             return response
         except Exception as e:
             logger.error(f"Failed to create custom audience: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
+
+
+def _next_cursor_params(response: Dict[str, Any], page_params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Graph API 分页：存在 paging.next 时以 paging.cursors.after 请求下一页"""
+    paging = response.get("paging", {})
+    after = paging.get("cursors", {}).get("after")
+    if not paging.get("next") or not after:
+        return None
+    return {**page_params, "after": after}
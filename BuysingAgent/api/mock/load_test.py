@@ -0,0 +1,267 @@
+"""
+Load Test - 适配器压测工具
+以可配置的并发（闭环）或到达速率（开环）驱动适配器请求，统计吞吐量、延迟分位数和错误率
+"""
+
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+from dataclasses import dataclass
+import asyncio
+import logging
+import random
+
+from api.amazon.amazon_adapter import AmazonAPIAdapter
+from api.meta.meta_adapter import MetaAPIAdapter
+from api.tiktok.tiktok_adapter import TikTokAPIAdapter
+from core.monitoring.histogram import LatencyHistogram
+from core.tools.base_api_adapter import BaseAPIAdapter
+from core.tools.request_window import RequestWindow
+from core.tools.resilience import classify_error
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# call(适配器, 请求序号) -> 响应
+OperationCall = Callable[[BaseAPIAdapter, int], Awaitable[Any]]
+
+
+@dataclass
+class LoadOperation:
+    """压测中的一种请求，按 weight 的比例随机选择"""
+    name: str
+    call: OperationCall
+    weight: float = 1.0
+
+
+def amazon_operations() -> List[LoadOperation]:
+    """亚马逊：订单、listing、价格查询（可缓存）和库存更新"""
+    return [
+        LoadOperation("get_orders", lambda adapter, i: adapter._make_request(
+            "GET", "/orders/v0/orders", params={"MarketplaceIds": adapter.marketplace_id}), 1),
+        LoadOperation("get_listings", lambda adapter, i: adapter._make_request(
+            "GET", f"/products/v0/listings/{adapter.marketplace_id}"), 2),
+        LoadOperation("get_pricing", lambda adapter, i: adapter._make_request(
+            "GET", "/products/pricing/v0/price", params={"Skus": f"SKU{i % 500}"}), 4),
+        LoadOperation("update_inventory", lambda adapter, i: adapter._make_request(
+            "PUT", f"/inventory/v1/inventory/SKU{i % 500}", data={"quantity": i % 100}), 1)
+    ]
+
+
+def tiktok_operations() -> List[LoadOperation]:
+    """TikTok：产品/订单/创作者列表、广告查询和广告创建"""
+    return [
+        LoadOperation("get_products", lambda adapter, i: adapter._make_request(
+            "GET", "/open_api/v1.3/product/list/", params={"page": i % 10 + 1}), 2),
+        LoadOperation("get_orders", lambda adapter, i: adapter._make_request(
+            "GET", "/open_api/v1.3/order/list/", params={"page": i % 10 + 1}), 2),
+        LoadOperation("get_creators", lambda adapter, i: adapter._make_request(
+            "GET", "/open_api/v1.3/creator/list/", params={"page": i % 10 + 1}), 1),
+        LoadOperation("get_ads", lambda adapter, i: adapter._make_request(
+            "GET", "/open_api/v1.3/ad/get/", params={"advertiser_id": adapter.advertiser_id}), 2),
+        LoadOperation("create_ad", lambda adapter, i: adapter._make_request(
+            "POST", "/open_api/v1.3/ad/create/", data={"advertiser_id": adapter.advertiser_id, "ad_name": f"ad-{i}"}), 1)
+    ]
+
+
+def meta_operations() -> List[LoadOperation]:
+    """Meta：产品目录、广告系列、洞察查询和广告创建"""
+    return [
+        LoadOperation("get_catalogs", lambda adapter, i: adapter._make_request(
+            "GET", f"/{adapter.page_id}/product_catalogs"), 2),
+        LoadOperation("get_campaigns", lambda adapter, i: adapter._make_request(
+            "GET", f"/{adapter.ad_account_id}/campaigns"), 2),
+        LoadOperation("get_insights", lambda adapter, i: adapter._make_request(
+            "GET", f"/{adapter.ad_account_id}/insights", params={"date_preset": "last_7d"}), 2),
+        LoadOperation("create_ad", lambda adapter, i: adapter._make_request(
+            "POST", f"/{adapter.ad_account_id}/ads", data={"name": f"ad-{i}"}), 1)
+    ]
+
+
+PLATFORMS = {
+    "amazon": (AmazonAPIAdapter, amazon_operations),
+    "tiktok": (TikTokAPIAdapter, tiktok_operations),
+    "meta": (MetaAPIAdapter, meta_operations)
+}
+
+
+def create_adapter(platform: str, base_url: str, config: Optional[Dict] = None) -> BaseAPIAdapter:
+    """
+    创建指向 base_url（通常是模拟服务器）的适配器
+
+    Args:
+        platform: amazon / tiktok / meta
+        base_url: API基础URL
+        config: 适配器配置，缺少的账号ID使用压测默认值
+    """
+    if platform not in PLATFORMS:
+        raise ValueError(f"Unknown platform: {platform}")
+    adapter_class, _ = PLATFORMS[platform]
+    config = {"advertiser_id": "7000000000000", "ad_account_id": "act_1000", "page_id": "2000", **(config or {})}
+    return adapter_class("load-test-key", base_url=base_url, config=config)
+
+
+class _OperationStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.requests = 0
+        self.errors: Dict[str, int] = {}
+
+    def record(self, seconds: float, error_class: Optional[str]):
+        self.requests += 1
+        self.latency.record(seconds)
+        if error_class is not None:
+            self.errors[error_class] = self.errors.get(error_class, 0) + 1
+
+    def to_dict(self, elapsed: float) -> Dict[str, Any]:
+        errors = sum(self.errors.values())
+        latency = self.latency.summary()
+        latency["p999"] = self.latency.percentile(0.999)
+        return {
+            "requests": self.requests,
+            "throughput": self.requests / elapsed if elapsed else 0.0,
+            "errors": errors,
+            "error_rate": errors / self.requests if self.requests else 0.0,
+            "errors_by_class": dict(self.errors),
+            "latency": latency
+        }
+
+
+class LoadTest:
+    """
+    适配器压测
+
+    闭环（rate 为 None）：concurrency 个协程各自连续发送请求，衡量最大吞吐量；
+    开环（指定 rate）：按固定到达速率发出请求，最多 concurrency 个同时执行，
+    延迟从计划发出时刻算起，包含排队时间，服务变慢时不会少算长尾。
+    请求失败按 APIError 的错误类别 (http_4xx / http_5xx / rate_limited / timeout / connect ...) 统计。
+
+    Args:
+        adapter: 已初始化的适配器
+        operations: 请求类型及权重
+        concurrency: 并发数
+        requests: 请求总数
+        duration: 持续秒数（与 requests 至少指定一个，先到者为准）
+        rate: 开环模式的每秒请求数
+        seed: 请求类型选择的随机种子
+    """
+
+    def __init__(self, adapter: BaseAPIAdapter, operations: List[LoadOperation], concurrency: int = 10,
+                 requests: Optional[int] = None, duration: Optional[float] = None,
+                 rate: Optional[float] = None, seed: Optional[int] = None):
+        if requests is None and duration is None:
+            raise ValueError("Either requests or duration must be set")
+        self.adapter = adapter
+        self.operations = operations
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration = duration
+        self.rate = rate
+        self._random = random.Random(seed)
+        self._cumulative_weights: List[float] = []
+        total = 0.0
+        for operation in operations:
+            total += operation.weight
+            self._cumulative_weights.append(total)
+        self._issued = 0
+        self._deadline: Optional[float] = None
+        self.stats: Dict[str, _OperationStats] = {operation.name: _OperationStats() for operation in operations}
+
+    def _next_index(self, now: float) -> Optional[int]:
+        """下一个请求的序号，达到请求数或时长时返回 None"""
+        if self.requests is not None and self._issued >= self.requests:
+            return None
+        if self._deadline is not None and now >= self._deadline:
+            return None
+        self._issued += 1
+        return self._issued - 1
+
+    async def _execute(self, index: int, started: float):
+        operation = self._random.choices(self.operations, cum_weights=self._cumulative_weights)[0]
+        error_class = None
+        try:
+            await operation.call(self.adapter, index)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error_class = classify_error(e, operation.name).error_class
+        self.stats[operation.name].record(asyncio.get_running_loop().time() - started, error_class)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        执行压测
+
+        Returns:
+            汇总报告：总体和各请求类型的吞吐量、延迟分位数、错误率，以及适配器状态
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self._deadline = start + self.duration if self.duration is not None else None
+
+        if self.rate is None:
+            async def worker():
+                while True:
+                    index = self._next_index(loop.time())
+                    if index is None:
+                        return
+                    await self._execute(index, loop.time())
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        else:
+            window = RequestWindow(self.concurrency)
+
+            async def scheduled(index: int, due: float):
+                async with window:
+                    await self._execute(index, due)
+
+            tasks = []
+            while True:
+                due = start + self._issued / self.rate
+                if due > loop.time():
+                    await asyncio.sleep(due - loop.time())
+                index = self._next_index(due)
+                if index is None:
+                    break
+                tasks.append(asyncio.create_task(scheduled(index, due)))
+            await asyncio.gather(*tasks)
+
+        elapsed = loop.time() - start
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """汇总各请求类型的统计"""
+        total = _OperationStats()
+        for stats in self.stats.values():
+            total.latency.merge(stats.latency)
+            total.requests += stats.requests
+            for error_class, count in stats.errors.items():
+                total.errors[error_class] = total.errors.get(error_class, 0) + count
+        return {
+            "mode": "open" if self.rate is not None else "closed",
+            "concurrency": self.concurrency,
+            "target_rate": self.rate,
+            "elapsed": elapsed,
+            **total.to_dict(elapsed),
+            "operations": {name: stats.to_dict(elapsed) for name, stats in self.stats.items()},
+            "adapter": self.adapter.get_status()
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """把压测报告格式化为文本表格（延迟单位毫秒）"""
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:8.1f}" if value is not None else "       -"
+
+    mode = f"open loop @ {report['target_rate']:.0f} req/s" if report["mode"] == "open" else "closed loop"
+    lines = [
+        f"{mode}, concurrency {report['concurrency']}, {report['requests']} requests in {report['elapsed']:.2f}s",
+        f"{'operation':<18}{'req/s':>9}{'errors':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'p99.9':>9}{'max':>9}"
+    ]
+    rows = [(name, stats) for name, stats in report["operations"].items()] + [("TOTAL", report)]
+    for name, stats in rows:
+        latency = stats["latency"]
+        lines.append(
+            f"{name:<18}{stats['throughput']:9.1f}{stats['error_rate'] * 100:8.1f}%"
+            f" {ms(latency['p50'])} {ms(latency['p90'])} {ms(latency['p99'])} {ms(latency['p999'])} {ms(latency['max'])}"
+        )
+    if report["errors_by_class"]:
+        lines.append("errors by class: " + ", ".join(f"{k}={v}" for k, v in sorted(report["errors_by_class"].items())))
+    return "\n".join(lines)
@@ -0,0 +1,477 @@
+"""
+Mock Platform Server - 本地模拟平台API服务
+用于基准测试、压测和联调：模拟亚马逊、TikTok、Meta 的常用端点和分页格式，
+按全局和端点限额限流（超限返回 429 和 Retry-After），可模拟延迟分布和故障
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+
+from aiohttp import web
+
+from core.tools.rate_limiter import GCRALimiter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+AMAZON_PREFIXES = ("/orders/", "/products/", "/sales/", "/reviews/", "/inventory/", "/fba/", "/feeds/")
+META_EDGES = ("product_catalogs", "products", "orders", "insights", "campaigns", "adsets", "ads",
+              "audience_insights", "customaudiences")
+
+
+class MockPlatformServer:
+    """
+    模拟平台API服务器
+
+    按路径区分平台：亚马逊 (/orders/、/products/ 等) 返回 {"payload": ...}，订单、产品列表按 NextToken 分页；
+    TikTok (/open_api/) 返回 {"code": 0, "data": ...}，list/get 端点按 page/page_size 分页；
+    其余路径视为 Meta Graph API，产品目录、广告、订单等边按 after 游标分页，写请求返回 {"id": ...}。
+    分页接口共有 item_count 条模拟数据。
+    配置 rate_limit / endpoint_limits 时按 GCRA 限流，超限请求返回 429，Retry-After 为距离下一个可用名额的秒数（小数）。
+
+    Args:
+        host: 监听地址
+        port: 监听端口，0 表示随机端口
+        rate_limit: 每秒允许的请求数，None 表示不限流
+        burst: 允许的突发请求数
+        latency: 每个请求的模拟处理延迟（秒），按 latency_distribution 抽样时为均值/中位数
+        latency_distribution: fixed / uniform (0 ~ 2*latency) / exponential (均值 latency) /
+            lognormal (中位数 latency，对数标准差 latency_sigma)
+        latency_sigma: lognormal 分布的对数标准差，越大长尾越重
+        endpoint_limits: 端点路径前缀 -> {"rate": 每秒请求数, "burst": 突发数}，与适配器 endpoint_rate_limits 格式相同
+        rate_limit_header: 在响应头中告知限额时使用的头名称
+        error_rate: 随机返回 error_status 的请求比例，用于模拟暂时性故障
+        error_status: 模拟故障时的状态码
+        timeout_rate: 响应延后 timeout_delay 秒的请求比例，用于触发客户端超时
+        timeout_delay: 模拟超时的延迟秒数
+        disconnect_rate: 不返回响应直接断开连接的请求比例
+        seed: 故障注入和延迟抽样的随机种子
+        item_count: 分页接口（订单、产品、创作者、产品目录）的结果总数
+        page_size: 分页接口每页结果数
+        feed_processing_delay: Feeds API 提交后到处理完成的秒数
+
+    将 down 设为 True 时所有请求返回 error_status，模拟平台宕机。
+    GET 响应带 ETag，递增 data_version 模拟数据变化。
+    Feeds API（文档上传、提交、状态查询、处理报告）按 JSON_LISTINGS_FEED 格式应用价格和库存补丁，结果保存在 listings 中。
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rate_limit: Optional[float] = None,
+                 burst: int = 1, latency: float = 0.0, rate_limit_header: Optional[str] = None,
+                 error_rate: float = 0.0, error_status: int = 503, seed: Optional[int] = None,
+                 item_count: int = 0, page_size: int = 100, feed_processing_delay: float = 0.0,
+                 latency_distribution: str = "fixed", latency_sigma: float = 0.5,
+                 endpoint_limits: Optional[Dict[str, Dict[str, float]]] = None,
+                 timeout_rate: float = 0.0, timeout_delay: float = 30.0, disconnect_rate: float = 0.0):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.host = host
+        self.port = port
+        self.rate_limit = rate_limit
+        self.latency = latency
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.rate_limit_header = rate_limit_header
+        self.limiter = GCRALimiter(rate_limit, 1.0, burst) if rate_limit else None
+        # 按前缀长度倒序，最长前缀优先匹配
+        self.endpoint_limiters = [
+            (prefix, GCRALimiter(limit["rate"], 1.0, int(limit.get("burst", 1))))
+            for prefix, limit in sorted((endpoint_limits or {}).items(), key=lambda item: -len(item[0]))
+        ]
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+        self.disconnect_rate = disconnect_rate
+        self.error_status = error_status
+        self.down = False
+        self.item_count = item_count
+        self.page_size = page_size
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.disconnects = 0
+        self.not_modified = 0
+        self.data_version = 0
+        self.feed_processing_delay = feed_processing_delay
+        self.documents: Dict[str, bytes] = {}
+        self.feeds: Dict[str, Dict[str, Any]] = {}
+        self.listings: Dict[str, Dict[str, Any]] = {}
+        self._document_seq = 0
+        self._feed_seq = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @web.middleware
+    async def _gateway(self, request: web.Request, handler) -> web.StreamResponse:
+        """所有API请求共用的限流、故障注入和延迟；文档上传/下载地址（模拟预签名URL）不受限"""
+        if request.path.startswith("/feed-documents/"):
+            return await handler(request)
+        self.requests += 1
+        headers = {}
+        if self.rate_limit_header and self.rate_limit:
+            headers[self.rate_limit_header] = str(self.rate_limit)
+        wait = self.limiter.try_acquire() if self.limiter is not None else 0.0
+        if wait <= 0:
+            limiter = self._endpoint_limiter(request.path)
+            wait = limiter.try_acquire() if limiter is not None else 0.0
+        if wait > 0:
+            self.throttled += 1
+            headers["Retry-After"] = f"{wait:.3f}"
+            return web.json_response({"errors": [{"code": "QuotaExceeded"}]}, status=429, headers=headers)
+
+        roll = self._random.random()
+        if self.down or roll < self.error_rate:
+            self.errors += 1
+            return web.json_response({"errors": [{"code": "ServiceUnavailable"}]}, status=self.error_status)
+        roll -= self.error_rate
+        if roll < self.disconnect_rate:
+            self.disconnects += 1
+            if request.transport is not None:
+                request.transport.abort()
+            return web.Response(status=500)
+        roll -= self.disconnect_rate
+        if roll < self.timeout_rate:
+            self.timeouts += 1
+            await asyncio.sleep(self.timeout_delay)
+
+        delay = self._sample_latency()
+        if delay:
+            await asyncio.sleep(delay)
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    def _endpoint_limiter(self, path: str) -> Optional[GCRALimiter]:
+        for prefix, limiter in self.endpoint_limiters:
+            if path.startswith(prefix):
+                return limiter
+        return None
+
+    def _sample_latency(self) -> float:
+        """按 latency_distribution 抽样一次处理延迟"""
+        if not self.latency:
+            return 0.0
+        if self.latency_distribution == "uniform":
+            return self._random.uniform(0, 2 * self.latency)
+        if self.latency_distribution == "exponential":
+            return self._random.expovariate(1 / self.latency)
+        if self.latency_distribution == "lognormal":
+            return self._random.lognormvariate(math.log(self.latency), self.latency_sigma)
+        return self.latency
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        headers = {}
+        if request.method == "GET":
+            # 数据版本变化前 ETag 不变，带 If-None-Match 的请求返回 304
+            etag = f'"{self.data_version}-{hash(request.path_qs) & 0xffffffff:x}"'
+            headers["ETag"] = etag
+            if request.headers.get("If-None-Match") == etag:
+                self.not_modified += 1
+                return web.Response(status=304, headers=headers)
+        return web.json_response(self._page_response(request), headers=headers)
+
+    def _page(self, offset: int, make_item=None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """从 offset 开始的一页模拟数据和下一页的 offset"""
+        end = min(offset + self.page_size, self.item_count)
+        make_item = make_item or self._item
+        items = [make_item(i) for i in range(offset, end)]
+        return items, end if end < self.item_count else None
+
+    @staticmethod
+    def _item(i: int) -> Dict[str, Any]:
+        return {"id": f"ITEM-{i:09d}", "sku": f"SKU{i % 5000}", "amount": round(10 + i % 90 + 0.99, 2), "status": "Shipped"}
+
+    @staticmethod
+    def _order(i: int) -> Dict[str, Any]:
+        """Selling Partner API getOrders 格式的订单"""
+        return {
+            "AmazonOrderId": f"{i % 1000:03d}-{i:07d}-{i * 7 % 10000000:07d}",
+            "PurchaseDate": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T10:{i % 60:02d}:00Z",
+            "LastUpdateDate": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T12:{i % 60:02d}:00Z",
+            "OrderStatus": "Shipped",
+            "FulfillmentChannel": "AFN" if i % 3 else "MFN",
+            "SalesChannel": "Amazon.com",
+            "ShipServiceLevel": "Expedited",
+            "OrderTotal": {"CurrencyCode": "USD", "Amount": f"{10 + i % 90}.99"},
+            "NumberOfItemsShipped": i % 4 + 1,
+            "NumberOfItemsUnshipped": 0,
+            "PaymentMethod": "Other",
+            "PaymentMethodDetails": ["Standard"],
+            "MarketplaceId": "ATVPDKIKX0DER",
+            "ShipmentServiceLevelCategory": "Expedited",
+            "OrderType": "StandardOrder",
+            "EarliestShipDate": "2024-01-02T08:00:00Z",
+            "LatestShipDate": "2024-01-03T07:59:59Z",
+            "IsBusinessOrder": False,
+            "IsPrime": i % 2 == 0,
+            "IsPremiumOrder": False,
+            "IsGlobalExpressEnabled": False,
+            "IsReplacementOrder": False,
+            "IsSoldByAB": False,
+            "ShippingAddress": {"City": "SEATTLE", "StateOrRegion": "WA", "PostalCode": f"98{i % 1000:03d}", "CountryCode": "US"},
+            "BuyerInfo": {"BuyerEmail": f"buyer{i}@marketplace.amazon.com"},
+            "AutomatedShippingSettings": {"HasAutomatedShippingSettings": False}
+        }
+
+    def _page_response(self, request: web.Request) -> Dict[str, Any]:
+        """按各平台的分页格式构造响应"""
+        path, query = request.path, request.query
+        if path.startswith("/orders/"):
+            items, next_offset = self._page(int(query.get("NextToken", 0)), self._order)
+            payload: Dict[str, Any] = {"Orders": items}
+            if next_offset is not None:
+                payload["NextToken"] = str(next_offset)
+            return {"payload": payload}
+        if path.startswith("/products/v0/listings/") and request.method == "GET":
+            items, next_offset = self._page(int(query.get("pageToken", 0)))
+            response: Dict[str, Any] = {"payload": items}
+            if next_offset is not None:
+                response["pagination"] = {"nextToken": str(next_offset)}
+            return response
+        if path.startswith("/products/pricing/") and request.method == "GET":
+            skus = query.get("Skus", "").split(",") if query.get("Skus") else []
+            return {"payload": [
+                {"SKU": sku, "status": "Success", "Product": {"Offers": [{"BuyingPrice": {
+                    "ListingPrice": {"CurrencyCode": "USD", "Amount": 10 + hash(sku) % 90 + 0.99}
+                }}]}}
+                for sku in skus
+            ]}
+        if path.startswith(AMAZON_PREFIXES):
+            return {"payload": [], "path": path}
+        if path.startswith("/open_api/"):
+            return {"code": 0, "message": "OK", "request_id": str(self.requests), "data": self._tiktok_data(request)}
+        return self._meta_response(request)
+
+    def _tiktok_data(self, request: web.Request) -> Dict[str, Any]:
+        """TikTok 响应的 data 部分：list/get 端点按 page/page_size 分页"""
+        path, query = request.path, request.query
+        if path.endswith("/trending/hashtags/"):
+            return {"hashtags": [
+                {"hashtag_name": f"#trend{i}", "video_views": 1000000 - i * 1000} for i in range(min(self.page_size, 50))
+            ]}
+        if not path.endswith(("/list/", "/get/")):
+            return {}
+        page, page_size = int(query.get("page", 1)), int(query.get("page_size", self.page_size))
+        start = (page - 1) * page_size
+        items = self._page(start)[0][:page_size] if start < self.item_count else []
+        total_page = -(-self.item_count // page_size) if page_size else 0
+        return {"list": items, "page_info": {
+            "page": page, "page_size": page_size, "total_number": self.item_count, "total_page": total_page
+        }}
+
+    def _meta_response(self, request: web.Request) -> Dict[str, Any]:
+        """Meta Graph API 响应：边 (products、campaigns 等) 按 after 游标分页，节点返回 id"""
+        path, query = request.path, request.query
+        segments = [segment for segment in path.split("/") if segment]
+        if request.method != "GET":
+            return {"id": f"{segments[0] if segments else 'node'}_{self.requests}", "success": True}
+        if segments and segments[-1] in META_EDGES:
+            items, next_offset = self._page(int(query.get("after", 0)))
+            response: Dict[str, Any] = {"data": items, "paging": {"cursors": {"after": str(next_offset or self.item_count)}}}
+            if next_offset is not None:
+                response["paging"]["next"] = f"{self.base_url}{path}?after={next_offset}"
+            return response
+        return {"id": segments[-1] if segments else ""}
+
+    async def _create_feed_document(self, request: web.Request) -> web.Response:
+        """Feeds API createFeedDocument：返回上传地址"""
+        self._document_seq += 1
+        document_id = f"amzn1.tortuga.mock.{self._document_seq}"
+        self.documents[document_id] = b""
+        return web.json_response(
+            {"feedDocumentId": document_id, "url": f"{self.base_url}/feed-documents/{document_id}"},
+            status=201
+        )
+
+    async def _upload_document(self, request: web.Request) -> web.Response:
+        document_id = request.match_info["document_id"]
+        if document_id not in self.documents:
+            return web.Response(status=404)
+        self.documents[document_id] = await request.read()
+        return web.Response(status=200)
+
+    async def _download_document(self, request: web.Request) -> web.Response:
+        content = self.documents.get(request.match_info["document_id"])
+        if content is None:
+            return web.Response(status=404)
+        return web.Response(body=content, content_type="application/json")
+
+    async def _get_feed_document(self, request: web.Request) -> web.Response:
+        """Feeds API getFeedDocument：返回下载地址"""
+        document_id = request.match_info["document_id"]
+        if document_id not in self.documents:
+            return web.json_response({"errors": [{"code": "NotFound"}]}, status=404)
+        return web.json_response({"feedDocumentId": document_id, "url": f"{self.base_url}/feed-documents/{document_id}"})
+
+    async def _create_feed(self, request: web.Request) -> web.Response:
+        """Feeds API createFeed：feed_processing_delay 秒后处理完成"""
+        body = await request.json()
+        if body.get("inputFeedDocumentId") not in self.documents:
+            return web.json_response({"errors": [{"code": "InvalidInput"}]}, status=400)
+        self._feed_seq += 1
+        feed_id = str(self._feed_seq)
+        self.feeds[feed_id] = {
+            "feedId": feed_id,
+            "feedType": body.get("feedType"),
+            "inputFeedDocumentId": body["inputFeedDocumentId"],
+            "processingStatus": "IN_QUEUE",
+            "created_at": time.monotonic()
+        }
+        return web.json_response({"feedId": feed_id}, status=202)
+
+    async def _get_feed(self, request: web.Request) -> web.Response:
+        """Feeds API getFeed：到期后处理 JSON_LISTINGS_FEED 并生成处理报告"""
+        feed = self.feeds.get(request.match_info["feed_id"])
+        if feed is None:
+            return web.json_response({"errors": [{"code": "NotFound"}]}, status=404)
+        if feed["processingStatus"] != "DONE":
+            if time.monotonic() - feed["created_at"] < self.feed_processing_delay:
+                feed["processingStatus"] = "IN_PROGRESS"
+            else:
+                self._process_listings_feed(feed)
+        return web.json_response({k: v for k, v in feed.items() if k != "created_at"})
+
+    def _process_listings_feed(self, feed: Dict[str, Any]):
+        """应用价格/库存补丁：价格不为正或库存为负的消息记为 ERROR"""
+        document = json.loads(self.documents[feed["inputFeedDocumentId"]])
+        issues = []
+        accepted = 0
+        for message in document.get("messages", []):
+            listing = self.listings.setdefault(message["sku"], {})
+            error = None
+            for patch in message.get("patches", []):
+                value = patch.get("value", [{}])[0]
+                if patch["path"] == "/attributes/purchasable_offer":
+                    price = value["our_price"][0]["schedule"][0]["value_with_tax"]
+                    if price <= 0:
+                        error = "Price must be positive"
+                    else:
+                        listing["price"] = price
+                elif patch["path"] == "/attributes/fulfillment_availability":
+                    if value.get("quantity", 0) < 0:
+                        error = "Quantity must not be negative"
+                    else:
+                        listing["quantity"] = value["quantity"]
+            if error:
+                issues.append({"messageId": message["messageId"], "code": "90220", "severity": "ERROR", "message": error})
+            else:
+                accepted += 1
+        self._document_seq += 1
+        result_id = f"amzn1.tortuga.mock.{self._document_seq}"
+        self.documents[result_id] = json.dumps({
+            "header": {"sellerId": document.get("header", {}).get("sellerId"), "version": "2.0", "feedId": feed["feedId"]},
+            "issues": issues,
+            "summary": {"errors": len(issues), "warnings": 0, "messagesProcessed": accepted + len(issues), "messagesAccepted": accepted, "messagesInvalid": len(issues)}
+        }).encode()
+        feed["processingStatus"] = "DONE"
+        feed["resultFeedDocumentId"] = result_id
+
+    async def start(self) -> str:
+        """
+        启动服务器
+
+        Returns:
+            服务器基础URL
+        """
+        app = web.Application(middlewares=[self._gateway], client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/feeds/2021-06-30/documents", self._create_feed_document)
+        app.router.add_get("/feeds/2021-06-30/documents/{document_id}", self._get_feed_document)
+        app.router.add_post("/feeds/2021-06-30/feeds", self._create_feed)
+        app.router.add_get("/feeds/2021-06-30/feeds/{feed_id}", self._get_feed)
+        app.router.add_put("/feed-documents/{document_id}", self._upload_document)
+        app.router.add_get("/feed-documents/{document_id}", self._download_document)
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Mock platform server listening on {self.base_url}")
+        return self.base_url
+
+    async def stop(self):
+        """停止服务器"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'MockPlatformServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "disconnects": self.disconnects,
+            "not_modified": self.not_modified,
+            "feeds": len(self.feeds),
+            "rate_limit": self.rate_limit
+        }
+
+
+async def _serve(args: argparse.Namespace):
+    server = MockPlatformServer(
+        host=args.host, port=args.port, rate_limit=args.rate_limit, burst=args.burst,
+        latency=args.latency, latency_distribution=args.latency_distribution, latency_sigma=args.latency_sigma,
+        rate_limit_header=args.rate_limit_header, error_rate=args.error_rate, error_status=args.error_status,
+        timeout_rate=args.timeout_rate, timeout_delay=args.timeout_delay, disconnect_rate=args.disconnect_rate,
+        seed=args.seed, item_count=args.item_count, page_size=args.page_size,
+        feed_processing_delay=args.feed_processing_delay,
+        endpoint_limits=json.loads(args.endpoint_limits) if args.endpoint_limits else None
+    )
+    await server.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        logger.info(f"Mock platform server statistics: {server.get_statistics()}")
+        await server.stop()
+
+
+def main():
+    """命令行启动：python -m api.mock.mock_server --port 8080 --rate-limit 20 --latency 0.05"""
+    parser = argparse.ArgumentParser(description="Local mock platform API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--endpoint-limits", default=None,
+                        help='JSON, e.g. \'{"/orders/v0/orders": {"rate": 0.0167, "burst": 20}}\'')
+    parser.add_argument("--rate-limit-header", default=None)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-delay", type=float, default=30.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--item-count", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--feed-processing-delay", type=float, default=5.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
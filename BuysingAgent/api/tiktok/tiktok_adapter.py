@@ -2,9 +2,10 @@
 TikTok API Adapter - TikTok平台API集成
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator
 import logging
 from core.tools.base_api_adapter import BaseAPIAdapter
+from core.tools.resilience import APIError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,6 +34,9 @@ class TikTokAPIAdapter(BaseAPIAdapter):
             
         Returns:
             产品列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -41,6 +45,8 @@ class TikTokAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response.get("data", {}).get("list", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get products: {e}")
             return []
@@ -97,6 +103,9 @@ class TikTokAPIAdapter(BaseAPIAdapter):
             
         Returns:
             订单列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -105,6 +114,8 @@ class TikTokAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response.get("data", {}).get("list", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get orders: {e}")
             return []
@@ -118,6 +129,9 @@ class TikTokAPIAdapter(BaseAPIAdapter):
             
         Returns:
             分析数据
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -126,6 +140,8 @@ class TikTokAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get analytics: {e}")
             return {}
@@ -160,6 +176,9 @@ class TikTokAPIAdapter(BaseAPIAdapter):
             
         Returns:
             广告列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -168,6 +187,8 @@ class TikTokAPIAdapter(BaseAPIAdapter):
                 params={"advertiser_id": self.advertiser_id, **(params or {})}
             )
             return response.get("data", {}).get("list", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get ads: {e}")
             return []
@@ -203,6 +224,9 @@ class TikTokAPIAdapter(BaseAPIAdapter):
             
         Returns:
             热门标签列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -211,6 +235,8 @@ class TikTokAPIAdapter(BaseAPIAdapter):
                 params={"region": region}
             )
             return response.get("data", {}).get("hashtags", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get trending hashtags: {e}")
             return []
@@ -224,6 +250,9 @@ class TikTokAPIAdapter(BaseAPIAdapter):
             
         Returns:
             创作者列表
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
         """
         try:
             response = await self._make_request(
@@ -232,6 +261,42 @@ class TikTokAPIAdapter(BaseAPIAdapter):
                 params=params
             )
             return response.get("data", {}).get("list", [])
+        except APIError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get creator list: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def iter_creators(self, params: Optional[Dict] = None, page_size: int = 50, prefetch: int = 1) -> AsyncIterator[Dict]:
+        """
+        流式遍历全部创作者（按 page_info 翻页，后台预取下一页）
+        
+        Args:
+            params: 查询参数
+            page_size: 每页数量
+            prefetch: 预取页数
+            
+        Returns:
+            逐条产出创作者的异步迭代器，请求失败时抛出 APIError
+        """
+        return self._paginate(
+            "/open_api/v1.3/creator/list/",
+            lambda response: response.get("data", {}).get("list", []),
+            _next_page_params,
+            params={"page": 1, "page_size": page_size, **(params or {})},
+            prefetch=prefetch
+        )
+
+
+def _next_page_params(response: Dict[str, Any], page_params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """TikTok 分页：page_info.page < total_page 时请求下一页；游标接口按 has_more / cursor 翻页"""
+    data = response.get("data", {})
+    page_info = data.get("page_info")
+    if page_info:
+        page = page_info.get("page", page_params.get("page", 1))
+        if page >= page_info.get("total_page", 0):
+            return None
+        return {**page_params, "page": page + 1}
+    if data.get("has_more") and data.get("cursor") is not None:
+        return {**page_params, "cursor": data["cursor"]}
+    return None
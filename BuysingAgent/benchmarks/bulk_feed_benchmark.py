@@ -0,0 +1,102 @@
+"""
+Bulk Feed Benchmark - 批量价格/库存更新基准测试
+对本地模拟平台服务器比较逐个SKU调用更新接口与通过 Feeds API 批量提交的耗时
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.amazon.amazon_adapter import AmazonAPIAdapter
+from api.mock.mock_server import MockPlatformServer
+from config.config import Config
+
+
+def adapter_config(**overrides) -> dict:
+    """使用默认API配置（含各端点限速），覆盖 feed 相关参数"""
+    config = dict(Config().api_config)
+    config.update(overrides)
+    return config
+
+
+async def run_per_sku(skus: int, sample: int, latency: float) -> float:
+    """按 update_pricing 的端点限速逐个更新 sample 个SKU，外推到 skus 个所需的秒数"""
+    async with MockPlatformServer(latency=latency) as server:
+        adapter = AmazonAPIAdapter("benchmark-key", base_url=server.base_url, config=adapter_config())
+        await adapter.initialize()
+        start = time.perf_counter()
+        await asyncio.gather(*(adapter.update_pricing(f"SKU-{i:05d}", 10.0 + i) for i in range(sample)))
+        elapsed = time.perf_counter() - start
+        await adapter.close()
+    rate = sample / elapsed
+    print("Per-SKU update_pricing calls")
+    print(f"  sample: {sample} SKUs in {elapsed:.2f}s ({rate:.1f} SKU/s)")
+    print(f"  extrapolated for {skus} SKUs: {skus / rate:.0f}s")
+    return skus / rate
+
+
+async def run_bulk(skus: int, chunk_size: int, latency: float, processing_delay: float) -> float:
+    """通过 bulk_update_pricing / bulk_update_inventory 更新 skus 个SKU"""
+    async with MockPlatformServer(latency=latency, feed_processing_delay=processing_delay) as server:
+        adapter = AmazonAPIAdapter("benchmark-key", base_url=server.base_url, config=adapter_config(
+            seller_id="A1BENCHMARK",
+            feed_max_messages=chunk_size,
+            feed_poll_interval=max(processing_delay / 4, 0.05)
+        ))
+        await adapter.initialize()
+        prices = {f"SKU-{i:05d}": 10.0 + i % 100 for i in range(skus)}
+        quantities = {f"SKU-{i:05d}": i % 50 for i in range(skus)}
+        # 一个无效价格和一个负库存，验证逐SKU结果
+        prices["SKU-00000"] = 0.0
+        quantities["SKU-00001"] = -1
+
+        start = time.perf_counter()
+        price_results, inventory_results = await asyncio.gather(
+            adapter.bulk_update_pricing(prices),
+            adapter.bulk_update_inventory(quantities)
+        )
+        elapsed = time.perf_counter() - start
+        await adapter.close()
+
+        price_errors = [sku for sku, result in price_results.items() if result["status"] != "accepted"]
+        inventory_errors = [sku for sku, result in inventory_results.items() if result["status"] != "accepted"]
+        applied = sum(
+            1 for sku, listing in server.listings.items()
+            if listing.get("price") == prices[sku] and listing.get("quantity") == quantities[sku]
+        )
+        print(f"Bulk feeds ({chunk_size} messages per feed, {processing_delay:.1f}s processing)")
+        print(f"  {2 * skus} updates in {elapsed:.2f}s ({2 * skus / elapsed:.0f} updates/s), "
+              f"feeds submitted: {len(server.feeds)}")
+        print(f"  per-SKU results: pricing errors {price_errors}, inventory errors {inventory_errors}")
+        print(f"  listings with both updates applied: {applied}/{skus}")
+    return elapsed
+
+
+async def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Bulk pricing/inventory feed benchmark")
+    parser.add_argument("--skus", type=int, default=10000)
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--processing-delay", type=float, default=1.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print("=" * 60)
+    print("Bulk Feed Benchmark")
+    print(f"SKUs: {args.skus}, price and inventory update per SKU, latency {args.latency * 1000:.0f}ms")
+    print("=" * 60)
+
+    per_sku = await run_per_sku(args.skus, args.sample, args.latency)
+    bulk = await run_bulk(args.skus, args.chunk_size, args.latency, args.processing_delay)
+    print(f"Pricing speedup vs per-SKU calls: {per_sku / bulk:.0f}x (bulk time includes inventory)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+JSON Decode Benchmark - 大型响应解码基准测试
+在约 50MB 的 getOrders 响应上比较标准库解码、快速后端字节解码（解码期间是否暂停垃圾回收）、类型化解码和流式解码的耗时与峰值内存，
+并通过本地模拟平台服务器端到端比较适配器的各条路径
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.amazon.amazon_adapter import AmazonAPIAdapter
+from api.amazon.amazon_models import GetOrdersResponse, Order
+from api.mock.mock_server import MockPlatformServer
+from core.tools.json_codec import JSONCodec, available_backends
+
+
+def build_response(size_mb: float) -> bytes:
+    """构造约 size_mb MB 的 getOrders 响应"""
+    sample = len(json.dumps(MockPlatformServer._order(0))) + 1
+    count = int(size_mb * 1024 * 1024 / sample)
+    return json.dumps({"payload": {"Orders": [MockPlatformServer._order(i) for i in range(count)]}}).encode()
+
+
+async def iter_chunks(data: bytes, chunk_size: int):
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def measure(name: str, run) -> None:
+    """打印 run() 的耗时和解码期间的峰值内存"""
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {name:<40} {elapsed * 1000:8.0f} ms   peak {peak / 1024 / 1024:7.1f} MB   ({result} orders)")
+
+
+def run_decode(data: bytes, chunk_size: int) -> None:
+    """解码内存中的响应字节"""
+    stdlib = JSONCodec("json")
+    fast = JSONCodec("auto")
+
+    def count_stream(codec: JSONCodec, target=None) -> int:
+        async def consume() -> int:
+            count = 0
+            async for _ in codec.iter_items(iter_chunks(data, chunk_size), ["payload", "Orders"], target):
+                count += 1
+            return count
+        return asyncio.run(consume())
+
+    print(f"Decode only ({len(data) / 1024 / 1024:.1f} MB)")
+    measure("stdlib: bytes -> str -> json.loads", lambda: len(json.loads(data.decode())["payload"]["Orders"]))
+    for codec in (JSONCodec("json", gc_pause_bytes=0), stdlib):
+        gc_mode = "gc paused" if codec.gc_pause_bytes else "gc enabled"
+        measure(f"stdlib codec: loads(bytes), {gc_mode}", lambda: len(codec.loads(data)["payload"]["Orders"]))
+    measure(f"{fast.backend}: loads(bytes), gc enabled",
+            lambda: len(JSONCodec(fast.backend, gc_pause_bytes=0).loads(data)["payload"]["Orders"]))
+    measure(f"{fast.backend}: loads(bytes), gc paused", lambda: len(fast.loads(data)["payload"]["Orders"]))
+    measure(f"typed ({fast.typed_backend}): GetOrdersResponse",
+            lambda: len(fast.loads(data, GetOrdersResponse).payload.Orders))
+    measure(f"streaming ({chunk_size // 1024} KB chunks)", lambda: count_stream(stdlib))
+    measure("streaming typed Order", lambda: count_stream(stdlib, Order))
+
+
+async def run_adapter(size_mb: float) -> None:
+    """通过模拟服务器端到端获取一页大订单响应"""
+    count = int(size_mb * 1024 * 1024 / (len(json.dumps(MockPlatformServer._order(0))) + 1))
+    async with MockPlatformServer(item_count=count, page_size=count) as server:
+        print(f"Adapter end-to-end ({count} orders in one response, includes mock server encoding)")
+        for label, backend, action in (
+            ("get_orders, stdlib backend", "json", "get"),
+            ("get_orders, auto backend", "auto", "get"),
+            ("get_orders(typed=True)", "auto", "typed"),
+            ("stream_orders()", "auto", "stream")
+        ):
+            adapter = AmazonAPIAdapter("benchmark-key", base_url=server.base_url, config={"json_backend": backend})
+            await adapter.initialize()
+            start = time.perf_counter()
+            if action == "stream":
+                received = 0
+                async for _ in adapter.stream_orders():
+                    received += 1
+            else:
+                received = len(await adapter.get_orders(typed=action == "typed"))
+            elapsed = time.perf_counter() - start
+            await adapter.close()
+            print(f"  {label:<40} {elapsed * 1000:8.0f} ms   ({received} orders)")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="JSON decode benchmark")
+    parser.add_argument("--size-mb", type=float, default=50)
+    parser.add_argument("--chunk-kb", type=int, default=64)
+    parser.add_argument("--skip-adapter", action="store_true")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print("=" * 60)
+    print("JSON Decode Benchmark")
+    print(f"Installed backends: {', '.join(available_backends())}")
+    print("=" * 60)
+
+    run_decode(build_response(args.size_mb), args.chunk_kb * 1024)
+    if not args.skip_adapter:
+        asyncio.run(run_adapter(args.size_mb))
+
+
+if __name__ == "__main__":
+    main()
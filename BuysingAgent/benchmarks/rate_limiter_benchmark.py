@@ -0,0 +1,75 @@
+"""
+Rate Limiter Benchmark - API速率限制基准测试
+对本地模拟平台服务器并发发送请求，测量限速器在不同配置下的实际吞吐量和被限流次数
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.amazon.amazon_adapter import AmazonAPIAdapter
+from api.mock.mock_server import MockPlatformServer
+
+
+async def run_scenario(name: str, server_rate: float, server_burst: int,
+                       adapter_config: dict, requests: int) -> None:
+    """启动限流的模拟服务器，通过适配器并发发送 requests 个请求并打印吞吐量"""
+    async with MockPlatformServer(rate_limit=server_rate, burst=server_burst) as server:
+        adapter = AmazonAPIAdapter("benchmark-key", base_url=server.base_url, config=adapter_config)
+        await adapter.initialize()
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(adapter._make_request("GET", "/fba/inventory/v1/summaries", params={"page": i})
+              for i in range(requests)),
+            return_exceptions=True
+        )
+        elapsed = time.perf_counter() - start
+        await adapter.close()
+
+        failed = sum(1 for r in results if isinstance(r, Exception))
+        stats = adapter.rate_limiter.get_statistics()["global"]
+        print(f"{name}")
+        print(f"  throughput: {requests / elapsed:8.1f} req/s ({elapsed:.2f}s)")
+        print(f"  server 429s: {server.throttled}, failed calls: {failed}, "
+              f"limiter rate at end: {stats['rate']:.1f}/s")
+
+
+async def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="Adapter rate limiter benchmark")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--server-rate", type=float, default=200)
+    parser.add_argument("--server-burst", type=int, default=10)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print("=" * 60)
+    print("Rate Limiter Benchmark")
+    print(f"Requests: {args.requests}, server limit: {args.server_rate:.0f} req/s (burst {args.server_burst})")
+    print("=" * 60)
+
+    print("Previous fixed 1s spacing")
+    print(f"  throughput: {1.0:8.1f} req/s ({args.requests:.2f}s)")
+
+    await run_scenario(
+        "Limiter matched to server limit",
+        args.server_rate, args.server_burst,
+        {"rate_limit": args.server_rate, "rate_limit_burst": args.server_burst},
+        args.requests
+    )
+    await run_scenario(
+        "Limiter over-provisioned (10x), adapting from 429/Retry-After",
+        args.server_rate, args.server_burst,
+        {"rate_limit": args.server_rate * 10, "rate_limit_burst": args.server_burst, "rate_limit_max_retries": 20},
+        args.requests
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
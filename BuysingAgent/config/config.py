@@ -5,6 +5,8 @@ Configuration file for the Multi-Agent Cross-Border E-commerce System
 import os
 from typing import Dict, Any
 
+from core.orchestrator.priority import DEFAULT_PRIORITY_CLASSES
+
 class Config:
     """系统配置类"""
     
@@ -28,6 +30,53 @@ class Config:
             "temu": os.getenv("TEMU_API_URL", "https://api.temu.com")
         }
         
+        self.api_config = {
+            "rate_limit": 100,
+            "rate_limit_interval": 1.0,
+            "rate_limit_burst": 10,
+            "rate_limit_max_retries": 3,
+            "rate_limit_header": "x-amzn-RateLimit-Limit",
+            "max_in_flight_requests": 10,
+            "connection_pool": "default",
+            "pool_limit": 100,
+            "pool_limit_per_host": 20,
+            "pool_keepalive_timeout": 30.0,
+            "pool_dns_cache_ttl": 300,
+            "http_connect_timeout": 10.0,
+            "http_read_timeout": 30.0,
+            "http_total_timeout": 60.0,
+            "http_retry_attempts": 3,
+            "http_retry_delay": 0.5,
+            "http_retry_max_delay": 10.0,
+            "http_retry_statuses": [500, 502, 503, 504],
+            "circuit_failure_threshold": 5,
+            "circuit_recovery_timeout": 30.0,
+            "circuit_half_open_calls": 1,
+            "response_cache_ttls": {
+                "/products/pricing/v0/price*": 60,
+                "/inventory/v1/inventory*": 30,
+                "/open_api/v1.3/trending/hashtags/*": {"ttl": 1800, "stale": 3600},
+                "/*/audience_insights": {"ttl": 3600, "stale": 86400}
+            },
+            "response_cache_stale_ttl": 30,
+            "response_cache_max_entries": 1000,
+            "json_backend": "auto",
+            "stream_chunk_size": 64 * 1024,
+            "slow_request_threshold": 2.0,
+            "slow_request_log_size": 100,
+            "seller_id": os.getenv("AMAZON_SELLER_ID", ""),
+            "feed_max_messages": 10000,
+            "feed_max_bytes": 10 * 1024 * 1024,
+            "feed_poll_interval": 30.0,
+            "feed_poll_timeout": 3600.0,
+            "endpoint_rate_limits": {
+                "/orders/v0/orders": {"rate": 0.0167, "burst": 20},
+                "/products/pricing/v0/price": {"rate": 10, "burst": 20},
+                "/feeds/2021-06-30/documents": {"rate": 0.5, "burst": 15},
+                "/feeds/2021-06-30/feeds": {"rate": 2, "burst": 15}
+            }
+        }
+        
         self.memory_config = {
             "vector_dimension": 768,
             "max_memories": 10000,
@@ -37,15 +86,72 @@ class Config:
         
         self.agent_config = {
             "max_concurrent_tasks": 10,
-            "task_timeout": 300,
-            "retry_attempts": 3,
-            "retry_delay": 5
+            "latency_ewma_alpha": 0.2,
+            "metrics_outcome_window": 100,
+            "metrics_latency_window": 60
         }
         
         self.orchestrator_config = {
             "task_queue_size": 100,
             "execution_interval": 0.1,
-            "max_execution_history": 1000
+            "max_execution_history": 1000,
+            "pool_scale_interval": 1.0,
+            "task_timeout": 300,
+            "task_timeouts": {
+                "shipment_tracking": 30,
+                "inventory_check": 30
+            },
+            "retry_attempts": 3,
+            "retry_delay": 5,
+            "retry_max_delay": 60,
+            "enable_process_pool": False,
+            "process_pool_workers": None,
+            "cpu_bound_task_types": ["bulk_sentiment_analysis"],
+            "task_archive_path": None,
+            "max_retained_tasks": 10000,
+            "retained_task_ttl": None,
+            "throughput_window": 60,
+            "hedge_task_types": ["trend_analysis", "inventory_check", "shipment_tracking"],
+            "hedge_quantile": 0.95,
+            "hedge_min_samples": 20,
+            "hedge_recompute_interval": 20,
+            "cacheable_task_types": {
+                "trend_analysis": 3600,
+                "regulation_monitoring": 86400,
+                "seo_optimization": 3600
+            },
+            "result_cache_max_entries": 10000,
+            "mailbox_size": 100,
+            "mailbox_workers": 4,
+            "mailbox_send_timeout": None,
+            "message_request_timeout": 60,
+            "shard_address": None,
+            "shard_workers": 2,
+            "shard_keys": ["sku", "customer_id", "order_id"],
+            "shard_heartbeat_interval": 1.0,
+            "shard_heartbeat_timeout": 5.0,
+            "shard_max_redispatch": 3,
+            "tracing_enabled": False,
+            "tracing_max_spans": 10000,
+            # 默认值定义在 core/orchestrator/priority.py，在此复制一份供修改
+            "priority_classes": {name: dict(options) for name, options in DEFAULT_PRIORITY_CLASSES.items()},
+            "task_type_classes": {
+                "message_response": "interactive",
+                "issue_resolution": "interactive",
+                "refund_processing": "interactive",
+                "bulk_sentiment_analysis": "batch",
+                "seo_optimization": "batch",
+                "compliance_report": "batch",
+                "regulation_monitoring": "batch"
+            },
+            "task_journal_path": None,
+            "task_journal_fsync": False,
+            "task_journal_compact_records": 1000000,
+            "idempotent_task_types": [
+                "trend_analysis", "competitor_analysis", "inventory_check", "shipment_tracking",
+                "demand_forecast", "sentiment_analysis", "bulk_sentiment_analysis",
+                "policy_check", "risk_assessment", "regulation_monitoring", "seo_optimization"
+            ]
         }
         
         self.logging_config = {
@@ -125,6 +231,7 @@ class Config:
             "env": self.env,
             "debug": self.debug,
             "api_endpoints": self.api_endpoints,
+            "api_config": self.api_config,
             "memory_config": self.memory_config,
             "agent_config": self.agent_config,
             "orchestrator_config": self.orchestrator_config,
@@ -2,6 +2,21 @@
 
 from core.agents.base_agent import BaseAgent, AgentCapability, AgentMessage
 from core.orchestrator.orchestrator import Orchestrator, Task, TaskStatus
+from core.orchestrator.scheduler import DAGScheduler, DependencyError, DependencyCycleError
+from core.orchestrator.priority import FairReadyQueue, PriorityClass
+from core.orchestrator.routing import CapabilityRegistry
+from core.orchestrator.agent_pool import AgentPool
+from core.orchestrator.executors import ProcessPoolBackend
+from core.orchestrator.task_archive import TaskArchive, JSONLTaskArchive, SQLiteTaskArchive
+from core.orchestrator.task_journal import TaskJournal
+from core.orchestrator.execution_policy import ExecutionPolicy, TaskTimeoutError, RetryableTaskError
+from core.orchestrator.hedging import HedgingPolicy
+from core.orchestrator.result_cache import TaskResultCache
+from core.orchestrator.message_bus import MessageBus, MailboxFullError, MessageBusStoppedError
+from core.orchestrator.sharding import ShardCoordinator, ShardWorker, ShardClusterAgent, ShardRing
+from core.monitoring.histogram import LatencyHistogram, WindowedHistogram
+from core.monitoring.agent_metrics import AgentPerformanceWindow
+from core.monitoring.tracing import Tracer, Span, get_tracer, set_tracer
 from core.memory.memory_layer import MemoryLayer, MemoryItem, MemoryType, VectorMemory, KnowledgeGraph
 
 __all__ = [
@@ -11,6 +26,36 @@ __all__ = [
     "Orchestrator",
     "Task",
     "TaskStatus",
+    "DAGScheduler",
+    "DependencyError",
+    "DependencyCycleError",
+    "FairReadyQueue",
+    "PriorityClass",
+    "CapabilityRegistry",
+    "AgentPool",
+    "ProcessPoolBackend",
+    "TaskArchive",
+    "JSONLTaskArchive",
+    "SQLiteTaskArchive",
+    "TaskJournal",
+    "ExecutionPolicy",
+    "TaskTimeoutError",
+    "RetryableTaskError",
+    "HedgingPolicy",
+    "TaskResultCache",
+    "MessageBus",
+    "MailboxFullError",
+    "ShardCoordinator",
+    "ShardWorker",
+    "ShardClusterAgent",
+    "ShardRing",
+    "LatencyHistogram",
+    "WindowedHistogram",
+    "AgentPerformanceWindow",
+    "Tracer",
+    "Span",
+    "get_tracer",
+    "set_tracer",
     "MemoryLayer",
     "MemoryItem",
     "MemoryType",
@@ -4,27 +4,43 @@ Base Agent Class - 所有Agent的基类
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+import itertools
 import json
 import logging
 
+from core.monitoring.tracing import get_tracer
+from core.monitoring.agent_metrics import AgentPerformanceWindow
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TASK_RESULT_SCHEMA = {"status": "str", "data": "dict"}
+
+_message_ids = itertools.count(1)
+
 
 class BaseAgent(ABC):
     """
     基础Agent类，定义了所有专业Agent必须实现的接口
+
+    子类在 TASK_HANDLERS 中登记 任务类型 -> (处理方法名, 描述, 输入参数)，
+    能力声明和 dispatch_task 的分发都由这一张表生成，两者不会不一致
     """
 
+    TASK_HANDLERS: Dict[str, Tuple[str, str, Dict[str, str]]] = {}
+
     def __init__(self, agent_id: str, name: str, role: str, config: Optional[Dict] = None):
         self.agent_id = agent_id
         self.name = name
         self.role = role
         self.config = config or {}
         self.memory = None
+        self.memory_scope = agent_id
+        self.message_bus = None
         self.tools = []
+        self.capabilities: Dict[str, 'AgentCapability'] = {}
         self.status = "idle"
         self.created_at = datetime.now()
         self.last_activity = None
@@ -34,6 +50,9 @@ class BaseAgent(ABC):
             "avg_response_time": 0,
             "success_rate": 1.0
         }
+        self.performance_window = AgentPerformanceWindow.from_config(self.config)
+        for task_type, (_, description, input_schema) in self.TASK_HANDLERS.items():
+            self.add_capability(AgentCapability(task_type, description, input_schema, TASK_RESULT_SCHEMA))
 
     @abstractmethod
     async def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
@@ -48,6 +67,22 @@ class BaseAgent(ABC):
         """
         pass
 
+    async def dispatch_task(self, task_type: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        按 TASK_HANDLERS 把任务交给对应的处理方法
+        
+        Args:
+            task_type: 任务类型
+            parameters: 任务参数
+            
+        Returns:
+            处理结果，未登记的任务类型返回错误
+        """
+        handler = self.TASK_HANDLERS.get(task_type)
+        if handler is None:
+            return {"error": f"Unknown task type: {task_type}"}
+        return await getattr(self, handler[0])(parameters)
+
     @abstractmethod
     async def think(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -78,19 +113,33 @@ class BaseAgent(ABC):
         """设置记忆层引用"""
         self.memory = memory
 
+    def set_message_bus(self, message_bus):
+        """设置消息总线引用"""
+        self.message_bus = message_bus
+
     def add_tool(self, tool):
         """添加工具到Agent"""
         self.tools.append(tool)
 
+    def add_capability(self, capability: 'AgentCapability'):
+        """声明Agent能处理的任务类型"""
+        self.capabilities[capability.name] = capability
+
+    def get_capabilities(self) -> List[str]:
+        """获取Agent能处理的任务类型列表"""
+        return list(self.capabilities)
+
     async def remember(self, key: str, value: Any):
         """存储信息到记忆层"""
         if self.memory:
-            await self.memory.store(self.agent_id, key, value)
+            with get_tracer().span("memory.store", agent_id=self.agent_id):
+                await self.memory.store(self.memory_scope, key, value)
 
     async def recall(self, key: str) -> Any:
         """从记忆层检索信息"""
         if self.memory:
-            return await self.memory.retrieve(self.agent_id, key)
+            with get_tracer().span("memory.retrieve", agent_id=self.agent_id):
+                return await self.memory.retrieve(self.memory_scope, key)
         return None
 
     async def collaborate(self, other_agent: 'BaseAgent', message: Dict[str, Any]) -> Dict[str, Any]:
@@ -105,20 +154,41 @@ class BaseAgent(ABC):
             协作结果
         """
         logger.info(f"Agent {self.name} collaborating with {other_agent.name}")
+        if self.message_bus is not None and self.message_bus.has_mailbox(other_agent.agent_id):
+            return await self.message_bus.request(self.agent_id, other_agent.agent_id, message)
         return await other_agent.process(message)
 
+    async def handle_message(self, message: 'AgentMessage') -> Optional[Dict[str, Any]]:
+        """
+        处理从邮箱收到的消息，默认将消息内容作为任务交给 process
+        
+        Args:
+            message: 收到的消息
+            
+        Returns:
+            处理结果；对 request 消息会作为 reply 发回发送方
+        """
+        return await self.process(message.content)
+
     def update_performance(self, success: bool, response_time: float):
-        """更新性能指标"""
+        """
+        更新性能指标
+        
+        avg_response_time 为EWMA响应时间，success_rate 为最近调用的成功率，
+        负载路由据此反映Agent当前而非历史平均的表现
+        
+        Args:
+            success: 调用是否成功
+            response_time: 实际耗时（秒），失败的调用同样传入实际耗时
+        """
         if success:
             self.performance_metrics["tasks_completed"] += 1
         else:
             self.performance_metrics["tasks_failed"] += 1
         
-        total_tasks = self.performance_metrics["tasks_completed"] + self.performance_metrics["tasks_failed"]
-        self.performance_metrics["success_rate"] = self.performance_metrics["tasks_completed"] / total_tasks if total_tasks > 0 else 1.0
-        
-        avg_time = self.performance_metrics["avg_response_time"]
-        self.performance_metrics["avg_response_time"] = (avg_time * (total_tasks - 1) + response_time) / total_tasks
+        self.performance_window.record(success, response_time)
+        self.performance_metrics["success_rate"] = self.performance_window.success_rate
+        self.performance_metrics["avg_response_time"] = self.performance_window.ewma_latency
 
     def get_status(self) -> Dict[str, Any]:
         """获取Agent状态"""
@@ -130,6 +200,8 @@ class BaseAgent(ABC):
             "created_at": self.created_at.isoformat(),
             "last_activity": self.last_activity.isoformat() if self.last_activity else None,
             "performance_metrics": self.performance_metrics,
+            "latency_quantiles": self.performance_window.latency_quantiles(),
+            "capabilities": self.get_capabilities(),
             "tools_count": len(self.tools)
         }
 
@@ -172,13 +244,23 @@ class AgentMessage:
     Agent间通信的消息格式
     """
 
-    def __init__(self, sender: str, receiver: str, content: Dict[str, Any], message_type: str = "request"):
+    def __init__(
+        self,
+        sender: str,
+        receiver: str,
+        content: Dict[str, Any],
+        message_type: str = "request",
+        correlation_id: Optional[str] = None,
+        topic: Optional[str] = None
+    ):
         self.sender = sender
         self.receiver = receiver
         self.content = content
         self.message_type = message_type
+        self.correlation_id = correlation_id
+        self.topic = topic
         self.timestamp = datetime.now()
-        self.id = f"{sender}_{receiver}_{self.timestamp.timestamp()}"
+        self.id = f"{sender}_{receiver}_{self.timestamp.timestamp()}_{next(_message_ids)}"
 
     def to_dict(self) -> Dict:
         return {
@@ -187,6 +269,8 @@ class AgentMessage:
             "receiver": self.receiver,
             "content": self.content,
             "message_type": self.message_type,
+            "correlation_id": self.correlation_id,
+            "topic": self.topic,
             "timestamp": self.timestamp.isoformat()
         }
 
@@ -196,5 +280,7 @@ class AgentMessage:
             sender=data["sender"],
             receiver=data["receiver"],
             content=data["content"],
-            message_type=data.get("message_type", "request")
+            message_type=data.get("message_type", "request"),
+            correlation_id=data.get("correlation_id"),
+            topic=data.get("topic")
         )
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Agent Metrics - Agent滑动窗口性能指标
+EWMA响应时间、最近N次调用的成功率和滑动窗口延迟分位数，更新均为O(1)
+"""
+
+from typing import Dict, Any, Optional
+from collections import deque
+
+from core.monitoring.histogram import WindowedHistogram
+
+
+class AgentPerformanceWindow:
+    """
+    Agent性能窗口
+
+    - EWMA响应时间：latency = alpha * sample + (1 - alpha) * latency，失败调用按实际耗时计入
+    - 成功率：最近 outcome_window 次调用中成功的比例
+    - 延迟分位数：最近 latency_window ~ 2*latency_window 秒内的直方图
+    """
+
+    def __init__(self, ewma_alpha: float = 0.2, outcome_window: int = 100, latency_window: float = 60.0):
+        self.ewma_alpha = ewma_alpha
+        self.outcomes: deque = deque(maxlen=outcome_window)
+        self.successes = 0
+        self.ewma_latency: Optional[float] = None
+        self.latencies = WindowedHistogram(latency_window)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'AgentPerformanceWindow':
+        """从Agent配置创建"""
+        return cls(
+            ewma_alpha=config.get("latency_ewma_alpha", 0.2),
+            outcome_window=config.get("metrics_outcome_window", 100),
+            latency_window=config.get("metrics_latency_window", 60.0)
+        )
+
+    def record(self, success: bool, response_time: float):
+        """记录一次调用结果"""
+        if len(self.outcomes) == self.outcomes.maxlen and self.outcomes[0]:
+            self.successes -= 1
+        self.outcomes.append(success)
+        if success:
+            self.successes += 1
+
+        if self.ewma_latency is None:
+            self.ewma_latency = response_time
+        else:
+            self.ewma_latency += self.ewma_alpha * (response_time - self.ewma_latency)
+        self.latencies.record(response_time)
+
+    @property
+    def success_rate(self) -> float:
+        """最近调用的成功率，没有调用时为 1.0"""
+        return self.successes / len(self.outcomes) if self.outcomes else 1.0
+
+    def latency_quantiles(self) -> Dict[str, Optional[float]]:
+        """窗口内的 p50/p95/p99 响应时间"""
+        p = self.latencies.snapshot().percentiles((0.5, 0.95, 0.99))
+        return {"p50": p[0.5], "p95": p[0.95], "p99": p[0.99]}
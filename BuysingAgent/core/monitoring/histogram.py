@@ -0,0 +1,200 @@
+"""
+Latency Histogram - HDR风格的延迟直方图
+对数-线性分桶，记录为O(1)，内存与样本数无关，分位数相对误差有上界
+"""
+
+from typing import Dict, Any, Iterable, Optional, Tuple
+import time
+
+
+class LatencyHistogram:
+    """
+    HDR风格延迟直方图
+
+    以微秒为整数单位记录。小于 2^significant_bits 的值精确记录；
+    更大的值按二进制数量级分段，每段 2^(significant_bits-1) 个等宽子桶，
+    分位数相对误差不超过 1/2^(significant_bits-1)（默认约1.6%）。
+    """
+
+    def __init__(self, significant_bits: int = 7, unit: float = 1e-6):
+        self.significant_bits = significant_bits
+        self.unit = unit
+        self._linear_limit = 1 << significant_bits
+        self._half = 1 << (significant_bits - 1)
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, value: int) -> int:
+        if value < self._linear_limit:
+            return value
+        shift = value.bit_length() - self.significant_bits
+        return shift * self._half + (value >> shift)
+
+    def _bounds(self, index: int) -> Tuple[int, int]:
+        """桶的 [下界, 上界]（整数单位）"""
+        if index < self._linear_limit:
+            return index, index
+        shift = (index >> (self.significant_bits - 1)) - 1
+        mantissa = index - shift * self._half
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds: float, count: int = 1):
+        """记录一次（或 count 次相同的）耗时"""
+        if seconds < 0:
+            seconds = 0.0
+        index = self._index(int(seconds / self.unit))
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += seconds * count
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        估算分位数
+
+        Args:
+            quantile: 0~1 之间的分位
+
+        Returns:
+            耗时（秒），没有样本时返回 None
+        """
+        if not self.count:
+            return None
+        rank = max(1, int(round(quantile * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = self._bounds(index)
+                value = (low + high) / 2 * self.unit
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def percentiles(self, quantiles: Iterable[float]) -> Dict[float, Optional[float]]:
+        """一次遍历估算多个分位数"""
+        wanted = sorted(quantiles)
+        result: Dict[float, Optional[float]] = {q: None for q in wanted}
+        if not self.count:
+            return result
+        seen, position = 0, 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            while position < len(wanted) and seen >= max(1, int(round(wanted[position] * self.count))):
+                low, high = self._bounds(index)
+                result[wanted[position]] = min(max((low + high) / 2 * self.unit, self.min), self.max)
+                position += 1
+            if position == len(wanted):
+                break
+        return result
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def merge(self, other: 'LatencyHistogram'):
+        """合并另一个相同精度的直方图"""
+        if other.significant_bits != self.significant_bits or other.unit != self.unit:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def reset(self):
+        """清空样本"""
+        self.counts.clear()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def summary(self) -> Dict[str, Any]:
+        """count/min/max/mean 及 p50/p90/p99"""
+        p = self.percentiles((0.5, 0.9, 0.99))
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "p50": p[0.5],
+            "p90": p[0.9],
+            "p99": p[0.99]
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化为可合并的字典"""
+        return {
+            "significant_bits": self.significant_bits,
+            "unit": self.unit,
+            "counts": {str(index): count for index, count in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencyHistogram':
+        histogram = cls(data.get("significant_bits", 7), data.get("unit", 1e-6))
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class WindowedHistogram:
+    """
+    滑动窗口延迟直方图
+
+    维护当前和上一个时间窗口两个直方图，每 window 秒轮换一次；
+    分位数基于两个窗口合并计算，覆盖最近 window ~ 2*window 秒的样本。
+    """
+
+    def __init__(self, window: float = 60.0, significant_bits: int = 7, clock=None):
+        self.window = window
+        self.significant_bits = significant_bits
+        self._clock = clock or time.monotonic
+        self.current = LatencyHistogram(significant_bits)
+        self.previous = LatencyHistogram(significant_bits)
+        self._rotated_at = self._clock()
+
+    def _rotate(self):
+        now = self._clock()
+        elapsed = now - self._rotated_at
+        if elapsed < self.window:
+            return
+        if elapsed >= 2 * self.window:
+            self.previous.reset()
+        else:
+            self.previous, self.current = self.current, self.previous
+        self.current.reset()
+        self._rotated_at = now
+
+    def record(self, seconds: float):
+        """记录一次耗时"""
+        self._rotate()
+        self.current.record(seconds)
+
+    def snapshot(self) -> LatencyHistogram:
+        """合并后的窗口直方图"""
+        self._rotate()
+        merged = LatencyHistogram(self.significant_bits)
+        merged.merge(self.previous)
+        merged.merge(self.current)
+        return merged
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """窗口内耗时的分位数"""
+        return self.snapshot().percentile(quantile)
@@ -0,0 +1,261 @@
+"""
+Tracing - 任务生命周期追踪
+记录排队等待、Agent选择、agent.process、记忆读写和适配器HTTP调用的耗时区间（span），
+按任务类型和Agent聚合为延迟直方图，可写入文件或通过 /metrics 拉取
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from collections import deque
+from contextvars import ContextVar
+import asyncio
+import json
+import logging
+import time
+
+from core.monitoring.histogram import LatencyHistogram
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 当前协程所属的任务上下文 (task_id, task_type, agent_id)，供记忆层和适配器内的 span 归属
+_trace_context: ContextVar[Tuple[Optional[str], Optional[str], Optional[str]]] = ContextVar(
+    "trace_context", default=(None, None, None)
+)
+
+
+class _NoopSpan:
+    """追踪关闭时返回的空 span"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, key: str, value: Any):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """一个计时区间"""
+
+    __slots__ = ("tracer", "name", "task_id", "task_type", "agent_id", "attributes", "start", "duration")
+
+    def __init__(self, tracer: 'Tracer', name: str, task_id: Optional[str], task_type: Optional[str],
+                 agent_id: Optional[str], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.task_id = task_id
+        self.task_type = task_type
+        self.agent_id = agent_id
+        self.attributes = attributes
+        self.start = 0.0
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.tracer.finish(self)
+        return False
+
+    def set(self, key: str, value: Any):
+        """附加属性"""
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "task_id": self.task_id,
+            "task_type": self.task_type,
+            "agent_id": self.agent_id,
+            "start": self.start,
+            "duration": self.duration,
+            "attributes": self.attributes
+        }
+
+
+class Tracer:
+    """
+    追踪器
+
+    关闭时 span() 直接返回共享的空对象，开销为一次属性判断。
+    直方图按 (span名, 任务类型) 和 (span名, Agent) 两个维度聚合；
+    最近的 span 保存在固定大小的环形缓冲区中。
+    """
+
+    def __init__(self, enabled: bool = False, max_spans: int = 10000, significant_bits: int = 7):
+        self.enabled = enabled
+        self.significant_bits = significant_bits
+        self.spans: deque = deque(maxlen=max_spans)
+        self.by_task_type: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.by_agent: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.spans_recorded = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'Tracer':
+        """从编排器配置创建追踪器"""
+        return cls(
+            enabled=config.get("tracing_enabled", False),
+            max_spans=config.get("tracing_max_spans", 10000)
+        )
+
+    def bind(self, task_id: Optional[str], task_type: Optional[str], agent_id: Optional[str] = None):
+        """设置当前协程的任务上下文，之后创建的 span 默认归属该任务"""
+        return _trace_context.set((task_id, task_type, agent_id))
+
+    def unbind(self, token):
+        """恢复 bind 之前的任务上下文"""
+        _trace_context.reset(token)
+
+    def span(self, name: str, task_id: Optional[str] = None, task_type: Optional[str] = None,
+             agent_id: Optional[str] = None, **attributes):
+        """
+        创建计时区间，用于 with 语句
+
+        Args:
+            name: span 名称，如 queue_wait、agent_selection、agent.process、memory.store、http.GET
+            task_id/task_type/agent_id: 缺省时取当前任务上下文
+            **attributes: 附加属性
+
+        Returns:
+            Span，追踪关闭时为空对象
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        context = _trace_context.get()
+        return Span(self, name, task_id or context[0], task_type or context[1],
+                    agent_id or context[2], attributes)
+
+    def record(self, name: str, duration: float, task_id: Optional[str] = None,
+               task_type: Optional[str] = None, agent_id: Optional[str] = None, **attributes):
+        """记录一个已知耗时的区间（如排队等待）"""
+        if not self.enabled:
+            return
+        span = self.span(name, task_id, task_type, agent_id, **attributes)
+        span.start = time.perf_counter() - duration
+        span.duration = duration
+        self.finish(span)
+
+    def finish(self, span: Span):
+        """聚合结束的 span"""
+        self.spans_recorded += 1
+        self.spans.append(span)
+        self._histogram(self.by_task_type, (span.name, span.task_type or "-")).record(span.duration)
+        if span.agent_id:
+            self._histogram(self.by_agent, (span.name, span.agent_id)).record(span.duration)
+
+    def _histogram(self, table: Dict[Tuple[str, str], LatencyHistogram], key: Tuple[str, str]) -> LatencyHistogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = LatencyHistogram(self.significant_bits)
+        return histogram
+
+    def get_trace(self, task_id: str) -> List[Dict[str, Any]]:
+        """获取环形缓冲区中某个任务的所有 span"""
+        return [span.to_dict() for span in self.spans if span.task_id == task_id]
+
+    def get_histograms(self) -> Dict[str, Any]:
+        """按任务类型和Agent汇总的延迟直方图 (count/min/max/mean/p50/p90/p99)"""
+        def collect(table):
+            result: Dict[str, Dict[str, Any]] = {}
+            for (name, key), histogram in table.items():
+                result.setdefault(name, {})[key] = histogram.summary()
+            return result
+        return {
+            "by_task_type": collect(self.by_task_type),
+            "by_agent": collect(self.by_agent)
+        }
+
+    def export(self, path: str):
+        """将直方图汇总和最近的 span 写入 JSON 文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "histograms": self.get_histograms(),
+                "spans": [span.to_dict() for span in self.spans]
+            }, f, ensure_ascii=False, default=str)
+
+    def render_prometheus(self) -> str:
+        """以 Prometheus 文本格式输出直方图分位数"""
+        lines = ["# TYPE buysing_span_seconds summary"]
+        for label, table in (("task_type", self.by_task_type), ("agent", self.by_agent)):
+            for (name, key), histogram in sorted(table.items()):
+                labels = f'span="{name}",{label}="{key}"'
+                p = histogram.percentiles((0.5, 0.9, 0.99))
+                for quantile, value in p.items():
+                    lines.append(f'buysing_span_seconds{{{labels},quantile="{quantile}"}} {value}')
+                lines.append(f"buysing_span_seconds_sum{{{labels}}} {histogram.total}")
+                lines.append(f"buysing_span_seconds_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    async def start_http_endpoint(self, host: str = "127.0.0.1", port: int = 9464):
+        """启动只读的拉取端点：/metrics (Prometheus 文本) 和 /histograms (JSON)"""
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                request_line = (await reader.readline()).decode("latin-1").split()
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                path = request_line[1] if len(request_line) > 1 else "/"
+                if path.startswith("/metrics"):
+                    status, content_type, body = "200 OK", "text/plain; version=0.0.4", self.render_prometheus()
+                elif path.startswith("/histograms"):
+                    status, content_type = "200 OK", "application/json"
+                    body = json.dumps(self.get_histograms(), ensure_ascii=False, default=str)
+                else:
+                    status, content_type, body = "404 Not Found", "text/plain", "not found\n"
+                payload = body.encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+            finally:
+                writer.close()
+
+        self._server = await asyncio.start_server(handle, host, port)
+        logger.info(f"Tracing endpoint listening on http://{host}:{port}/metrics")
+
+    async def stop_http_endpoint(self):
+        """关闭拉取端点"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def reset(self):
+        """清空所有 span 和直方图"""
+        self.spans.clear()
+        self.by_task_type.clear()
+        self.by_agent.clear()
+        self.spans_recorded = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取追踪器状态"""
+        return {
+            "enabled": self.enabled,
+            "spans_recorded": self.spans_recorded,
+            "spans_buffered": len(self.spans),
+            "histograms": len(self.by_task_type) + len(self.by_agent)
+        }
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """获取进程内的全局追踪器（默认关闭）"""
+    return _tracer
+
+
+def set_tracer(tracer: Tracer):
+    """替换全局追踪器，记忆层和API适配器通过 get_tracer() 取用"""
+    global _tracer
+    _tracer = tracer
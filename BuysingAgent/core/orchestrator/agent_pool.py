@@ -0,0 +1,145 @@
+"""
+Agent Pool - Agent实例池
+为同一Agent类维护多个实例，按队列深度和延迟水平扩缩容
+"""
+
+from typing import Dict, List, Any, Optional, Type
+import itertools
+import logging
+import time
+
+from core.agents.base_agent import BaseAgent
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AgentPool:
+    """
+    Agent实例池
+
+    池内实例共享同一个记忆命名空间 (memory_scope)，
+    由编排器的能力索引在实例间做负载感知分配。
+    """
+
+    def __init__(
+        self,
+        agent_class: Type[BaseAgent],
+        pool_id: Optional[str] = None,
+        min_size: int = 1,
+        max_size: int = 8,
+        agent_config: Optional[Dict] = None,
+        scale_up_load: float = 2.0,
+        scale_down_load: float = 0.5,
+        target_latency: Optional[float] = None,
+        cooldown: float = 5.0
+    ):
+        if min_size < 1 or max_size < min_size:
+            raise ValueError(f"Invalid pool size range: {min_size}..{max_size}")
+        self.agent_class = agent_class
+        self.pool_id = pool_id or agent_class.__name__
+        self.min_size = min_size
+        self.max_size = max_size
+        self.agent_config = agent_config
+        self.scale_up_load = scale_up_load
+        self.scale_down_load = scale_down_load
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.instances: Dict[str, BaseAgent] = {}
+        self._sequence = itertools.count(1)
+        self._last_scale_time = 0.0
+        self.metrics = {
+            "scale_ups": 0,
+            "scale_downs": 0,
+            "last_load": 0.0,
+            "last_queue_depth": 0
+        }
+
+    def create_instance(self) -> BaseAgent:
+        """创建一个新实例，实例共享池的记忆命名空间"""
+        agent = self.agent_class(
+            agent_id=f"{self.pool_id}_{next(self._sequence)}",
+            config=self.agent_config
+        )
+        agent.memory_scope = self.pool_id
+        self.instances[agent.agent_id] = agent
+        return agent
+
+    def remove_instance(self, agent_id: str) -> Optional[BaseAgent]:
+        """从池中移除实例"""
+        return self.instances.pop(agent_id, None)
+
+    def task_types(self) -> List[str]:
+        """池内实例能处理的任务类型"""
+        for agent in self.instances.values():
+            return agent.get_capabilities()
+        return []
+
+    def avg_response_time(self) -> float:
+        """池内实例的平均响应时间"""
+        if not self.instances:
+            return 0.0
+        return sum(a.performance_metrics["avg_response_time"] for a in self.instances.values()) / len(self.instances)
+
+    def desired_change(self, in_flight: int, queue_depth: int) -> int:
+        """
+        根据负载计算期望的实例数变化
+
+        Args:
+            in_flight: 池内实例的在途任务总数
+            queue_depth: 等待执行的同类任务数
+
+        Returns:
+            +1 扩容，-1 缩容，0 保持不变
+        """
+        size = len(self.instances)
+        load = (in_flight + queue_depth) / size if size else float("inf")
+        self.metrics["last_load"] = load
+        self.metrics["last_queue_depth"] = queue_depth
+
+        if time.monotonic() - self._last_scale_time < self.cooldown:
+            return 0
+
+        latency_breached = (
+            self.target_latency is not None
+            and load >= 1.0
+            and self.avg_response_time() > self.target_latency
+        )
+        if size < self.max_size and (load > self.scale_up_load or latency_breached):
+            return 1
+        if size > self.min_size and load < self.scale_down_load and not latency_breached:
+            return -1
+        return 0
+
+    def mark_scaled(self, change: int):
+        """记录一次扩缩容"""
+        self._last_scale_time = time.monotonic()
+        if change > 0:
+            self.metrics["scale_ups"] += 1
+        elif change < 0:
+            self.metrics["scale_downs"] += 1
+
+    def get_metrics(self, in_flight: Dict[str, int]) -> Dict[str, Any]:
+        """
+        获取池的指标
+
+        Args:
+            in_flight: 各Agent的在途任务数
+
+        Returns:
+            池指标字典
+        """
+        completed = sum(a.performance_metrics["tasks_completed"] for a in self.instances.values())
+        failed = sum(a.performance_metrics["tasks_failed"] for a in self.instances.values())
+        return {
+            "pool_id": self.pool_id,
+            "agent_class": self.agent_class.__name__,
+            "size": len(self.instances),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "in_flight": sum(in_flight.get(aid, 0) for aid in self.instances),
+            "tasks_completed": completed,
+            "tasks_failed": failed,
+            "avg_response_time": self.avg_response_time(),
+            **self.metrics
+        }
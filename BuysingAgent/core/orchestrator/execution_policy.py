@@ -0,0 +1,121 @@
+"""
+Execution Policy - 任务超时与重试策略
+按任务类型限定执行时间，对可重试的失败做带抖动的指数退避重试
+"""
+
+from typing import Dict, Any, Optional, Tuple, Type
+import random
+
+
+class TaskTimeoutError(Exception):
+    """任务执行超时"""
+
+    def __init__(self, task_id: str, timeout: float):
+        self.task_id = task_id
+        self.timeout = timeout
+        super().__init__(f"Task {task_id} timed out after {timeout}s")
+
+
+class RetryableTaskError(Exception):
+    """Agent可主动抛出的可重试错误（如平台暂时不可用）"""
+    pass
+
+
+DEFAULT_RETRYABLE_EXCEPTIONS: Tuple[Type[BaseException], ...] = (
+    TaskTimeoutError,
+    RetryableTaskError,
+    ConnectionError,
+)
+
+
+class ExecutionPolicy:
+    """
+    任务执行策略
+
+    超时通过取消 agent.process 实现；重试间隔为
+    random(0, min(max_delay, retry_delay * 2^(attempt-1)))（full jitter）。
+    """
+
+    def __init__(
+        self,
+        task_timeout: Optional[float] = 300,
+        task_timeouts: Optional[Dict[str, float]] = None,
+        retry_attempts: int = 3,
+        retry_delay: float = 5,
+        retry_max_delay: float = 60,
+        retryable_exceptions: Tuple[Type[BaseException], ...] = DEFAULT_RETRYABLE_EXCEPTIONS
+    ):
+        self.task_timeout = task_timeout
+        self.task_timeouts = task_timeouts or {}
+        self.retry_attempts = retry_attempts
+        self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self.retryable_exceptions = retryable_exceptions
+        self._random = random.Random()
+        self.metrics = {
+            "timeouts": 0,
+            "retries": 0,
+            "retries_exhausted": 0,
+            "timeouts_by_task_type": {},
+            "retries_by_task_type": {}
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ExecutionPolicy':
+        """从编排器配置创建策略"""
+        return cls(
+            task_timeout=config.get("task_timeout", 300),
+            task_timeouts=config.get("task_timeouts"),
+            retry_attempts=config.get("retry_attempts", 3),
+            retry_delay=config.get("retry_delay", 5),
+            retry_max_delay=config.get("retry_max_delay", 60)
+        )
+
+    def timeout_for(self, task_type: str) -> Optional[float]:
+        """任务类型的超时时间，None 表示不限时"""
+        return self.task_timeouts.get(task_type, self.task_timeout)
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """
+        判断失败后是否重试
+
+        Args:
+            error: 本次失败的异常
+            attempt: 已完成的尝试次数（从1开始）
+
+        Returns:
+            是否应重试
+        """
+        if not isinstance(error, self.retryable_exceptions):
+            return False
+        if attempt > self.retry_attempts:
+            self.metrics["retries_exhausted"] += 1
+            return False
+        return True
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（秒）"""
+        ceiling = min(self.retry_max_delay, self.retry_delay * (2 ** (attempt - 1)))
+        return self._random.uniform(0, ceiling)
+
+    def record_timeout(self, task_type: str):
+        """记录一次超时"""
+        self.metrics["timeouts"] += 1
+        by_type = self.metrics["timeouts_by_task_type"]
+        by_type[task_type] = by_type.get(task_type, 0) + 1
+
+    def record_retry(self, task_type: str):
+        """记录一次重试"""
+        self.metrics["retries"] += 1
+        by_type = self.metrics["retries_by_task_type"]
+        by_type[task_type] = by_type.get(task_type, 0) + 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取超时与重试统计"""
+        return {
+            "timeouts": self.metrics["timeouts"],
+            "retries": self.metrics["retries"],
+            "retries_exhausted": self.metrics["retries_exhausted"],
+            "timeouts_by_task_type": dict(self.metrics["timeouts_by_task_type"]),
+            "retries_by_task_type": dict(self.metrics["retries_by_task_type"])
+        }
@@ -0,0 +1,174 @@
+"""
+Execution Backends - 任务执行后端
+将CPU密集型任务派发到进程池，避免阻塞编排器的事件循环
+"""
+
+from typing import Dict, Any, Optional, Iterable, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import importlib
+import logging
+import os
+import time
+
+from core.agents.base_agent import BaseAgent
+from core.orchestrator.task import Task
+from core.orchestrator.execution_policy import RetryableTaskError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 工作进程内按 (Agent类路径, agent_id) 缓存的Agent实例
+_worker_agents: Dict[Tuple[str, str], BaseAgent] = {}
+
+
+def _agent_path(agent: BaseAgent) -> str:
+    """Agent类的可导入路径，如 agents.customer.customer_service_agent:CustomerServiceAgent"""
+    cls = agent.__class__
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def run_task_envelope(envelope: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    在工作进程中执行任务信封
+
+    Args:
+        envelope: 包含Agent类路径、agent_id、Agent配置和 Task.to_dict() 的字典
+
+    Returns:
+        结果信封，包含任务结果、耗时和工作进程PID
+    """
+    key = (envelope["agent_path"], envelope["agent_id"])
+    agent = _worker_agents.get(key)
+    if agent is None:
+        module_name, _, qualname = envelope["agent_path"].partition(":")
+        agent_class = getattr(importlib.import_module(module_name), qualname)
+        agent = agent_class(agent_id=envelope["agent_id"], config=envelope.get("agent_config"))
+        _worker_agents[key] = agent
+
+    task = Task.from_dict(envelope["task"])
+    start = time.perf_counter()
+    result = asyncio.run(agent.process({
+        "task_id": task.task_id,
+        "task_type": task.task_type,
+        "description": task.description,
+        "parameters": task.parameters
+    }))
+    return {
+        "task_id": task.task_id,
+        "result": result,
+        "duration": time.perf_counter() - start,
+        "worker_pid": os.getpid()
+    }
+
+
+class ProcessPoolBackend:
+    """
+    基于 ProcessPoolExecutor 的执行后端
+
+    任务以 Task.to_dict() 信封形式传入工作进程，工作进程按类路径重建Agent执行；
+    工作进程中的Agent没有记忆层，remember/recall 为空操作。
+
+    已在工作进程中执行的任务无法单独中止：调用方取消（如任务超时）时会终止整个进程池的工作进程，
+    下次派发时重建进程池，避免失控的任务继续占用CPU。同一进程池中被连带中断的其他任务
+    抛出 RetryableTaskError，由编排器的重试策略重新执行。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, cpu_bound_task_types: Optional[Iterable[str]] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cpu_bound_task_types = set(cpu_bound_task_types or [])
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.metrics = {
+            "tasks_submitted": 0,
+            "tasks_completed": 0,
+            "tasks_failed": 0,
+            "tasks_terminated": 0,
+            "pool_restarts": 0,
+            "total_duration": 0.0
+        }
+
+    def is_cpu_bound(self, task: Task) -> bool:
+        """任务是否应派发到进程池"""
+        return task.cpu_bound or task.task_type in self.cpu_bound_task_types
+
+    def start(self):
+        """启动进程池"""
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"Process pool started with {self.max_workers} workers")
+
+    async def submit(self, agent: BaseAgent, task: Task) -> Dict[str, Any]:
+        """
+        将任务派发到进程池执行
+
+        Args:
+            agent: 路由选中的Agent，工作进程中以相同类和ID重建
+            task: 要执行的任务
+
+        Returns:
+            Agent的处理结果
+        """
+        self.start()
+        envelope = {
+            "agent_path": _agent_path(agent),
+            "agent_id": agent.agent_id,
+            "agent_config": agent.config,
+            "task": task.to_dict()
+        }
+        self.metrics["tasks_submitted"] += 1
+        executor = self.executor
+        future = executor.submit(run_task_envelope, envelope)
+        try:
+            reply = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                if not future.cancel():
+                    # 任务已在工作进程中执行，只能终止工作进程
+                    self.metrics["tasks_terminated"] += 1
+                    self._terminate(executor)
+                raise
+            # 进程池因其他任务被终止而关闭，排队中的任务被取消
+            self.metrics["tasks_failed"] += 1
+            raise RetryableTaskError(f"Task {task.task_id} was dropped when the process pool was restarted")
+        except BrokenProcessPool as e:
+            self.metrics["tasks_failed"] += 1
+            raise RetryableTaskError(f"Task {task.task_id} was interrupted: {e}") from e
+        except Exception:
+            self.metrics["tasks_failed"] += 1
+            raise
+        self.metrics["tasks_completed"] += 1
+        self.metrics["total_duration"] += reply["duration"]
+        return reply["result"]
+
+    def _terminate(self, executor: ProcessPoolExecutor):
+        """终止进程池的所有工作进程，下次派发时重建进程池"""
+        if executor is self.executor:
+            self.executor = None
+        terminate_workers = getattr(executor, "terminate_workers", None)
+        if terminate_workers is not None:
+            terminate_workers()
+        else:
+            # Python 3.14 之前没有公开的终止接口，shutdown 会清空进程表，需先取出
+            processes = list((getattr(executor, "_processes", None) or {}).values())
+            executor.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+        self.metrics["pool_restarts"] += 1
+        logger.warning("Process pool workers terminated after a running task was cancelled")
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
+            logger.info("Process pool stopped")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取进程池统计信息"""
+        return {
+            "max_workers": self.max_workers,
+            "running": self.executor is not None,
+            "cpu_bound_task_types": sorted(self.cpu_bound_task_types),
+            **self.metrics
+        }
@@ -0,0 +1,131 @@
+"""
+Hedging Policy - 对冲（推测）执行策略
+只读任务在超过该类型 p95 延迟仍未返回时，向另一个Agent发出对冲请求，取先返回者
+"""
+
+from typing import Dict, Any, Optional, Iterable, List
+from collections import deque
+
+
+class HedgingPolicy:
+    """
+    对冲执行策略
+
+    为每个可对冲的任务类型保留最近的单次调用耗时，
+    对冲延迟取这些耗时的分位数（默认 p95），每新增 recompute_interval 个样本重新排序计算一次。
+    """
+
+    def __init__(
+        self,
+        task_types: Optional[Iterable[str]] = None,
+        quantile: float = 0.95,
+        min_delay: float = 0.01,
+        min_samples: int = 20,
+        window: int = 500,
+        recompute_interval: int = 20
+    ):
+        self.task_types = set(task_types or [])
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.recompute_interval = recompute_interval
+        self.latencies: Dict[str, deque] = {}
+        self._delays: Dict[str, float] = {}
+        self._new_samples: Dict[str, int] = {}
+        self.metrics = {
+            "eligible": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "primary_wins": 0,
+            "estimated_latency_saved": 0.0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'HedgingPolicy':
+        """从编排器配置创建策略"""
+        return cls(
+            task_types=config.get("hedge_task_types"),
+            quantile=config.get("hedge_quantile", 0.95),
+            min_delay=config.get("hedge_min_delay", 0.01),
+            min_samples=config.get("hedge_min_samples", 20),
+            recompute_interval=config.get("hedge_recompute_interval", 20)
+        )
+
+    def is_hedgeable(self, task_type: str) -> bool:
+        """任务类型是否允许对冲（只应配置只读任务）"""
+        return task_type in self.task_types
+
+    def record_latency(self, task_type: str, duration: float):
+        """记录一次单Agent调用的耗时"""
+        if task_type not in self.task_types:
+            return
+        samples = self.latencies.get(task_type)
+        if samples is None:
+            samples = self.latencies[task_type] = deque(maxlen=self.window)
+        samples.append(duration)
+        self._new_samples[task_type] = self._new_samples.get(task_type, 0) + 1
+
+    def percentile(self, task_type: str, quantile: float) -> Optional[float]:
+        """最近调用耗时的分位数，样本不足时返回 None"""
+        samples = self.latencies.get(task_type)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered: List[float] = sorted(samples)
+        index = min(len(ordered) - 1, int(quantile * len(ordered)))
+        return ordered[index]
+
+    def delay_for(self, task_type: str) -> Optional[float]:
+        """
+        对冲请求的发出延迟
+
+        Args:
+            task_type: 任务类型
+
+        Returns:
+            延迟秒数；不可对冲或样本不足时返回 None
+        """
+        if not self.is_hedgeable(task_type):
+            return None
+        self.metrics["eligible"] += 1
+        delay = self._delays.get(task_type)
+        if delay is None or self._new_samples.get(task_type, 0) >= self.recompute_interval:
+            delay = self.percentile(task_type, self.quantile)
+            if delay is None:
+                return None
+            self._delays[task_type] = delay
+            self._new_samples[task_type] = 0
+        return max(delay, self.min_delay)
+
+    def record_outcome(self, task_type: str, hedged: bool, hedge_won: bool, elapsed: float):
+        """
+        记录一次可对冲任务的结果
+
+        Args:
+            task_type: 任务类型
+            hedged: 是否发出了对冲请求
+            hedge_won: 是否由对冲请求胜出
+            elapsed: 从主请求发出到拿到结果的耗时
+        """
+        if not hedged:
+            return
+        self.metrics["hedged"] += 1
+        if hedge_won:
+            self.metrics["hedge_wins"] += 1
+            # 主请求在 elapsed 时仍未返回，以历史上超过 elapsed 的调用耗时均值估算其完成时间
+            tail = [d for d in self.latencies.get(task_type, ()) if d > elapsed]
+            if tail:
+                self.metrics["estimated_latency_saved"] += sum(tail) / len(tail) - elapsed
+        else:
+            self.metrics["primary_wins"] += 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取对冲统计"""
+        eligible = self.metrics["eligible"]
+        return {
+            **self.metrics,
+            "hedge_rate": self.metrics["hedged"] / eligible if eligible else 0.0,
+            "hedge_delays": {
+                task_type: self.percentile(task_type, self.quantile) for task_type in self.task_types
+            }
+        }
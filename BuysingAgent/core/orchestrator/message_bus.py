@@ -0,0 +1,285 @@
+"""
+Message Bus - Agent间异步消息总线
+每个Agent一个有界邮箱，支持点对点请求/应答、主题订阅广播和背压
+"""
+
+from typing import Dict, Any, Optional, List, Set
+import asyncio
+import logging
+
+from core.agents.base_agent import BaseAgent, AgentMessage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MailboxFullError(Exception):
+    """接收方邮箱已满且在 send_timeout 内没有空位"""
+
+    def __init__(self, receiver: str, capacity: int):
+        self.receiver = receiver
+        self.capacity = capacity
+        super().__init__(f"Mailbox of {receiver} is full (capacity={capacity})")
+
+
+class MessageBusStoppedError(Exception):
+    """消息总线已停止，不再接受消息"""
+
+    def __init__(self, receiver: str):
+        self.receiver = receiver
+        super().__init__(f"Message bus is stopped, cannot deliver to {receiver}")
+
+
+class MessageBus:
+    """
+    进程内消息总线
+
+    消息投递到接收方的有界 asyncio.Queue，由每个Agent的若干消费协程并发调用
+    agent.handle_message。request 消息的处理结果以 reply 消息（correlation_id
+    为请求ID）直接交还给等待的发送方，不经过邮箱，避免互相请求时死锁。
+    邮箱满时发送方等待（背压），超过 send_timeout 抛出 MailboxFullError。
+    未调用 start() 时首次发送会按需启动消费协程；stop() 之后发送抛出 MessageBusStoppedError，
+    直到再次 start()。
+    """
+
+    def __init__(
+        self,
+        mailbox_size: int = 100,
+        workers_per_agent: int = 4,
+        send_timeout: Optional[float] = None,
+        request_timeout: Optional[float] = 60
+    ):
+        self.mailbox_size = mailbox_size
+        self.workers_per_agent = workers_per_agent
+        self.send_timeout = send_timeout
+        self.request_timeout = request_timeout
+        self.agents: Dict[str, BaseAgent] = {}
+        self.mailboxes: Dict[str, asyncio.Queue] = {}
+        self.subscriptions: Dict[str, Set[str]] = {}
+        self.pending_replies: Dict[str, asyncio.Future] = {}
+        self._workers: Dict[str, List[asyncio.Task]] = {}
+        self.is_running = False
+        self.is_stopped = False
+        self.metrics = {
+            "sent": 0,
+            "delivered": 0,
+            "published": 0,
+            "replies": 0,
+            "undeliverable": 0,
+            "backpressure_waits": 0,
+            "send_timeouts": 0,
+            "handler_errors": 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'MessageBus':
+        """从编排器配置创建消息总线"""
+        return cls(
+            mailbox_size=config.get("mailbox_size", 100),
+            workers_per_agent=config.get("mailbox_workers", 4),
+            send_timeout=config.get("mailbox_send_timeout"),
+            request_timeout=config.get("message_request_timeout", 60)
+        )
+
+    def register(self, agent: BaseAgent):
+        """为Agent创建邮箱，总线运行中时立即启动消费协程"""
+        self.unregister(agent.agent_id)
+        self.agents[agent.agent_id] = agent
+        self.mailboxes[agent.agent_id] = asyncio.Queue(maxsize=self.mailbox_size)
+        agent.set_message_bus(self)
+        if self.is_running:
+            self._start_workers(agent.agent_id)
+
+    def unregister(self, agent_id: str):
+        """移除Agent的邮箱和订阅，未处理的消息被丢弃"""
+        if self.agents.pop(agent_id, None) is None:
+            return
+        for task in self._workers.pop(agent_id, []):
+            task.cancel()
+        mailbox = self.mailboxes.pop(agent_id)
+        while not mailbox.empty():
+            self._reject(mailbox.get_nowait(), f"Agent {agent_id} was unregistered")
+        for topic in list(self.subscriptions):
+            self.unsubscribe(agent_id, topic)
+
+    def has_mailbox(self, agent_id: str) -> bool:
+        """Agent是否已在总线上注册"""
+        return agent_id in self.mailboxes
+
+    def subscribe(self, agent_id: str, topic: str):
+        """订阅主题"""
+        self.subscriptions.setdefault(topic, set()).add(agent_id)
+
+    def unsubscribe(self, agent_id: str, topic: str):
+        """取消订阅主题"""
+        subscribers = self.subscriptions.get(topic)
+        if subscribers is not None:
+            subscribers.discard(agent_id)
+            if not subscribers:
+                del self.subscriptions[topic]
+
+    async def send(self, message: AgentMessage):
+        """
+        将消息投递到接收方邮箱
+
+        Args:
+            message: 要发送的消息
+
+        Raises:
+            KeyError: 接收方未注册
+            MailboxFullError: 邮箱在 send_timeout 内一直是满的
+            MessageBusStoppedError: 总线已停止
+        """
+        if self.is_stopped:
+            self.metrics["undeliverable"] += 1
+            raise MessageBusStoppedError(message.receiver)
+        mailbox = self.mailboxes.get(message.receiver)
+        if mailbox is None:
+            self.metrics["undeliverable"] += 1
+            raise KeyError(f"No mailbox for agent: {message.receiver}")
+        self._ensure_workers(message.receiver)
+        self.metrics["sent"] += 1
+        if not mailbox.full():
+            mailbox.put_nowait(message)
+            return
+        self.metrics["backpressure_waits"] += 1
+        try:
+            await asyncio.wait_for(mailbox.put(message), self.send_timeout)
+        except asyncio.TimeoutError:
+            self.metrics["send_timeouts"] += 1
+            raise MailboxFullError(message.receiver, self.mailbox_size) from None
+
+    async def request(
+        self,
+        sender: str,
+        receiver: str,
+        content: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        发送请求并等待应答
+
+        Args:
+            sender: 发送方Agent ID
+            receiver: 接收方Agent ID
+            content: 请求内容（通常为任务字典）
+            timeout: 等待应答的超时，默认使用 request_timeout
+
+        Returns:
+            接收方 handle_message 的返回值
+        """
+        message = AgentMessage(sender, receiver, content, message_type="request")
+        reply = asyncio.get_running_loop().create_future()
+        self.pending_replies[message.id] = reply
+        try:
+            await self.send(message)
+            return await asyncio.wait_for(reply, timeout if timeout is not None else self.request_timeout)
+        finally:
+            self.pending_replies.pop(message.id, None)
+
+    async def notify(self, sender: str, receiver: str, content: Dict[str, Any]):
+        """发送不需要应答的消息"""
+        await self.send(AgentMessage(sender, receiver, content, message_type="event"))
+
+    async def publish(self, sender: str, topic: str, content: Dict[str, Any]) -> int:
+        """
+        向主题的所有订阅者广播消息
+
+        Args:
+            sender: 发送方Agent ID
+            topic: 主题
+            content: 消息内容
+
+        Returns:
+            投递的订阅者数量
+        """
+        subscribers = [aid for aid in self.subscriptions.get(topic, ()) if aid != sender]
+        self.metrics["published"] += 1
+        await asyncio.gather(*[
+            self.send(AgentMessage(sender, aid, content, message_type="event", topic=topic))
+            for aid in subscribers
+        ])
+        return len(subscribers)
+
+    def _ensure_workers(self, agent_id: str):
+        if agent_id not in self._workers:
+            self._start_workers(agent_id)
+
+    def _start_workers(self, agent_id: str):
+        self._workers[agent_id] = [
+            asyncio.create_task(self._consume(agent_id, self.mailboxes[agent_id]))
+            for _ in range(self.workers_per_agent)
+        ]
+
+    async def _consume(self, agent_id: str, mailbox: asyncio.Queue):
+        """邮箱消费协程"""
+        while True:
+            message = await mailbox.get()
+            try:
+                await self._dispatch(message)
+            finally:
+                mailbox.task_done()
+
+    async def _dispatch(self, message: AgentMessage):
+        agent = self.agents.get(message.receiver)
+        if agent is None:
+            self._reject(message, f"Agent {message.receiver} is not registered")
+            return
+        try:
+            result = await agent.handle_message(message)
+        except asyncio.CancelledError:
+            self._reject(message, f"Agent {message.receiver} stopped before handling the message")
+            raise
+        except Exception as e:
+            self.metrics["handler_errors"] += 1
+            logger.error(f"Agent {message.receiver} failed to handle message {message.id}: {e}")
+            result = {"error": str(e)}
+        self.metrics["delivered"] += 1
+        if message.message_type == "request":
+            self._reply(message, result)
+
+    def _reply(self, request: AgentMessage, content: Any):
+        """将应答交给等待中的请求方"""
+        reply = AgentMessage(request.receiver, request.sender, content,
+                             message_type="reply", correlation_id=request.id)
+        future = self.pending_replies.get(reply.correlation_id)
+        if future is not None and not future.done():
+            self.metrics["replies"] += 1
+            future.set_result(reply.content)
+
+    def _reject(self, message: AgentMessage, reason: str):
+        self.metrics["undeliverable"] += 1
+        if message.message_type == "request":
+            self._reply(message, {"error": reason})
+
+    async def start(self):
+        """为所有已注册Agent启动消费协程"""
+        self.is_running = True
+        self.is_stopped = False
+        for agent_id in self.mailboxes:
+            self._ensure_workers(agent_id)
+
+    async def stop(self):
+        """停止所有消费协程，邮箱中未处理的请求以错误应答"""
+        self.is_running = False
+        self.is_stopped = True
+        workers = [task for tasks in self._workers.values() for task in tasks]
+        self._workers.clear()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for agent_id, mailbox in self.mailboxes.items():
+            while not mailbox.empty():
+                self._reject(mailbox.get_nowait(), f"Message bus stopped before {agent_id} handled the message")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取消息总线统计"""
+        depths = {aid: mailbox.qsize() for aid, mailbox in self.mailboxes.items()}
+        return {
+            **self.metrics,
+            "mailboxes": len(self.mailboxes),
+            "queued": sum(depths.values()),
+            "max_mailbox_depth": max(depths.values(), default=0),
+            "pending_replies": len(self.pending_replies),
+            "topics": {topic: len(subscribers) for topic, subscribers in self.subscriptions.items()}
+        }
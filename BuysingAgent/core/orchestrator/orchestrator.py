@@ -3,74 +3,35 @@ Orchestrator - 大脑层
 负责解析高级指令、任务拆解、Agent协调和执行监控
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Type, IO, Tuple
+from collections import OrderedDict, deque
 from datetime import datetime
 import asyncio
 import json
 import logging
-from enum import Enum
+import time
 
-from core.agents.base_agent import BaseAgent, AgentMessage
+from core.agents.base_agent import BaseAgent
+from core.orchestrator.task import Task, TaskStatus
+from core.orchestrator.scheduler import DAGScheduler, DependencyError, DependencyCycleError
+from core.orchestrator.priority import FairReadyQueue
+from core.orchestrator.routing import CapabilityRegistry
+from core.orchestrator.agent_pool import AgentPool
+from core.orchestrator.executors import ProcessPoolBackend
+from core.orchestrator.task_archive import TaskArchive, create_task_archive
+from core.orchestrator.task_metrics import TaskTable
+from core.orchestrator.task_journal import TaskJournal, recover_from_journal
+from core.orchestrator.execution_policy import ExecutionPolicy, TaskTimeoutError
+from core.orchestrator.hedging import HedgingPolicy
+from core.orchestrator.result_cache import TaskResultCache
+from core.orchestrator.message_bus import MessageBus
+from core.orchestrator.sharding import ShardCoordinator, ShardClusterAgent
+from core.monitoring.tracing import Tracer, set_tracer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class TaskStatus(Enum):
-    """任务状态枚举"""
-    PENDING = "pending"
-    IN_PROGRESS = "in_progress"
-    COMPLETED = "completed"
-    FAILED = "failed"
-    CANCELLED = "cancelled"
-
-
-class Task:
-    """任务类，表示一个可执行的任务单元"""
-
-    def __init__(
-        self,
-        task_id: str,
-        description: str,
-        task_type: str,
-        parameters: Dict[str, Any],
-        priority: int = 5,
-        dependencies: Optional[List[str]] = None
-    ):
-        self.task_id = task_id
-        self.description = description
-        self.task_type = task_type
-        self.parameters = parameters
-        self.priority = priority
-        self.dependencies = dependencies or []
-        self.status = TaskStatus.PENDING
-        self.assigned_agent = None
-        self.created_at = datetime.now()
-        self.started_at = None
-        self.completed_at = None
-        self.result = None
-        self.error = None
-        self.subtasks = []
-
-    def to_dict(self) -> Dict:
-        return {
-            "task_id": self.task_id,
-            "description": self.description,
-            "task_type": self.task_type,
-            "parameters": self.parameters,
-            "priority": self.priority,
-            "dependencies": self.dependencies,
-            "status": self.status.value,
-            "assigned_agent": self.assigned_agent,
-            "created_at": self.created_at.isoformat(),
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
-            "result": self.result,
-            "error": self.error,
-            "subtasks": [t.to_dict() for t in self.subtasks]
-        }
-
-
 class Orchestrator:
     """
     大脑层 - 负责协调所有Agent的工作
@@ -79,17 +40,59 @@ class Orchestrator:
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
         self.agents: Dict[str, BaseAgent] = {}
-        self.tasks: Dict[str, Task] = {}
+        self.tasks: Dict[str, Task] = TaskTable(self.config.get("throughput_window", 60))
         self.task_queue: List[Task] = []
-        self.message_bus: List[AgentMessage] = []
+        self.message_bus = MessageBus.from_config(self.config)
         self.memory = None
         self.is_running = False
-        self.execution_history = []
+        self.execution_history = deque(maxlen=self.config.get("max_execution_history", 1000))
         self.goals = []
+        self.scheduler = DAGScheduler(FairReadyQueue.from_config(self.config))
+        self.scheduler.on_release = self._release_pinned_task
+        self.scheduler.retired_status = self._retired_status
+        self.registry = CapabilityRegistry()
+        self.max_concurrent_tasks = self.config.get("max_concurrent_tasks", 10)
+        self.execution_interval = self.config.get("execution_interval", 0.1)
+        self._running_tasks: Dict[str, asyncio.Task] = {}
+        self.pools: Dict[str, AgentPool] = {}
+        self.pool_scale_interval = self.config.get("pool_scale_interval", 1.0)
+        self._last_autoscale = 0.0
+        self.process_backend: Optional[ProcessPoolBackend] = None
+        if self.config.get("enable_process_pool", False):
+            self.process_backend = ProcessPoolBackend(
+                max_workers=self.config.get("process_pool_workers"),
+                cpu_bound_task_types=self.config.get("cpu_bound_task_types")
+            )
+        self.archive: Optional[TaskArchive] = create_task_archive(self.config.get("task_archive_path"))
+        self.max_retained_tasks = self.config.get("max_retained_tasks", 10000)
+        self.retained_task_ttl = self.config.get("retained_task_ttl")
+        self._finished_tasks: "OrderedDict[str, float]" = OrderedDict()
+        self._pinned_tasks: Dict[str, float] = {}
+        self.evicted_tasks_count = 0
+        self.journal: Optional[TaskJournal] = TaskJournal.from_config(self.config)
+        self.tasks.journal = self.journal
+        self.idempotent_task_types = set(self.config.get("idempotent_task_types", []))
+        self.recovery_stats: Optional[Dict[str, Any]] = None
+        self.execution_policy = ExecutionPolicy.from_config(self.config)
+        self.hedging = HedgingPolicy.from_config(self.config)
+        self.result_cache = TaskResultCache.from_config(self.config)
+        self.tracer = Tracer.from_config(self.config)
+        if self.tracer.enabled:
+            set_tracer(self.tracer)
+        self.shard_coordinator: Optional[ShardCoordinator] = None
+        self.shard_agent: Optional[ShardClusterAgent] = None
+        if self.config.get("shard_address"):
+            self.shard_coordinator = ShardCoordinator.from_config(self.config)
+            self.shard_coordinator.on_topology_change = self._sync_shard_agent
+        if self.journal is not None:
+            # 在接受新任务之前恢复，避免日志中的入队记录与新加入的同ID任务重复
+            self.recover_tasks()
 
     def register_agent(self, agent: BaseAgent):
         """注册Agent"""
         self.agents[agent.agent_id] = agent
+        self.registry.register(agent)
+        self.message_bus.register(agent)
         agent.set_memory(self.memory)
         logger.info(f"Registered agent: {agent.name} ({agent.role})")
 
@@ -97,8 +100,107 @@ class Orchestrator:
         """注销Agent"""
         if agent_id in self.agents:
             del self.agents[agent_id]
+            self.registry.unregister(agent_id)
+            self.message_bus.unregister(agent_id)
             logger.info(f"Unregistered agent: {agent_id}")
 
+    async def create_agent_pool(self, agent_class: Type[BaseAgent], **pool_options) -> AgentPool:
+        """
+        为Agent类创建实例池，注册并初始化最小数量的实例
+        
+        Args:
+            agent_class: Agent类
+            **pool_options: AgentPool 参数（pool_id、min_size、max_size、target_latency等）
+            
+        Returns:
+            创建的实例池
+        """
+        pool = AgentPool(agent_class, **pool_options)
+        if pool.pool_id in self.pools:
+            raise ValueError(f"Agent pool already exists: {pool.pool_id}")
+        self.pools[pool.pool_id] = pool
+        for _ in range(pool.min_size):
+            agent = pool.create_instance()
+            self.register_agent(agent)
+            await agent.initialize()
+        logger.info(f"Created agent pool: {pool.pool_id} (size={pool.min_size})")
+        return pool
+
+    async def scale_pool(self, pool_id: str, change: int) -> int:
+        """
+        调整实例池大小
+        
+        Args:
+            pool_id: 池ID
+            change: 正数扩容，负数缩容（只移除空闲实例）
+            
+        Returns:
+            实际变化的实例数
+        """
+        pool = self.pools[pool_id]
+        applied = 0
+        while change > 0 and len(pool.instances) < pool.max_size:
+            agent = pool.create_instance()
+            self.register_agent(agent)
+            await agent.initialize()
+            change -= 1
+            applied += 1
+        while change < 0 and len(pool.instances) > pool.min_size:
+            idle = [aid for aid in pool.instances if self.registry.in_flight.get(aid, 0) == 0]
+            if not idle:
+                break
+            agent = pool.remove_instance(idle[-1])
+            self.unregister_agent(agent.agent_id)
+            await agent.shutdown()
+            change += 1
+            applied -= 1
+        if applied:
+            pool.mark_scaled(applied)
+            logger.info(f"Scaled agent pool {pool_id} by {applied} (size={len(pool.instances)})")
+        return applied
+
+    async def start_shard_cluster(self, agent_classes: List[Type[BaseAgent]], workers: Optional[int] = None):
+        """
+        启动分片协调器和本机工作进程，工作进程中的Agent以 ShardClusterAgent 代理参与路由
+        
+        Args:
+            agent_classes: 每个工作进程中实例化的Agent类
+            workers: 工作进程数量，默认使用 shard_workers 配置
+        """
+        if self.shard_coordinator is None:
+            raise RuntimeError("Sharding is disabled: set shard_address in the orchestrator config")
+        await self.shard_coordinator.start()
+        count = workers or self.config.get("shard_workers", 2)
+        if count:
+            self.shard_coordinator.spawn_local_workers(count, agent_classes)
+            await self.shard_coordinator.wait_for_workers(count)
+
+    def _sync_shard_agent(self):
+        """工作进程加入或离开后，按当前可处理的任务类型更新分片代理Agent"""
+        if self.shard_agent is not None:
+            self.unregister_agent(self.shard_agent.agent_id)
+            self.shard_agent = None
+        if self.shard_coordinator.workers:
+            self.shard_agent = ShardClusterAgent(self.shard_coordinator)
+            self.shard_agent.status = "ready"
+            self.register_agent(self.shard_agent)
+
+    async def autoscale_pools(self):
+        """根据队列深度和延迟对所有实例池扩缩容"""
+        if not self.pools:
+            return
+        queued = self.scheduler.ready_counts()
+        for pool in list(self.pools.values()):
+            in_flight = sum(self.registry.in_flight.get(aid, 0) for aid in pool.instances)
+            queue_depth = sum(queued.get(task_type, 0) for task_type in pool.task_types())
+            change = pool.desired_change(in_flight, queue_depth)
+            if change:
+                await self.scale_pool(pool.pool_id, change)
+
+    def get_pool_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有实例池的指标"""
+        return {pid: pool.get_metrics(self.registry.in_flight) for pid, pool in self.pools.items()}
+
     def set_memory(self, memory):
         """设置记忆层"""
         self.memory = memory
@@ -111,6 +213,9 @@ class Orchestrator:
         
         示例: "这个月我要把这款鞋在北美市场的销量提升20%"
         
+        子任务类型均为已注册Agent在 TASK_HANDLERS 中声明的能力，
+        参数按对应处理方法的输入参数给出。
+        
         Args:
             instruction: 人类的高级指令
             
@@ -127,29 +232,29 @@ class Orchestrator:
             tasks.append(Task(
                 task_id=f"task_{datetime.now().timestamp()}",
                 description="分析当前销量数据",
-                task_type="analysis",
-                parameters={"metric": "sales", "market": "north_america"},
+                task_type="trend_analysis",
+                parameters={"region": "north_america", "timeframe": "30d", "metric": "sales"},
                 priority=10
             ))
             tasks.append(Task(
                 task_id=f"task_{datetime.now().timestamp() + 1}",
                 description="制定营销策略",
-                task_type="planning",
-                parameters={"goal": "increase_sales", "target": 20},
+                task_type="content_generation",
+                parameters={"market": "north_america", "content_type": "all", "goal": "increase_sales", "target": 20},
                 priority=9
             ))
             tasks.append(Task(
                 task_id=f"task_{datetime.now().timestamp() + 2}",
                 description="执行广告投放",
-                task_type="execution",
-                parameters={"platform": "meta", "budget": "auto"},
+                task_type="ad_creation",
+                parameters={"campaign": {"objective": "conversions", "locations": ["US", "CA"]}, "platforms": ["meta"]},
                 priority=8
             ))
             tasks.append(Task(
                 task_id=f"task_{datetime.now().timestamp() + 3}",
                 description="监控和优化",
-                task_type="monitoring",
-                parameters={"kpi": "sales", "target_increase": 20},
+                task_type="ad_optimization",
+                parameters={"goals": ["maximize_roas", "minimize_cpa"], "kpi": "sales", "target_increase": 20},
                 priority=7
             ))
         
@@ -163,6 +268,9 @@ class Orchestrator:
         """
         将复杂任务拆解为子任务
         
+        营销策略任务 (content_generation) 拆解为 市场调研 -> 竞品分析 -> 策略制定，
+        子任务类型同样是Agent声明的能力。
+        
         Args:
             task: 要拆解的任务
             
@@ -173,19 +281,20 @@ class Orchestrator:
         
         subtasks = []
         
-        if task.task_type == "planning":
+        if task.task_type == "content_generation":
+            market = task.parameters.get("market", "US")
             subtasks.append(Task(
                 task_id=f"{task.task_id}_1",
                 description="市场调研",
-                task_type="research",
-                parameters={"focus": "market_trends"},
+                task_type="trend_analysis",
+                parameters={"region": market, "focus": "market_trends"},
                 priority=task.priority,
                 dependencies=[]
             ))
             subtasks.append(Task(
                 task_id=f"{task.task_id}_2",
                 description="竞品分析",
-                task_type="analysis",
+                task_type="competitor_analysis",
                 parameters={"focus": "competitors"},
                 priority=task.priority,
                 dependencies=[subtasks[0].task_id]
@@ -193,8 +302,8 @@ class Orchestrator:
             subtasks.append(Task(
                 task_id=f"{task.task_id}_3",
                 description="策略制定",
-                task_type="strategy",
-                parameters={},
+                task_type="content_generation",
+                parameters={"market": market, "content_type": task.parameters.get("content_type", "all")},
                 priority=task.priority,
                 dependencies=[subtasks[1].task_id]
             ))
@@ -210,29 +319,16 @@ class Orchestrator:
         """
         为任务找到最合适的Agent
         
+        按任务类型从能力索引中取候选Agent，再根据在途任务数、
+        平均响应时间和成功率选择预计最快完成的Agent
+        
         Args:
             task: 要分配的任务
             
         Returns:
             最合适的Agent
         """
-        task_type = task.task_type
-        
-        agent_scores = []
-        for agent in self.agents.values():
-            score = 0
-            if task_type in agent.role.lower():
-                score += 10
-            if agent.performance_metrics["success_rate"] > 0.9:
-                score += 5
-            if agent.status == "ready":
-                score += 3
-            agent_scores.append((agent, score))
-        
-        if agent_scores:
-            best_agent = max(agent_scores, key=lambda x: x[1])
-            return best_agent[0]
-        return None
+        return self.registry.select(task.task_type)
 
     async def execute_task(self, task: Task) -> Dict[str, Any]:
         """
@@ -248,91 +344,488 @@ class Orchestrator:
         
         task.status = TaskStatus.IN_PROGRESS
         task.started_at = datetime.now()
+        timeout = self.execution_policy.timeout_for(task.task_type)
+        attempt = 0
+        trace_token = self.tracer.bind(task.task_id, task.task_type)
+        if task.ready_at is not None:
+            self.tracer.record("queue_wait", time.monotonic() - task.ready_at)
         
-        agent = self.find_best_agent(task)
-        if not agent:
-            task.status = TaskStatus.FAILED
-            task.error = "No suitable agent found"
-            task.completed_at = datetime.now()
-            return {"status": "failed", "error": "No suitable agent found"}
+        try:
+            while True:
+                attempt += 1
+                with self.tracer.span("agent_selection"):
+                    agent = self.find_best_agent(task)
+                if not agent:
+                    self._finish_task(task, TaskStatus.FAILED, "No suitable agent found")
+                    return {"status": "failed", "error": "No suitable agent found"}
+                
+                task.assigned_agent = agent.agent_id
+                agent.status = "busy"
+                self.registry.acquire(agent.agent_id)
+                retry = False
+                
+                try:
+                    start_time = datetime.now()
+                    try:
+                        result, winner, cached = await asyncio.wait_for(self._invoke_cached(agent, task), timeout)
+                    except asyncio.TimeoutError:
+                        self.execution_policy.record_timeout(task.task_type)
+                        raise TaskTimeoutError(task.task_id, timeout)
+                    end_time = datetime.now()
+                    
+                except asyncio.CancelledError:
+                    agent.status = "ready"
+                    self._mark_cancelled(task)
+                    raise
+                    
+                except Exception as e:
+                    logger.error(f"Task execution failed (attempt {attempt}): {e}")
+                    agent.update_performance(False, (datetime.now() - start_time).total_seconds())
+                    agent.status = "ready"
+                    
+                    if not self.execution_policy.should_retry(e, attempt):
+                        task.status = TaskStatus.FAILED
+                        task.error = str(e)
+                        task.completed_at = datetime.now()
+                        
+                        return {"status": "failed", "error": str(e)}
+                    
+                    self.execution_policy.record_retry(task.task_type)
+                    retry = True
+                
+                finally:
+                    self.registry.release(agent.agent_id)
+                
+                if retry:
+                    # 退避等待在异常处理块之外，期间的取消同样把任务置为已取消
+                    try:
+                        await asyncio.sleep(self.execution_policy.backoff(attempt))
+                    except asyncio.CancelledError:
+                        self._mark_cancelled(task)
+                        raise
+                    continue
+                
+                response_time = (end_time - start_time).total_seconds()
+                if not cached:
+                    winner.update_performance(True, response_time)
+                
+                task.result = result
+                task.assigned_agent = winner.agent_id
+                task.status = TaskStatus.COMPLETED
+                task.completed_at = datetime.now()
+                
+                agent.status = "ready"
+                winner.last_activity = datetime.now()
+                
+                critical_path_duration, critical_path = self.scheduler.critical_path(task, response_time)
+                self.execution_history.append({
+                    "task_id": task.task_id,
+                    "agent_id": winner.agent_id,
+                    "hedged": winner is not agent,
+                    "cached": cached,
+                    "start_time": start_time.isoformat(),
+                    "end_time": end_time.isoformat(),
+                    "duration": response_time,
+                    "attempts": attempt,
+                    "critical_path_duration": critical_path_duration,
+                    "critical_path": critical_path,
+                    "status": "completed"
+                })
+                
+                return result
         
-        task.assigned_agent = agent.agent_id
-        agent.status = "busy"
+        finally:
+            self.tracer.unbind(trace_token)
+            self._retire(task)
+
+    def _mark_cancelled(self, task: Task):
+        """执行中的任务被取消（cancel_task、stop 或外层超时）"""
+        task.status = TaskStatus.CANCELLED
+        task.error = "Task cancelled"
+        task.completed_at = datetime.now()
+
+    async def _invoke_cached(self, agent: BaseAgent, task: Task) -> Tuple[Dict[str, Any], BaseAgent, bool]:
+        """
+        先查结果缓存，未命中时执行任务；并发的相同请求只执行一次
         
-        try:
-            start_time = datetime.now()
-            result = await agent.process({
-                "task_id": task.task_id,
-                "description": task.description,
-                "parameters": task.parameters
-            })
-            end_time = datetime.now()
-            
-            response_time = (end_time - start_time).total_seconds()
-            agent.update_performance(True, response_time)
-            
-            task.result = result
-            task.status = TaskStatus.COMPLETED
-            task.completed_at = datetime.now()
-            
-            agent.status = "ready"
-            agent.last_activity = datetime.now()
-            
-            self.execution_history.append({
-                "task_id": task.task_id,
-                "agent_id": agent.agent_id,
-                "start_time": start_time.isoformat(),
-                "end_time": end_time.isoformat(),
-                "duration": response_time,
-                "status": "completed"
-            })
+        Args:
+            agent: 路由选中的Agent
+            task: 要执行的任务
             
+        Returns:
+            (处理结果, 产生结果的Agent, 是否来自缓存)
+        """
+        winner = agent
+        
+        async def compute():
+            nonlocal winner
+            result, winner = await self._invoke_hedged(agent, task)
             return result
+        
+        result, cached = await self.result_cache.get_or_compute(agent, task, compute)
+        return result, winner, cached
+
+    async def _invoke_hedged(self, agent: BaseAgent, task: Task) -> Tuple[Dict[str, Any], BaseAgent]:
+        """
+        调用Agent处理任务；可对冲的只读任务在超过 p95 延迟后
+        向另一个可用Agent发出对冲请求，取先成功返回的结果并取消另一个；
+        返回 {"error": ...} 的结果不算成功，两者都失败时返回该错误结果
+        
+        Args:
+            agent: 主请求的Agent
+            task: 要执行的任务
+            
+        Returns:
+            (处理结果, 产生结果的Agent)
+        """
+        delay = self.hedging.delay_for(task.task_type)
+        started = time.perf_counter()
+        if delay is None:
+            result = await self._invoke_agent(agent, task)
+            self.hedging.record_latency(task.task_type, time.perf_counter() - started)
+            return result, agent
+        
+        calls = {asyncio.ensure_future(self._invoke_agent(agent, task)): (agent, started)}
+        backup_agent = None
+        try:
+            done, _ = await asyncio.wait(list(calls), timeout=delay)
+            if not done:
+                backup_agent = self.registry.select(task.task_type, exclude={agent.agent_id})
+                if backup_agent is not None:
+                    self.registry.acquire(backup_agent.agent_id)
+                    backup = asyncio.ensure_future(self._invoke_agent(backup_agent, task))
+                    calls[backup] = (backup_agent, time.perf_counter())
             
-        except Exception as e:
-            logger.error(f"Task execution failed: {e}")
-            agent.update_performance(False, 0)
+            error = None
+            error_result = None
+            pending = set(calls)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue
+                    if isinstance(future.result(), dict) and "error" in future.result():
+                        error_result = error_result or (future.result(), calls[future][0])
+                        continue
+                    winner, call_started = calls[future]
+                    now = time.perf_counter()
+                    self.hedging.record_latency(task.task_type, now - call_started)
+                    if winner is not agent:
+                        # 主请求被取消，其已耗时是真实延迟的下界
+                        self.hedging.record_latency(task.task_type, now - started)
+                    self.hedging.record_outcome(task.task_type, backup_agent is not None, winner is not agent, now - started)
+                    return future.result(), winner
+            if error_result is not None:
+                return error_result
+            raise error
+        
+        finally:
+            for future in calls:
+                if not future.done():
+                    future.cancel()
+            if backup_agent is not None:
+                self.registry.release(backup_agent.agent_id)
+
+    async def _invoke_agent(self, agent: BaseAgent, task: Task) -> Dict[str, Any]:
+        """调用Agent处理任务，CPU密集型任务派发到进程池"""
+        trace_token = self.tracer.bind(task.task_id, task.task_type, agent.agent_id)
+        try:
+            with self.tracer.span("agent.process"):
+                if self.process_backend is not None and self.process_backend.is_cpu_bound(task):
+                    return await self.process_backend.submit(agent, task)
+                return await agent.process({
+                    "task_id": task.task_id,
+                    "task_type": task.task_type,
+                    "description": task.description,
+                    "parameters": task.parameters
+                })
+        finally:
+            self.tracer.unbind(trace_token)
+
+    def _schedule_pending(self):
+        """将任务队列中的任务加入DAG调度器，并启动依赖已满足的任务"""
+        queued, self.task_queue = self.task_queue, []
+        for task in queued:
+            if task.status != TaskStatus.PENDING or task.task_id in self.scheduler:
+                continue
+            try:
+                self.scheduler.add(task, self.tasks)
+            except DependencyCycleError as e:
+                logger.error(str(e))
+                self._finish_task(task, TaskStatus.FAILED, str(e))
+                self._cancel_dependents(task)
+            except DependencyError as e:
+                logger.warning(str(e))
+                self._finish_task(task, TaskStatus.CANCELLED, str(e))
+                self._cancel_dependents(task)
+        self._dispatch_ready()
+
+    def _dispatch_ready(self):
+        """在并发上限内启动所有就绪任务，独立分支并行执行"""
+        while len(self._running_tasks) < self.max_concurrent_tasks:
+            task = self.scheduler.pop_ready()
+            if task is None:
+                break
+            self._running_tasks[task.task_id] = asyncio.create_task(self._run_scheduled(task))
+
+    async def _run_scheduled(self, task: Task):
+        """执行一个已调度的任务，并根据结果释放或取消下游任务"""
+        try:
+            await self.execute_task(task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._running_tasks.pop(task.task_id, None)
+        
+        if task.status == TaskStatus.COMPLETED:
+            duration = (task.completed_at - task.started_at).total_seconds()
+            self.scheduler.complete(task, duration)
+        else:
+            self._cancel_dependents(task)
+        self._dispatch_ready()
+
+    def _cancel_dependents(self, task: Task):
+        """级联取消依赖于失败或取消任务的下游任务"""
+        for dependent in self.scheduler.fail(task):
+            self._finish_task(
+                dependent,
+                TaskStatus.CANCELLED,
+                f"Dependency {task.task_id} {task.status.value}"
+            )
+
+    def _finish_task(self, task: Task, status: TaskStatus, error: Optional[str] = None):
+        """将任务置为终止状态"""
+        task.status = status
+        task.error = error
+        task.completed_at = datetime.now()
+        self._retire(task)
+
+    def _retire(self, task: Task):
+        """记录已结束的任务，写入归档并执行保留策略"""
+        if task.status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS) or task.task_id in self._finished_tasks:
+            return
+        self._finished_tasks[task.task_id] = time.monotonic()
+        if self.archive is not None:
+            self.archive.append(task)
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        """
+        按数量上限和存活时间从内存中移除已结束的任务
+        
+        仍被调度器引用（自身或下游未结束）的任务移入 _pinned_tasks 暂时保留（不计入上限），
+        调度器释放它时再移除；每个任务只被检查一次，开销与已结束任务数无关
+        """
+        now = time.monotonic()
+        while self._finished_tasks:
+            task_id, finished_at = next(iter(self._finished_tasks.items()))
+            over_limit = len(self._finished_tasks) > self.max_retained_tasks
+            expired = self.retained_task_ttl is not None and now - finished_at > self.retained_task_ttl
+            if not (over_limit or expired):
+                break
+            del self._finished_tasks[task_id]
+            if task_id in self.scheduler or task_id in self.scheduler.open_dependents:
+                self._pinned_tasks[task_id] = finished_at
+                continue
+            self.tasks.pop(task_id, None)
+            self.evicted_tasks_count += 1
+
+    def _release_pinned_task(self, task_id: str):
+        """调度器不再引用该任务时，移除因被依赖而暂留的任务"""
+        if self._pinned_tasks.pop(task_id, None) is not None:
+            self.tasks.pop(task_id, None)
+            self.evicted_tasks_count += 1
+
+    def _retired_status(self, task_id: str) -> Optional[TaskStatus]:
+        """
+        查询已移出内存的任务的最终状态
+        
+        Args:
+            task_id: 任务ID
             
-            task.status = TaskStatus.FAILED
-            task.error = str(e)
-            task.completed_at = datetime.now()
+        Returns:
+            归档中记录的状态；未配置归档或查不到时返回 None
+        """
+        if self.archive is None:
+            return None
+        archived = self.archive.get_task(task_id)
+        return TaskStatus(archived["status"]) if archived else None
+
+    def export_execution_history(self, stream: IO[str]) -> int:
+        """
+        以 JSONL 格式流式导出执行历史
+        
+        Args:
+            stream: 可写文本流
             
-            agent.status = "ready"
+        Returns:
+            导出的记录数
+        """
+        count = 0
+        for entry in list(self.execution_history):
+            stream.write(json.dumps(entry, ensure_ascii=False, default=str))
+            stream.write("\n")
+            count += 1
+        return count
+
+    def cancel_task(self, task_id: str) -> bool:
+        """
+        取消任务，并级联取消其下游任务
+        
+        Args:
+            task_id: 任务ID
             
-            return {"status": "failed", "error": str(e)}
+        Returns:
+            是否成功取消
+        """
+        task = self.tasks.get(task_id)
+        if task is None or task.status not in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS):
+            return False
+        
+        running = self._running_tasks.get(task_id)
+        if running is not None and task.status == TaskStatus.IN_PROGRESS:
+            running.cancel()
+            return True
+        if running is not None:
+            running.cancel()
+            self._running_tasks.pop(task_id, None)
+        
+        self._finish_task(task, TaskStatus.CANCELLED, "Task cancelled")
+        self._cancel_dependents(task)
+        self._dispatch_ready()
+        return True
+
+    def recover_tasks(self) -> Dict[str, Any]:
+        """
+        从任务日志恢复上次运行中未结束的任务并重新入队
+        
+        配置了 task_journal_path 时在构造编排器时自动调用。
+        中断时正在执行的任务只有属于 idempotent_task_types 才会重新执行，
+        其余标记为失败；依赖已失败或取消的任务标记为取消；已在任务表中的任务ID不会被日志中的记录替换。
+        恢复后日志被压缩为只包含未结束任务的入队记录
+        
+        Returns:
+            恢复统计（记录数、重新入队数、失败数、取消数、跳过的重复任务数、耗时）
+        """
+        if self.journal is None:
+            raise RuntimeError("Task journal is disabled: set task_journal_path in the orchestrator config")
+        requeued, failed, stats = recover_from_journal(self.journal, self.idempotent_task_types)
+        stats["duplicates_skipped"] = 0
+        self.journal.suspended = True
+        try:
+            for task in requeued + failed:
+                if task.task_id in self.tasks:
+                    stats["duplicates_skipped"] += 1
+                    continue
+                self.tasks[task.task_id] = task
+                if task.status == TaskStatus.PENDING:
+                    self.task_queue.append(task)
+                else:
+                    self._retire(task)
+        finally:
+            self.journal.suspended = False
+        self._compact_journal()
+        self.recovery_stats = stats
+        logger.info(f"Recovered {stats['requeued']} tasks from journal ({stats['failed']} interrupted tasks failed)")
+        return stats
+
+    def _flush_journal(self):
+        """将任务日志写入文件，记录数超过阈值时压缩"""
+        if self.journal is None:
+            return
+        if self.journal.needs_compaction():
+            self._compact_journal()
+        else:
+            self.journal.flush()
+
+    def _compact_journal(self):
+        live = [t for t in self.tasks.values() if t.status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)]
+        self.journal.compact(live, self.tasks)
 
     async def run(self):
         """运行Orchestrator主循环"""
         self.is_running = True
+        await self.message_bus.start()
         logger.info("Orchestrator started")
         
         while self.is_running:
-            if self.task_queue:
-                task = self.task_queue.pop(0)
-                
-                if task.status == TaskStatus.PENDING:
-                    await self.execute_task(task)
-            
-            await asyncio.sleep(0.1)
+            self._schedule_pending()
+            self._flush_journal()
+            if time.monotonic() - self._last_autoscale >= self.pool_scale_interval:
+                self._last_autoscale = time.monotonic()
+                await self.autoscale_pools()
+                self._dispatch_ready()
+            await asyncio.sleep(self.execution_interval)
+
+    async def run_until_complete(self):
+        """执行队列中的所有任务，直到没有就绪或执行中的任务"""
+        self._schedule_pending()
+        while self._running_tasks:
+            await asyncio.gather(*list(self._running_tasks.values()), return_exceptions=True)
+            self._schedule_pending()
+            self._flush_journal()
 
     async def stop(self):
         """停止Orchestrator"""
         self.is_running = False
+        await self.message_bus.stop()
+        if self.shard_coordinator is not None:
+            await self.shard_coordinator.stop()
+        if self.process_backend is not None:
+            await asyncio.to_thread(self.process_backend.shutdown)
+        if self.archive is not None:
+            self.archive.close()
+        if self.journal is not None:
+            self.journal.close()
         logger.info("Orchestrator stopped")
 
-    def get_system_status(self) -> Dict[str, Any]:
-        """获取系统状态"""
-        return {
+    def get_latency_histograms(self) -> Dict[str, Any]:
+        """按任务类型和Agent汇总的各阶段延迟分位数（需开启 tracing_enabled）"""
+        return self.tracer.get_histograms()
+
+    def get_system_status(self, include_agents: bool = False) -> Dict[str, Any]:
+        """
+        获取系统状态
+        
+        任务计数由状态变更钩子增量维护，查询为O(1)
+        
+        Args:
+            include_agents: 是否包含每个Agent的详细状态
+            
+        Returns:
+            系统状态字典
+        """
+        status = {
             "is_running": self.is_running,
             "agents_count": len(self.agents),
+            "agents_busy": self.registry.busy_agents,
             "tasks_total": len(self.tasks),
-            "tasks_pending": len([t for t in self.tasks.values() if t.status == TaskStatus.PENDING]),
-            "tasks_in_progress": len([t for t in self.tasks.values() if t.status == TaskStatus.IN_PROGRESS]),
-            "tasks_completed": len([t for t in self.tasks.values() if t.status == TaskStatus.COMPLETED]),
-            "tasks_failed": len([t for t in self.tasks.values() if t.status == TaskStatus.FAILED]),
+            "tasks_pending": self.tasks.count(TaskStatus.PENDING),
+            "tasks_in_progress": self.tasks.count(TaskStatus.IN_PROGRESS),
+            "tasks_completed": self.tasks.count(TaskStatus.COMPLETED),
+            "tasks_failed": self.tasks.count(TaskStatus.FAILED),
+            "tasks_cancelled": self.tasks.count(TaskStatus.CANCELLED),
+            "tasks_in_flight": self.registry.total_in_flight,
+            **self.tasks.get_statistics(),
             "execution_history_count": len(self.execution_history),
-            "agents": {aid: agent.get_status() for aid, agent in self.agents.items()}
+            "tasks_evicted": self.evicted_tasks_count,
+            "tasks_archived": self.archive.archived_count if self.archive else 0,
+            "pools": self.get_pool_metrics(),
+            "process_pool": self.process_backend.get_statistics() if self.process_backend else None,
+            "execution_policy": self.execution_policy.get_statistics(),
+            "hedging": self.hedging.get_statistics(),
+            "result_cache": self.result_cache.get_statistics(),
+            "message_bus": self.message_bus.get_statistics(),
+            "sharding": self.shard_coordinator.get_statistics() if self.shard_coordinator else None,
+            "tracing": self.tracer.get_statistics(),
+            "priority_classes": self.scheduler.ready.get_statistics(),
+            "journal": self.journal.get_statistics() if self.journal else None
         }
+        if include_agents:
+            status["agents"] = {aid: agent.get_status() for aid, agent in self.agents.items()}
+            status["agents_in_flight"] = dict(self.registry.in_flight)
+        return status
 
     async def set_goal(self, goal: Dict[str, Any]):
         """
@@ -0,0 +1,187 @@
+"""
+Priority Classes - 优先级分类与加权公平队列
+就绪任务按优先级类排队，类之间按权重公平出队（stride调度），
+等待超过 max_wait 的任务被提前调度以避免饿死，并限制每类的并发数
+"""
+
+from typing import Dict, Any, Optional, List, Iterator
+from collections import deque
+import time
+
+from core.orchestrator.task import Task
+from core.monitoring.histogram import LatencyHistogram
+
+DEFAULT_PRIORITY_CLASSES: Dict[str, Dict[str, Any]] = {
+    "interactive": {"weight": 8, "min_priority": 8, "max_wait": 1.0},
+    "standard": {"weight": 4, "min_priority": 4, "max_wait": 10.0},
+    "batch": {"weight": 1, "min_priority": 0, "max_wait": 60.0, "max_concurrent": 4},
+}
+
+
+class PriorityClass:
+    """
+    优先级类
+
+    Args:
+        name: 类名
+        weight: 公平队列权重，出队机会与权重成正比
+        min_priority: 未显式指定类的任务按 Task.priority 归入 min_priority 不超过它的最高类
+        max_wait: 队首任务等待超过该秒数时优先出队（老化）
+        max_concurrent: 该类同时执行的任务上限，None 表示不限
+    """
+
+    def __init__(self, name: str, weight: float = 1, min_priority: int = 0,
+                 max_wait: Optional[float] = None, max_concurrent: Optional[int] = None):
+        self.name = name
+        self.weight = weight
+        self.min_priority = min_priority
+        self.max_wait = max_wait
+        self.max_concurrent = max_concurrent
+        self.queue: deque = deque()
+        self.depth = 0
+        self.running = 0
+        self.pass_value = 0.0
+        self.dispatched = 0
+        self.aged = 0
+        self.queue_wait = LatencyHistogram()
+        self.sojourn = LatencyHistogram()
+
+    def saturated(self) -> bool:
+        return self.max_concurrent is not None and self.running >= self.max_concurrent
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "weight": self.weight,
+            "queued": self.depth,
+            "running": self.running,
+            "max_concurrent": self.max_concurrent,
+            "dispatched": self.dispatched,
+            "aged": self.aged,
+            "queue_wait": self.queue_wait.summary(),
+            "latency": self.sojourn.summary()
+        }
+
+
+class FairReadyQueue:
+    """
+    加权公平就绪队列
+
+    每类一个FIFO；出队时先检查各类队首是否超过 max_wait（取等待最久的），
+    否则选择未达并发上限且 pass 值最小的类，出队后 pass += 1/weight。
+    类从空变为非空时 pass 提升到当前全局虚拟时间，不能积攒空闲期的份额。
+    """
+
+    def __init__(self, classes: Optional[Dict[str, Dict[str, Any]]] = None,
+                 task_type_classes: Optional[Dict[str, str]] = None):
+        self.classes: Dict[str, PriorityClass] = {
+            name: PriorityClass(name, **options)
+            for name, options in (classes or DEFAULT_PRIORITY_CLASSES).items()
+        }
+        self._by_priority: List[PriorityClass] = sorted(
+            self.classes.values(), key=lambda c: c.min_priority, reverse=True
+        )
+        self.task_type_classes = task_type_classes or {}
+        self._queued: Dict[str, PriorityClass] = {}
+        self._running: Dict[str, PriorityClass] = {}
+        self._virtual_time = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'FairReadyQueue':
+        """从编排器配置创建队列"""
+        return cls(
+            classes=config.get("priority_classes"),
+            task_type_classes=config.get("task_type_classes")
+        )
+
+    def classify(self, task: Task) -> PriorityClass:
+        """确定任务所属的优先级类：Task.priority_class > task_type_classes > Task.priority"""
+        name = task.priority_class or self.task_type_classes.get(task.task_type)
+        if name in self.classes:
+            return self.classes[name]
+        for priority_class in self._by_priority:
+            if task.priority >= priority_class.min_priority:
+                return priority_class
+        return self._by_priority[-1]
+
+    def push(self, task: Task):
+        """任务进入就绪状态"""
+        priority_class = self.classify(task)
+        if priority_class.depth == 0:
+            priority_class.pass_value = max(priority_class.pass_value, self._virtual_time)
+        priority_class.queue.append(task)
+        priority_class.depth += 1
+        self._queued[task.task_id] = priority_class
+
+    def discard(self, task_id: str):
+        """移除排队中的任务（被级联取消时），队列中的残留项在出队时跳过"""
+        priority_class = self._queued.pop(task_id, None)
+        if priority_class is not None:
+            priority_class.depth -= 1
+
+    def pop(self) -> Optional[Task]:
+        """按老化和加权公平规则取出下一个任务，所有类都为空或已达并发上限时返回 None"""
+        now = time.monotonic()
+        chosen: Optional[PriorityClass] = None
+        oldest: Optional[float] = None
+        for priority_class in self.classes.values():
+            head = self._head(priority_class)
+            if head is None or priority_class.saturated() or priority_class.max_wait is None:
+                continue
+            ready_at = head.ready_at if head.ready_at is not None else now
+            if now - ready_at > priority_class.max_wait and (oldest is None or ready_at < oldest):
+                chosen, oldest = priority_class, ready_at
+        aged = chosen is not None
+        if chosen is None:
+            for priority_class in self.classes.values():
+                if self._head(priority_class) is None or priority_class.saturated():
+                    continue
+                if chosen is None or priority_class.pass_value < chosen.pass_value:
+                    chosen = priority_class
+        if chosen is None:
+            return None
+
+        task = chosen.queue.popleft()
+        del self._queued[task.task_id]
+        chosen.depth -= 1
+        self._virtual_time = max(self._virtual_time, chosen.pass_value)
+        chosen.pass_value += 1 / chosen.weight
+        chosen.running += 1
+        chosen.dispatched += 1
+        if aged:
+            chosen.aged += 1
+        if task.ready_at is not None:
+            chosen.queue_wait.record(now - task.ready_at)
+        self._running[task.task_id] = chosen
+        return task
+
+    def _head(self, priority_class: PriorityClass) -> Optional[Task]:
+        """队首的有效任务，顺带清理已被移除的残留项"""
+        queue = priority_class.queue
+        while queue and self._queued.get(queue[0].task_id) is not priority_class:
+            queue.popleft()
+        return queue[0] if queue else None
+
+    def release(self, task: Task):
+        """任务执行结束，释放所属类的并发名额"""
+        priority_class = self._running.pop(task.task_id, None)
+        if priority_class is None:
+            return
+        priority_class.running -= 1
+        if task.ready_at is not None:
+            priority_class.sojourn.record(time.monotonic() - task.ready_at)
+
+    def __iter__(self) -> Iterator[Task]:
+        for priority_class in self.classes.values():
+            for task in priority_class.queue:
+                if self._queued.get(task.task_id) is priority_class:
+                    yield task
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __bool__(self) -> bool:
+        return bool(self._queued)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """按优先级类统计排队深度、并发、排队等待和总延迟"""
+        return {name: priority_class.get_statistics() for name, priority_class in self.classes.items()}
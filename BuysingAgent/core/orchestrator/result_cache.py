@@ -0,0 +1,154 @@
+"""
+Task Result Cache - 幂等任务的结果缓存
+按 (Agent类, 任务类型, 规范化参数) 缓存结果，支持按任务类型的TTL和并发请求合并
+"""
+
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+from collections import OrderedDict
+import asyncio
+import copy
+import json
+import logging
+import time
+
+from core.agents.base_agent import BaseAgent
+from core.orchestrator.task import Task
+from core.orchestrator.execution_policy import RetryableTaskError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+
+class TaskResultCache:
+    """
+    任务结果缓存
+
+    只缓存 ttls 中配置的任务类型；结果中包含 "error" 的不缓存。
+    同一键的并发请求只执行一次，其余请求等待同一个结果（single-flight）。
+    缓存保存结果的副本，命中和合并的请求各自得到一份副本，调用方修改结果不影响缓存和其他调用方。
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_entries: int = 10000):
+        self.ttls = ttls or {}
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[CacheKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.in_flight: Dict[CacheKey, asyncio.Future] = {}
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "expired": 0,
+            "evictions": 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'TaskResultCache':
+        """从编排器配置创建缓存"""
+        return cls(
+            ttls=config.get("cacheable_task_types"),
+            max_entries=config.get("result_cache_max_entries", 10000)
+        )
+
+    def ttl_for(self, task_type: str) -> Optional[float]:
+        """任务类型的缓存时间，None 表示不缓存"""
+        return self.ttls.get(task_type)
+
+    @staticmethod
+    def make_key(agent: BaseAgent, task: Task) -> CacheKey:
+        """生成缓存键，参数按键排序后序列化以保证等价参数得到同一个键"""
+        parameters = json.dumps(task.parameters, sort_keys=True, separators=(",", ":"), default=str)
+        return (agent.__class__.__name__, task.task_type, parameters)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """读取未过期的缓存结果"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            self.metrics["expired"] += 1
+            return None
+        self.entries.move_to_end(key)
+        return result
+
+    def put(self, key: CacheKey, result: Dict[str, Any], ttl: float):
+        """写入缓存，超过容量时淘汰最久未使用的条目"""
+        self.entries[key] = (time.monotonic() + ttl, result)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    async def get_or_compute(
+        self,
+        agent: BaseAgent,
+        task: Task,
+        compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        读取缓存或执行计算
+
+        Args:
+            agent: 路由选中的Agent
+            task: 要执行的任务
+            compute: 缓存未命中时执行的协程函数
+
+        Returns:
+            (任务结果, 是否来自缓存或合并的并发请求)
+        """
+        ttl = self.ttl_for(task.task_type)
+        if ttl is None:
+            return await compute(), False
+
+        key = self.make_key(agent, task)
+        result = self.get(key)
+        if result is not None:
+            self.metrics["hits"] += 1
+            return copy.deepcopy(result), True
+
+        shared = self.in_flight.get(key)
+        if shared is not None:
+            self.metrics["coalesced"] += 1
+            return copy.deepcopy(await asyncio.shield(shared)), True
+
+        self.metrics["misses"] += 1
+        shared = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = shared
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            shared.set_exception(RetryableTaskError(f"Coalesced request for {task.task_type} was cancelled"))
+            raise
+        except Exception as e:
+            shared.set_exception(e)
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+            if shared.done() and shared.exception() is not None:
+                # 避免无人等待时的 "exception was never retrieved" 警告
+                shared.exception()
+
+        if isinstance(value, dict) and "error" not in value:
+            self.put(key, copy.deepcopy(value), ttl)
+        shared.set_result(copy.deepcopy(value))
+        return value, False
+
+    def invalidate(self, task_type: Optional[str] = None):
+        """清除缓存，可按任务类型清除"""
+        if task_type is None:
+            self.entries.clear()
+            return
+        for key in [k for k in self.entries if k[1] == task_type]:
+            del self.entries[key]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取缓存命中统计"""
+        lookups = self.metrics["hits"] + self.metrics["coalesced"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "entries": len(self.entries),
+            "hit_rate": (self.metrics["hits"] + self.metrics["coalesced"]) / lookups if lookups else 0.0
+        }
@@ -0,0 +1,115 @@
+"""
+Capability Registry - Agent能力索引与负载感知路由
+按任务类型索引Agent，结合在途任务数和平均响应时间选择Agent
+"""
+
+from typing import Dict, List, Optional, Iterable, Set
+import logging
+
+from core.agents.base_agent import BaseAgent
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CapabilityRegistry:
+    """
+    任务类型 -> Agent 的能力索引
+
+    候选Agent查找为O(1)；只有声明了该任务类型的Agent才是候选，
+    没有Agent声明的任务类型不会被派发给无法处理它的Agent。
+    """
+
+    def __init__(self, min_response_time: float = 0.001):
+        self.by_task_type: Dict[str, Dict[str, BaseAgent]] = {}
+        self.agents: Dict[str, BaseAgent] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.total_in_flight = 0
+        self.busy_agents = 0
+        self.min_response_time = min_response_time
+
+    def register(self, agent: BaseAgent):
+        """根据Agent声明的能力建立索引"""
+        self.unregister(agent.agent_id)
+        self.agents[agent.agent_id] = agent
+        self.in_flight.setdefault(agent.agent_id, 0)
+        for task_type in agent.get_capabilities():
+            self.by_task_type.setdefault(task_type, {})[agent.agent_id] = agent
+
+    def unregister(self, agent_id: str):
+        """从索引中移除Agent"""
+        agent = self.agents.pop(agent_id, None)
+        if agent is None:
+            return
+        in_flight = self.in_flight.pop(agent_id, 0)
+        self.total_in_flight -= in_flight
+        if in_flight:
+            self.busy_agents -= 1
+        for task_type in agent.get_capabilities():
+            candidates = self.by_task_type.get(task_type)
+            if candidates is not None:
+                candidates.pop(agent_id, None)
+                if not candidates:
+                    del self.by_task_type[task_type]
+
+    def candidates(self, task_type: str) -> Iterable[BaseAgent]:
+        """
+        获取能处理该任务类型的Agent
+
+        Args:
+            task_type: 任务类型
+
+        Returns:
+            候选Agent；没有Agent声明该类型时为空
+        """
+        indexed = self.by_task_type.get(task_type)
+        return indexed.values() if indexed else ()
+
+    def load_score(self, agent: BaseAgent) -> float:
+        """预计完成时间评分，越低越好"""
+        metrics = agent.performance_metrics
+        response_time = max(metrics["avg_response_time"], self.min_response_time)
+        success_rate = max(metrics["success_rate"], 0.1)
+        return (self.in_flight.get(agent.agent_id, 0) + 1) * response_time / success_rate
+
+    def select(self, task_type: str, exclude: Optional[Set[str]] = None) -> Optional[BaseAgent]:
+        """
+        为任务类型选择负载最低的Agent
+
+        Args:
+            task_type: 任务类型
+            exclude: 需要排除的Agent ID
+
+        Returns:
+            选中的Agent，没有可用Agent时返回None
+        """
+        best_agent, best_score = None, None
+        for agent in self.candidates(task_type):
+            if agent.status == "stopped" or (exclude and agent.agent_id in exclude):
+                continue
+            score = self.load_score(agent)
+            if best_score is None or score < best_score:
+                best_agent, best_score = agent, score
+        return best_agent
+
+    def acquire(self, agent_id: str):
+        """记录Agent新增一个在途任务"""
+        if agent_id not in self.agents:
+            return
+        in_flight = self.in_flight.get(agent_id, 0)
+        if in_flight == 0:
+            self.busy_agents += 1
+        self.in_flight[agent_id] = in_flight + 1
+        self.total_in_flight += 1
+
+    def release(self, agent_id: str):
+        """记录Agent完成一个在途任务"""
+        if self.in_flight.get(agent_id, 0) > 0:
+            self.in_flight[agent_id] -= 1
+            self.total_in_flight -= 1
+            if self.in_flight[agent_id] == 0:
+                self.busy_agents -= 1
+
+    def get_task_types(self) -> List[str]:
+        """获取所有已索引的任务类型"""
+        return list(self.by_task_type)
@@ -0,0 +1,244 @@
+"""
+DAG Scheduler - 依赖感知的任务调度器
+按入度跟踪任务依赖，依赖完成后立即释放下游任务，并记录关键路径耗时
+"""
+
+from typing import Dict, List, Optional, Set, Tuple, Callable
+from collections import deque
+import logging
+import time
+
+from core.orchestrator.task import Task, TaskStatus
+from core.orchestrator.priority import FairReadyQueue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class DependencyError(Exception):
+    """任务依赖无法满足"""
+
+    def __init__(self, task_id: str, dependency: str, reason: str):
+        self.task_id = task_id
+        self.dependency = dependency
+        super().__init__(f"Task {task_id} cannot run: dependency {dependency} {reason}")
+
+
+class DependencyCycleError(Exception):
+    """任务依赖存在环"""
+
+    def __init__(self, cycle: List[str]):
+        self.cycle = cycle
+        super().__init__(f"Dependency cycle detected: {' -> '.join(cycle)}")
+
+
+class DAGScheduler:
+    """
+    基于入度的DAG调度器
+
+    只跟踪尚未结束的任务；已完成任务仅保留关键路径信息，
+    并在其所有下游任务结束后释放。任务ID不再被调度器引用时调用 on_release。
+    依赖已不在 known_tasks 中（已按保留策略移出内存）时，通过 retired_status 查询其最终状态：
+    已完成视为满足，失败或取消同样拒绝。
+    """
+
+    def __init__(self, ready_queue: Optional[FairReadyQueue] = None):
+        self.nodes: Dict[str, Task] = {}
+        self.in_degree: Dict[str, int] = {}
+        self.dependents: Dict[str, List[str]] = {}
+        self.ready = ready_queue if ready_queue is not None else FairReadyQueue()
+        self.running: Set[str] = set()
+        self.path_costs: Dict[str, Tuple[float, List[str]]] = {}
+        self.open_dependents: Dict[str, int] = {}
+        self.on_release: Optional[Callable[[str], None]] = None
+        self.retired_status: Optional[Callable[[str], Optional[TaskStatus]]] = None
+
+    def add(self, task: Task, known_tasks: Dict[str, Task]):
+        """
+        加入任务并计算其入度
+
+        Args:
+            task: 待调度的任务
+            known_tasks: 编排器已知的全部任务，用于判断依赖状态
+
+        Raises:
+            DependencyError: 依赖已失败、已取消，或既不存在也查不到其退休前的状态
+            DependencyCycleError: 加入后形成依赖环
+        """
+        pending = []
+        for dep in task.dependencies:
+            if dep in self.nodes:
+                pending.append(dep)
+                continue
+            dep_task = known_tasks.get(dep)
+            if dep_task is None:
+                status = self.retired_status(dep) if self.retired_status is not None else None
+                if status is None:
+                    raise DependencyError(task.task_id, dep, "is unknown or retired")
+                if status != TaskStatus.COMPLETED:
+                    raise DependencyError(task.task_id, dep, f"is {status.value} (retired)")
+                continue
+            if dep_task.status in (TaskStatus.FAILED, TaskStatus.CANCELLED):
+                raise DependencyError(task.task_id, dep, f"is {dep_task.status.value}")
+            if dep_task.status != TaskStatus.COMPLETED:
+                # 依赖尚未进入调度器，等待其加入并完成
+                pending.append(dep)
+
+        cycle = self._find_cycle(task.task_id, pending)
+        if cycle:
+            raise DependencyCycleError(cycle)
+
+        self.nodes[task.task_id] = task
+        self.in_degree[task.task_id] = len(pending)
+        for dep in pending:
+            self.dependents.setdefault(dep, []).append(task.task_id)
+        for dep in task.dependencies:
+            self.open_dependents[dep] = self.open_dependents.get(dep, 0) + 1
+
+        if not pending:
+            task.ready_at = time.monotonic()
+            self.ready.push(task)
+
+    def _find_cycle(self, task_id: str, pending: List[str]) -> Optional[List[str]]:
+        """从新任务的未完成依赖出发，检查是否能回到新任务本身"""
+        stack = [(dep, [task_id, dep]) for dep in pending]
+        visited = set()
+        while stack:
+            node, path = stack.pop()
+            if node == task_id:
+                return path
+            if node in visited or node not in self.nodes:
+                continue
+            visited.add(node)
+            for dep in self.nodes[node].dependencies:
+                stack.append((dep, path + [dep]))
+        return None
+
+    def pop_ready(self) -> Optional[Task]:
+        """按优先级类公平取出一个依赖已满足的任务，所在类已达并发上限时不取出"""
+        task = self.ready.pop()
+        if task is not None:
+            self.running.add(task.task_id)
+        return task
+
+    def has_ready(self) -> bool:
+        """是否有可立即执行的任务"""
+        return bool(self.ready)
+
+    def ready_counts(self) -> Dict[str, int]:
+        """按任务类型统计就绪但尚未启动的任务数"""
+        counts: Dict[str, int] = {}
+        for task in self.ready:
+            counts[task.task_type] = counts.get(task.task_type, 0) + 1
+        return counts
+
+    def critical_path(self, task: Task, duration: float) -> Tuple[float, List[str]]:
+        """
+        计算以该任务结尾的关键路径
+
+        Args:
+            task: 已执行完的任务
+            duration: 任务自身耗时（秒）
+
+        Returns:
+            (关键路径总耗时, 关键路径上的任务ID列表)
+        """
+        best_cost, best_chain = 0.0, []
+        for dep in task.dependencies:
+            cost, chain = self.path_costs.get(dep, (0.0, []))
+            if cost > best_cost or not best_chain:
+                best_cost, best_chain = cost, chain
+        return best_cost + duration, best_chain + [task.task_id]
+
+    def complete(self, task: Task, duration: float) -> List[Task]:
+        """
+        标记任务完成并释放下游任务
+
+        Args:
+            task: 已完成的任务
+            duration: 任务自身耗时（秒）
+
+        Returns:
+            新变为可执行的任务列表
+        """
+        if task.task_id not in self.nodes:
+            return []
+        if self.open_dependents.get(task.task_id, 0) > 0:
+            self.path_costs[task.task_id] = self.critical_path(task, duration)
+        self._remove(task)
+
+        released = []
+        for dependent_id in self.dependents.pop(task.task_id, []):
+            if dependent_id not in self.in_degree:
+                continue
+            self.in_degree[dependent_id] -= 1
+            if self.in_degree[dependent_id] == 0:
+                dependent = self.nodes[dependent_id]
+                dependent.ready_at = time.monotonic()
+                self.ready.push(dependent)
+                released.append(dependent)
+        return released
+
+    def fail(self, task: Task) -> List[Task]:
+        """
+        标记任务失败或取消，并级联取消所有下游任务
+
+        Args:
+            task: 失败或被取消的任务
+
+        Returns:
+            被级联取消的下游任务列表
+        """
+        cancelled = []
+        queue = deque([task.task_id])
+        if task.task_id in self.nodes:
+            self._remove(task)
+        while queue:
+            for dependent_id in self.dependents.pop(queue.popleft(), []):
+                dependent = self.nodes.get(dependent_id)
+                if dependent is None or dependent_id in self.running:
+                    continue
+                self._remove(dependent)
+                cancelled.append(dependent)
+                queue.append(dependent_id)
+        return cancelled
+
+    def _remove(self, task: Task):
+        """从调度图中移除任务，并释放不再需要的关键路径记录"""
+        self.nodes.pop(task.task_id, None)
+        self.in_degree.pop(task.task_id, None)
+        if task.task_id in self.running:
+            self.running.discard(task.task_id)
+            self.ready.release(task)
+        else:
+            self.ready.discard(task.task_id)
+        for dep in task.dependencies:
+            remaining = self.open_dependents.get(dep, 0) - 1
+            if remaining > 0:
+                self.open_dependents[dep] = remaining
+            else:
+                self.open_dependents.pop(dep, None)
+                self.path_costs.pop(dep, None)
+                if dep not in self.nodes:
+                    self._release(dep)
+        if task.task_id not in self.open_dependents:
+            self._release(task.task_id)
+
+    def _release(self, task_id: str):
+        if self.on_release is not None:
+            self.on_release(task_id)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """获取调度器统计信息"""
+        return {
+            "scheduled": len(self.nodes),
+            "ready": len(self.ready),
+            "running": len(self.running),
+            "waiting": len(self.nodes) - len(self.ready) - len(self.running)
+        }
@@ -0,0 +1,576 @@
+"""
+Sharding - 多进程/多节点分片执行
+Agent运行在独立的工作进程（或其他主机）中，通过 Unix 域套接字或 TCP 与协调器通信；
+任务按分片键（如 SKU、客户ID）路由到固定的工作进程，工作进程失联时重新派发其在途任务
+"""
+
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Callable, Set
+import argparse
+import asyncio
+import bisect
+import hashlib
+import importlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import struct
+import time
+
+from core.agents.base_agent import BaseAgent, AgentCapability, AgentMessage, TASK_RESULT_SCHEMA
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+def encode_frame(frame: Dict[str, Any]) -> bytes:
+    """将帧编码为 4 字节长度前缀 + 紧凑 JSON"""
+    payload = json.dumps(frame, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """读取一帧，连接关闭时返回 None"""
+    try:
+        header = await reader.readexactly(_FRAME_HEADER.size)
+        (length,) = _FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            raise ValueError(f"Frame too large: {length} bytes")
+        payload = await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    return json.loads(payload)
+
+
+async def open_transport(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """连接到 unix:/path 或 host:port 地址"""
+    if address.startswith("unix:"):
+        return await asyncio.open_unix_connection(address[len("unix:"):])
+    host, _, port = address.rpartition(":")
+    return await asyncio.open_connection(host, int(port))
+
+
+def _import_agent_class(path: str):
+    module_name, _, qualname = path.partition(":")
+    return getattr(importlib.import_module(module_name), qualname)
+
+
+class ShardRing:
+    """
+    一致性哈希环
+
+    每个工作进程在环上占 replicas 个虚拟节点；工作进程加入或离开时
+    只有落在其虚拟节点上的分片键会改变归属。
+    """
+
+    def __init__(self, replicas: int = 64):
+        self.replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add(self, worker_id: str):
+        """将工作进程加入哈希环"""
+        for i in range(self.replicas):
+            point = self._hash(f"{worker_id}#{i}")
+            if point not in self._owners:
+                bisect.insort(self._points, point)
+                self._owners[point] = worker_id
+
+    def remove(self, worker_id: str):
+        """将工作进程移出哈希环"""
+        self._points = [p for p in self._points if self._owners[p] != worker_id]
+        self._owners = {p: w for p, w in self._owners.items() if w != worker_id}
+
+    def lookup(self, key: str, eligible: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        查找分片键所属的工作进程
+
+        Args:
+            key: 分片键
+            eligible: 过滤条件，顺时针跳过不满足条件的工作进程
+
+        Returns:
+            工作进程ID，没有满足条件的工作进程时返回 None
+        """
+        if not self._points:
+            return None
+        start = bisect.bisect(self._points, self._hash(key))
+        for offset in range(len(self._points)):
+            worker_id = self._owners[self._points[(start + offset) % len(self._points)]]
+            if eligible is None or eligible(worker_id):
+                return worker_id
+        return None
+
+
+class ShardWorker:
+    """
+    分片工作进程
+
+    连接协调器后发送 hello（包含可处理的任务类型和Agent ID），
+    周期性发送心跳，并发执行收到的任务和消息帧。
+    """
+
+    def __init__(
+        self,
+        address: str,
+        worker_id: str,
+        agent_paths: Iterable[str],
+        heartbeat_interval: float = 1.0,
+        concurrency: int = 32
+    ):
+        self.address = address
+        self.worker_id = worker_id
+        self.heartbeat_interval = heartbeat_interval
+        self.agents: Dict[str, BaseAgent] = {}
+        self.by_task_type: Dict[str, BaseAgent] = {}
+        for path in agent_paths:
+            agent = _import_agent_class(path)()
+            agent.agent_id = f"{agent.agent_id}@{worker_id}"
+            self.agents[agent.agent_id] = agent
+            for task_type in agent.get_capabilities():
+                self.by_task_type.setdefault(task_type, agent)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._write_lock = asyncio.Lock()
+
+    async def _send(self, frame: Dict[str, Any]):
+        async with self._write_lock:
+            self._writer.write(encode_frame(frame))
+            await self._writer.drain()
+
+    async def _heartbeat(self):
+        while True:
+            await self._send({"kind": "heartbeat", "worker_id": self.worker_id, "time": time.time()})
+            await asyncio.sleep(self.heartbeat_interval)
+
+    async def _run_task(self, frame: Dict[str, Any]):
+        task = frame["task"]
+        agent = self.by_task_type.get(task.get("task_type"))
+        async with self._semaphore:
+            start = time.perf_counter()
+            try:
+                if agent is None:
+                    raise ValueError(f"No agent for task type: {task.get('task_type')}")
+                reply = {"kind": "result", "task_id": task["task_id"], "result": await agent.process(task)}
+            except Exception as e:
+                reply = {"kind": "result", "task_id": task["task_id"], "error": str(e)}
+            reply["duration"] = time.perf_counter() - start
+            reply["agent_id"] = agent.agent_id if agent else None
+        await self._send(reply)
+
+    async def _run_message(self, frame: Dict[str, Any]):
+        message = AgentMessage.from_dict(frame["message"])
+        agent = self.agents.get(message.receiver)
+        async with self._semaphore:
+            try:
+                if agent is None:
+                    raise KeyError(f"No agent: {message.receiver}")
+                content = await agent.handle_message(message)
+            except Exception as e:
+                content = {"error": str(e)}
+        await self._send({"kind": "reply", "correlation_id": frame["id"], "content": content})
+
+    async def serve(self):
+        """连接协调器并处理帧，直到收到 shutdown 或连接断开"""
+        reader, self._writer = await open_transport(self.address)
+        for agent in self.agents.values():
+            await agent.initialize()
+        await self._send({
+            "kind": "hello",
+            "worker_id": self.worker_id,
+            "pid": os.getpid(),
+            "task_types": sorted(self.by_task_type),
+            "agent_ids": sorted(self.agents)
+        })
+        heartbeat = asyncio.create_task(self._heartbeat())
+        running: Set[asyncio.Task] = set()
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None or frame["kind"] == "shutdown":
+                    break
+                if frame["kind"] == "task":
+                    job = asyncio.create_task(self._run_task(frame))
+                elif frame["kind"] == "message":
+                    job = asyncio.create_task(self._run_message(frame))
+                else:
+                    continue
+                running.add(job)
+                job.add_done_callback(running.discard)
+        finally:
+            heartbeat.cancel()
+            for job in running:
+                job.cancel()
+            self._writer.close()
+
+
+def run_shard_worker(address: str, worker_id: str, agent_paths: List[str],
+                     heartbeat_interval: float = 1.0, concurrency: int = 32):
+    """工作进程入口"""
+    worker = ShardWorker(address, worker_id, agent_paths, heartbeat_interval, concurrency)
+    try:
+        asyncio.run(worker.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+class WorkerConnection:
+    """协调器侧的工作进程连接状态"""
+
+    def __init__(self, worker_id: str, pid: int, task_types: Iterable[str],
+                 agent_ids: Iterable[str], writer: asyncio.StreamWriter):
+        self.worker_id = worker_id
+        self.pid = pid
+        self.task_types = set(task_types)
+        self.agent_ids = set(agent_ids)
+        self.writer = writer
+        self.last_heartbeat = time.monotonic()
+        self.in_flight: Dict[str, Tuple[Dict[str, Any], asyncio.Future, int]] = {}
+        self.pending_replies: Dict[str, asyncio.Future] = {}
+        self.tasks_completed = 0
+
+    def send(self, frame: Dict[str, Any]):
+        self.writer.write(encode_frame(frame))
+
+
+class ShardCoordinator:
+    """
+    分片协调器
+
+    工作进程失联（连接断开或超过 heartbeat_timeout 没有心跳）时从哈希环移除，
+    其在途任务按分片键重新派发到其余工作进程（至少一次语义）；
+    没有可用工作进程时以 ConnectionError 失败，可由 ExecutionPolicy 重试。
+    """
+
+    def __init__(
+        self,
+        address: str,
+        shard_keys: Iterable[str] = ("sku", "customer_id", "order_id"),
+        heartbeat_interval: float = 1.0,
+        heartbeat_timeout: float = 5.0,
+        max_redispatch: int = 3
+    ):
+        self.address = address
+        self.shard_keys = tuple(shard_keys)
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_redispatch = max_redispatch
+        self.ring = ShardRing()
+        self.workers: Dict[str, WorkerConnection] = {}
+        self.processes: Dict[str, multiprocessing.Process] = {}
+        self.on_topology_change: Optional[Callable[[], None]] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._worker_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self.metrics = {
+            "dispatched": 0,
+            "completed": 0,
+            "failed": 0,
+            "redispatched": 0,
+            "workers_lost": 0,
+            "messages": 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ShardCoordinator':
+        """从编排器配置创建协调器"""
+        return cls(
+            address=config["shard_address"],
+            shard_keys=config.get("shard_keys", ("sku", "customer_id", "order_id")),
+            heartbeat_interval=config.get("shard_heartbeat_interval", 1.0),
+            heartbeat_timeout=config.get("shard_heartbeat_timeout", 5.0),
+            max_redispatch=config.get("shard_max_redispatch", 3)
+        )
+
+    async def start(self):
+        """开始监听工作进程连接"""
+        if self._server is not None:
+            return
+        if self.address.startswith("unix:"):
+            path = self.address[len("unix:"):]
+            if os.path.exists(path):
+                os.unlink(path)
+            self._server = await asyncio.start_unix_server(self._handle_connection, path)
+        else:
+            host, _, port = self.address.rpartition(":")
+            self._server = await asyncio.start_server(self._handle_connection, host, int(port))
+        self._monitor = asyncio.create_task(self._monitor_heartbeats())
+        logger.info(f"Shard coordinator listening on {self.address}")
+
+    def spawn_local_workers(self, count: int, agent_classes: Iterable[type], concurrency: int = 32) -> List[str]:
+        """
+        在本机启动工作进程
+
+        Args:
+            count: 工作进程数量
+            agent_classes: 每个工作进程中实例化的Agent类
+            concurrency: 每个工作进程的最大并发任务数
+
+        Returns:
+            工作进程ID列表
+        """
+        paths = [f"{cls.__module__}:{cls.__qualname__}" for cls in agent_classes]
+        context = multiprocessing.get_context("spawn")
+        worker_ids = []
+        for _ in range(count):
+            worker_id = f"shard_{next(self._worker_ids)}"
+            process = context.Process(
+                target=run_shard_worker,
+                args=(self.address, worker_id, paths, self.heartbeat_interval, concurrency),
+                daemon=True
+            )
+            process.start()
+            self.processes[worker_id] = process
+            worker_ids.append(worker_id)
+        return worker_ids
+
+    async def wait_for_workers(self, count: int, timeout: float = 30.0):
+        """等待至少 count 个工作进程完成注册"""
+        deadline = time.monotonic() + timeout
+        while len(self.workers) < count:
+            exited = [wid for wid, p in self.processes.items() if p.exitcode is not None and wid not in self.workers]
+            if exited:
+                raise RuntimeError(f"Shard workers exited before joining: {exited}")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Only {len(self.workers)} of {count} shard workers joined")
+            await asyncio.sleep(0.05)
+
+    def task_types(self) -> List[str]:
+        """所有工作进程可处理的任务类型"""
+        return sorted({t for worker in self.workers.values() for t in worker.task_types})
+
+    def shard_key(self, task: Dict[str, Any]) -> str:
+        """任务的分片键：第一个出现在参数中的 shard_keys 字段，否则为任务ID"""
+        parameters = task.get("parameters") or {}
+        for field in self.shard_keys:
+            if parameters.get(field) is not None:
+                return f"{field}={parameters[field]}"
+        return str(task.get("task_id"))
+
+    def owner_of(self, task: Dict[str, Any]) -> Optional[str]:
+        """任务应路由到的工作进程ID"""
+        task_type = task.get("task_type")
+        return self.ring.lookup(
+            self.shard_key(task),
+            lambda worker_id: task_type in self.workers[worker_id].task_types
+        )
+
+    async def submit(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        按分片键派发任务并等待结果
+
+        Args:
+            task: 任务字典（task_id、task_type、description、parameters）
+
+        Returns:
+            工作进程中Agent的处理结果
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._dispatch(task, future, 0)
+        try:
+            return await future
+        finally:
+            for worker in self.workers.values():
+                entry = worker.in_flight.get(task["task_id"])
+                if entry is not None and entry[1] is future:
+                    del worker.in_flight[task["task_id"]]
+
+    def _dispatch(self, task: Dict[str, Any], future: asyncio.Future, redispatches: int):
+        worker_id = self.owner_of(task)
+        if worker_id is None:
+            self.metrics["failed"] += 1
+            future.set_exception(ConnectionError(f"No shard worker for task type: {task.get('task_type')}"))
+            return
+        worker = self.workers[worker_id]
+        worker.in_flight[task["task_id"]] = (task, future, redispatches)
+        worker.send({"kind": "task", "task": task})
+        self.metrics["dispatched"] += 1
+
+    async def request(self, message: AgentMessage, timeout: Optional[float] = 60) -> Dict[str, Any]:
+        """
+        向工作进程中的Agent发送请求消息并等待应答
+
+        Args:
+            message: receiver 为工作进程中的Agent ID
+            timeout: 等待应答的超时
+
+        Returns:
+            接收方 handle_message 的返回值
+        """
+        worker = next((w for w in self.workers.values() if message.receiver in w.agent_ids), None)
+        if worker is None:
+            raise KeyError(f"No shard worker hosts agent: {message.receiver}")
+        frame_id = str(next(self._message_ids))
+        future = asyncio.get_running_loop().create_future()
+        worker.pending_replies[frame_id] = future
+        worker.send({"kind": "message", "id": frame_id, "message": message.to_dict()})
+        self.metrics["messages"] += 1
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            worker.pending_replies.pop(frame_id, None)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        hello = await read_frame(reader)
+        if hello is None or hello.get("kind") != "hello":
+            writer.close()
+            return
+        worker = WorkerConnection(hello["worker_id"], hello["pid"], hello["task_types"],
+                                  hello["agent_ids"], writer)
+        self.workers[worker.worker_id] = worker
+        self.ring.add(worker.worker_id)
+        logger.info(f"Shard worker joined: {worker.worker_id} (pid={worker.pid})")
+        self._topology_changed()
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                worker.last_heartbeat = time.monotonic()
+                if frame["kind"] == "result":
+                    entry = worker.in_flight.pop(frame["task_id"], None)
+                    if entry is None or entry[1].done():
+                        continue
+                    worker.tasks_completed += 1
+                    if "error" in frame:
+                        self.metrics["failed"] += 1
+                        entry[1].set_exception(RuntimeError(frame["error"]))
+                    else:
+                        self.metrics["completed"] += 1
+                        entry[1].set_result(frame["result"])
+                elif frame["kind"] == "reply":
+                    future = worker.pending_replies.pop(frame["correlation_id"], None)
+                    if future is not None and not future.done():
+                        future.set_result(frame["content"])
+        finally:
+            self._lose_worker(worker.worker_id, "connection closed")
+
+    def _lose_worker(self, worker_id: str, reason: str):
+        """移除失联的工作进程并重新派发其在途任务"""
+        worker = self.workers.pop(worker_id, None)
+        if worker is None:
+            return
+        self.ring.remove(worker_id)
+        self.metrics["workers_lost"] += 1
+        logger.warning(f"Shard worker lost: {worker_id} ({reason}), re-dispatching {len(worker.in_flight)} tasks")
+        worker.writer.close()
+        process = self.processes.pop(worker_id, None)
+        if process is not None and process.is_alive():
+            process.terminate()
+        for future in worker.pending_replies.values():
+            if not future.done():
+                future.set_exception(ConnectionError(f"Shard worker {worker_id} lost"))
+        for task, future, redispatches in worker.in_flight.values():
+            if future.done():
+                continue
+            if redispatches >= self.max_redispatch:
+                self.metrics["failed"] += 1
+                future.set_exception(ConnectionError(f"Task {task['task_id']} lost with shard worker {worker_id}"))
+                continue
+            self.metrics["redispatched"] += 1
+            self._dispatch(task, future, redispatches + 1)
+        self._topology_changed()
+
+    async def _monitor_heartbeats(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for worker_id, worker in list(self.workers.items()):
+                if now - worker.last_heartbeat > self.heartbeat_timeout:
+                    self._lose_worker(worker_id, "heartbeat timeout")
+
+    def _topology_changed(self):
+        if self.on_topology_change is not None:
+            self.on_topology_change()
+
+    async def stop(self):
+        """通知工作进程退出并关闭监听；尚未完成的任务和消息以 ConnectionError 失败"""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        workers, self.workers = self.workers, {}
+        for worker in workers.values():
+            self.ring.remove(worker.worker_id)
+            # 连接关闭后 _lose_worker 已找不到该工作进程，这里先让等待中的调用方返回
+            error = ConnectionError(f"Shard coordinator stopped, worker {worker.worker_id} disconnected")
+            for future in worker.pending_replies.values():
+                if not future.done():
+                    future.set_exception(error)
+            for task, future, _ in worker.in_flight.values():
+                if not future.done():
+                    self.metrics["failed"] += 1
+                    future.set_exception(error)
+            worker.send({"kind": "shutdown"})
+            worker.writer.close()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for process in list(self.processes.values()):
+            await asyncio.to_thread(process.join, 5)
+            if process.is_alive():
+                process.terminate()
+        self.processes.clear()
+        if self.address.startswith("unix:") and os.path.exists(self.address[len("unix:"):]):
+            os.unlink(self.address[len("unix:"):])
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取分片统计"""
+        now = time.monotonic()
+        return {
+            **self.metrics,
+            "address": self.address,
+            "workers": {
+                worker_id: {
+                    "pid": worker.pid,
+                    "in_flight": len(worker.in_flight),
+                    "tasks_completed": worker.tasks_completed,
+                    "heartbeat_age": now - worker.last_heartbeat
+                }
+                for worker_id, worker in self.workers.items()
+            }
+        }
+
+
+class ShardClusterAgent(BaseAgent):
+    """
+    分片集群在编排器中的代理Agent
+
+    能力为所有工作进程可处理的任务类型，process 按分片键将任务派发到工作进程。
+    """
+
+    def __init__(self, coordinator: ShardCoordinator, agent_id: str = "shard_cluster"):
+        super().__init__(agent_id=agent_id, name="Shard Cluster", role="分片执行集群")
+        self.coordinator = coordinator
+        for task_type in coordinator.task_types():
+            self.add_capability(AgentCapability(task_type, "由分片工作进程执行", {}, TASK_RESULT_SCHEMA))
+
+    async def process(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        return await self.coordinator.submit(task)
+
+    async def think(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        return {"decision": "dispatch", "shard_key": self.coordinator.shard_key(context)}
+
+
+def main():
+    """在其他主机上启动工作进程: python -m core.orchestrator.sharding --address host:port --agent module:Class"""
+    parser = argparse.ArgumentParser(description="Shard worker")
+    parser.add_argument("--address", required=True, help="协调器地址，unix:/path 或 host:port")
+    parser.add_argument("--worker-id", default=f"shard_{os.uname().nodename}_{os.getpid()}")
+    parser.add_argument("--agent", action="append", required=True, help="Agent类路径 module:Class，可重复")
+    parser.add_argument("--heartbeat-interval", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    run_shard_worker(args.address, args.worker_id, args.agent, args.heartbeat_interval, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Task - 任务模型
+定义任务状态和可执行的任务单元
+"""
+
+from typing import Dict, List, Any, Optional, Callable
+from datetime import datetime
+from enum import Enum
+
+
+class TaskStatus(Enum):
+    """任务状态枚举"""
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Task:
+    """任务类，表示一个可执行的任务单元"""
+
+    def __init__(
+        self,
+        task_id: str,
+        description: str,
+        task_type: str,
+        parameters: Dict[str, Any],
+        priority: int = 5,
+        dependencies: Optional[List[str]] = None,
+        cpu_bound: bool = False,
+        priority_class: Optional[str] = None
+    ):
+        self.task_id = task_id
+        self.description = description
+        self.task_type = task_type
+        self.parameters = parameters
+        self.priority = priority
+        self.dependencies = dependencies or []
+        self.cpu_bound = cpu_bound
+        self.priority_class = priority_class
+        self.status_listener: Optional[Callable[['Task', TaskStatus, TaskStatus], None]] = None
+        self._status = TaskStatus.PENDING
+        self.assigned_agent = None
+        self.created_at = datetime.now()
+        self.ready_at: Optional[float] = None
+        self.started_at = None
+        self.completed_at = None
+        self.result = None
+        self.error = None
+        self.subtasks = []
+
+    @property
+    def status(self) -> TaskStatus:
+        return self._status
+
+    @status.setter
+    def status(self, new_status: TaskStatus):
+        old_status = self._status
+        self._status = new_status
+        if self.status_listener is not None and old_status != new_status:
+            self.status_listener(self, old_status, new_status)
+
+    def to_dict(self) -> Dict:
+        return {
+            "task_id": self.task_id,
+            "description": self.description,
+            "task_type": self.task_type,
+            "parameters": self.parameters,
+            "priority": self.priority,
+            "dependencies": self.dependencies,
+            "cpu_bound": self.cpu_bound,
+            "priority_class": self.priority_class,
+            "status": self.status.value,
+            "assigned_agent": self.assigned_agent,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "result": self.result,
+            "error": self.error,
+            "subtasks": [t.to_dict() for t in self.subtasks]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Task':
+        task = cls(
+            task_id=data["task_id"],
+            description=data["description"],
+            task_type=data["task_type"],
+            parameters=data["parameters"],
+            priority=data.get("priority", 5),
+            dependencies=data.get("dependencies"),
+            cpu_bound=data.get("cpu_bound", False),
+            priority_class=data.get("priority_class")
+        )
+        task.status = TaskStatus(data.get("status", TaskStatus.PENDING.value))
+        task.assigned_agent = data.get("assigned_agent")
+        task.created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else task.created_at
+        task.started_at = datetime.fromisoformat(data["started_at"]) if data.get("started_at") else None
+        task.completed_at = datetime.fromisoformat(data["completed_at"]) if data.get("completed_at") else None
+        task.result = data.get("result")
+        task.error = data.get("error")
+        task.subtasks = [cls.from_dict(t) for t in data.get("subtasks", [])]
+        return task
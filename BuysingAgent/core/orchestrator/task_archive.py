@@ -0,0 +1,171 @@
+"""
+Task Archive - 已结束任务的归档
+将已结束的任务以追加方式写入 JSONL 文件或 SQLite 数据库，供事后查询和导出
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Iterator, Optional
+import json
+import logging
+import sqlite3
+
+from core.orchestrator.task import Task
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TaskArchive(ABC):
+    """
+    任务归档基类
+    """
+
+    def __init__(self):
+        self.archived_count = 0
+
+    @abstractmethod
+    def append(self, task: Task):
+        """追加一条已结束的任务"""
+        pass
+
+    @abstractmethod
+    def iter_tasks(self) -> Iterator[Dict[str, Any]]:
+        """按写入顺序流式读取归档的任务字典"""
+        pass
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """按任务ID查询最近一次归档，默认顺序扫描全部归档"""
+        found = None
+        for data in self.iter_tasks():
+            if data.get("task_id") == task_id:
+                found = data
+        return found
+
+    def flush(self):
+        """将缓冲写入持久化存储"""
+        pass
+
+    def close(self):
+        """关闭归档"""
+        self.flush()
+
+
+class JSONLTaskArchive(TaskArchive):
+    """
+    JSONL 文件归档，每行一个 Task.to_dict()
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, task: Task):
+        if self._file.closed:
+            # 编排器停止后仍在结束的任务继续追加
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(task.to_dict(), ensure_ascii=False, default=str))
+        self._file.write("\n")
+        self.archived_count += 1
+
+    def iter_tasks(self) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class SQLiteTaskArchive(TaskArchive):
+    """
+    SQLite 归档，按批次提交
+    """
+
+    def __init__(self, path: str, batch_size: int = 500):
+        super().__init__()
+        self.path = path
+        self.batch_size = batch_size
+        self._pending = 0
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "task_id TEXT NOT NULL, "
+            "task_type TEXT, "
+            "status TEXT, "
+            "completed_at TEXT, "
+            "data TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_task_id ON tasks (task_id)")
+        conn.commit()
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """当前连接，归档关闭后再次使用时重新连接"""
+        if self._conn is None:
+            self._conn = self._connect()
+        return self._conn
+
+    def append(self, task: Task):
+        data = task.to_dict()
+        self._connection().execute(
+            "INSERT INTO tasks (task_id, task_type, status, completed_at, data) VALUES (?, ?, ?, ?, ?)",
+            (task.task_id, task.task_type, data["status"], data["completed_at"],
+             json.dumps(data, ensure_ascii=False, default=str))
+        )
+        self.archived_count += 1
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def iter_tasks(self) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        for (data,) in self._connection().execute("SELECT data FROM tasks ORDER BY seq"):
+            yield json.loads(data)
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """按任务ID查询最近一次归档"""
+        self.flush()
+        row = self._connection().execute(
+            "SELECT data FROM tasks WHERE task_id = ? ORDER BY seq DESC LIMIT 1", (task_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def flush(self):
+        if self._pending:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self):
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+
+def create_task_archive(path: Optional[str]) -> Optional[TaskArchive]:
+    """
+    根据文件扩展名创建归档
+
+    Args:
+        path: 归档路径，.db/.sqlite/.sqlite3 使用 SQLite，其余使用 JSONL
+
+    Returns:
+        归档实例，path 为空时返回 None
+    """
+    if not path:
+        return None
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        return SQLiteTaskArchive(path)
+    return JSONLTaskArchive(path)
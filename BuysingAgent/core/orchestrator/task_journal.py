@@ -0,0 +1,239 @@
+"""
+Task Journal - 任务状态日志与崩溃恢复
+以追加方式记录任务入队和状态变更，重启时重放日志重建未完成的任务
+"""
+
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+import json
+import logging
+import os
+import time
+
+from core.orchestrator.task import Task, TaskStatus
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_TERMINAL = {s.value.encode() for s in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)}
+_UNSUCCESSFUL = {s.value.encode() for s in (TaskStatus.FAILED, TaskStatus.CANCELLED)}
+_PENDING = TaskStatus.PENDING.value.encode()
+
+
+class TaskJournal:
+    """
+    追加写入的任务日志
+
+    每行一条记录，字段以制表符分隔，任务ID为JSON字符串：
+        E <"task_id"> <Task.to_dict() JSON>      入队
+        S <"task_id"> <status>                   状态变更
+    重放时以字节按前缀切分，入队记录的JSON仅在任务最终未结束时才解码和解析，
+    内存占用与未结束的任务数（加上失败/取消任务的ID）成正比。
+    压缩时为未结束任务所依赖的失败/取消任务保留一条状态记录，重启后其下游仍会被取消。
+    """
+
+    def __init__(self, path: str, fsync: bool = False, compact_records: int = 1_000_000):
+        self.path = path
+        self.fsync = fsync
+        self.compact_records = compact_records
+        self.records_written = 0
+        self.records_since_compact = 0
+        self.suspended = False
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['TaskJournal']:
+        """从编排器配置创建日志，未配置 task_journal_path 时返回 None"""
+        path = config.get("task_journal_path")
+        if not path:
+            return None
+        return cls(
+            path,
+            fsync=config.get("task_journal_fsync", False),
+            compact_records=config.get("task_journal_compact_records", 1_000_000)
+        )
+
+    def _write(self, line: str):
+        if self.suspended:
+            return
+        if self._file.closed:
+            # 编排器停止后仍在结束的任务继续追加
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(line)
+        self.records_written += 1
+        self.records_since_compact += 1
+
+    def enqueue(self, task: Task):
+        """记录任务入队"""
+        self._write(
+            f"E\t{json.dumps(task.task_id)}\t"
+            f"{json.dumps(task.to_dict(), ensure_ascii=False, separators=(',', ':'), default=str)}\n"
+        )
+
+    def record_status(self, task: Task, status: TaskStatus):
+        """记录任务状态变更"""
+        self._write(f"S\t{json.dumps(task.task_id)}\t{status.value}\n")
+
+    def flush(self):
+        """将缓冲写入文件，开启 fsync 时同时落盘"""
+        if self._file.closed:
+            return
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def replay(self) -> Tuple[List[Tuple[Dict[str, Any], str]], Dict[str, str], Dict[str, int]]:
+        """
+        重放日志
+
+        Returns:
+            ([(任务字典, 最后状态), ...] 仅包含未结束的任务, {任务ID: 状态} 失败或取消的任务, 重放统计)
+        """
+        self.flush()
+        live: Dict[bytes, List[bytes]] = {}
+        ended: Dict[bytes, bytes] = {}
+        records, corrupt = 0, 0
+        with open(self.path, "rb") as f:
+            for records, line in enumerate(f, 1):
+                if line[-1:] != b"\n":
+                    # 崩溃时写了一半的最后一行
+                    corrupt += 1
+                    break
+                parts = line[:-1].split(b"\t", 2)
+                if len(parts) < 3:
+                    corrupt += 1
+                    continue
+                kind, raw_id, value = parts
+                if kind == b"S":
+                    if value in _TERMINAL:
+                        live.pop(raw_id, None)
+                        if value in _UNSUCCESSFUL:
+                            ended[raw_id] = value
+                        else:
+                            ended.pop(raw_id, None)
+                    else:
+                        entry = live.get(raw_id)
+                        if entry is not None:
+                            entry[1] = value
+                elif kind == b"E":
+                    live[raw_id] = [value, _PENDING]
+                    ended.pop(raw_id, None)
+                else:
+                    corrupt += 1
+        tasks = []
+        for raw_task, status in live.values():
+            try:
+                tasks.append((json.loads(raw_task), status.decode()))
+            except ValueError:
+                corrupt += 1
+        ended_tasks = {}
+        for raw_id, status in ended.items():
+            try:
+                ended_tasks[json.loads(raw_id)] = status.decode()
+            except ValueError:
+                corrupt += 1
+        stats = {"records": records, "corrupt_records": corrupt}
+        stats["live_tasks"] = len(tasks)
+        return tasks, ended_tasks, stats
+
+    def compact(self, live_tasks: Iterable[Task], known_tasks: Optional[Dict[str, Task]] = None):
+        """
+        用未结束任务的入队记录重写日志（写临时文件后原子替换）
+
+        Args:
+            live_tasks: 需要保留的任务
+            known_tasks: 已知任务，其中失败或取消、且被保留任务依赖的任务写入一条状态记录
+        """
+        live_tasks = list(live_tasks)
+        live_ids = {task.task_id for task in live_tasks}
+        ended: Dict[str, TaskStatus] = {}
+        if known_tasks is not None:
+            for task in live_tasks:
+                for dep in task.dependencies:
+                    dep_task = known_tasks.get(dep) if dep not in live_ids else None
+                    if dep_task is not None and dep_task.status in (TaskStatus.FAILED, TaskStatus.CANCELLED):
+                        ended[dep] = dep_task.status
+        self.flush()
+        self._file.close()
+        temp_path = f"{self.path}.compact"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for task_id, status in ended.items():
+                f.write(f"S\t{json.dumps(task_id)}\t{status.value}\n")
+            for task in live_tasks:
+                f.write(
+                    f"E\t{json.dumps(task.task_id)}\t"
+                    f"{json.dumps(task.to_dict(), ensure_ascii=False, separators=(',', ':'), default=str)}\n"
+                )
+                if task.status != TaskStatus.PENDING:
+                    f.write(f"S\t{json.dumps(task.task_id)}\t{task.status.value}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.records_since_compact = 0
+
+    def needs_compaction(self) -> bool:
+        return self.records_since_compact >= self.compact_records
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "records_written": self.records_written,
+            "records_since_compact": self.records_since_compact
+        }
+
+
+def recover_from_journal(
+    journal: TaskJournal,
+    idempotent_task_types: Iterable[str]
+) -> Tuple[List[Task], List[Task], Dict[str, Any]]:
+    """
+    从日志恢复任务
+
+    PENDING 任务原样恢复；中断时处于 IN_PROGRESS 的任务若属于幂等任务类型则重置为
+    PENDING 重新执行，否则标记为 FAILED（可能已产生外部副作用，不能自动重做）。
+    依赖在崩溃前失败或被取消的任务标记为 CANCELLED。
+
+    Args:
+        journal: 任务日志
+        idempotent_task_types: 可安全重做的任务类型
+
+    Returns:
+        (需要重新入队的任务, 标记为失败或取消的任务, 恢复统计)
+    """
+    start = time.perf_counter()
+    idempotent = set(idempotent_task_types)
+    records, ended, stats = journal.replay()
+    requeued: List[Task] = []
+    failed: List[Task] = []
+    cancelled = 0
+    live_ids = {data["task_id"] for data, _ in records}
+    for data, status in records:
+        data["status"] = TaskStatus.PENDING.value
+        dependencies = data.get("dependencies") or []
+        broken = next((dep for dep in dependencies if dep not in live_ids and dep in ended), None)
+        # 其余不在日志中的依赖在崩溃前已经完成
+        data["dependencies"] = [dep for dep in dependencies if dep in live_ids]
+        task = Task.from_dict(data)
+        if broken is not None:
+            task.status = TaskStatus.CANCELLED
+            task.error = f"Dependency {broken} {ended[broken]}"
+            failed.append(task)
+            cancelled += 1
+        elif status == TaskStatus.IN_PROGRESS.value and task.task_type not in idempotent:
+            task.status = TaskStatus.FAILED
+            task.error = "Interrupted by orchestrator restart"
+            failed.append(task)
+        else:
+            requeued.append(task)
+    stats.update({
+        "requeued": len(requeued),
+        "failed": len(failed) - cancelled,
+        "cancelled": cancelled,
+        "recovery_seconds": time.perf_counter() - start
+    })
+    return requeued, failed, stats
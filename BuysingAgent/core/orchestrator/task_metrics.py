@@ -0,0 +1,105 @@
+"""
+Task Metrics - 增量维护的任务状态计数
+通过任务状态变更钩子维护各状态计数和滚动吞吐量，查询为O(1)
+"""
+
+from typing import Dict, Any, Optional
+from collections import deque
+import time
+
+from core.orchestrator.task import Task, TaskStatus
+
+
+class RollingCounter:
+    """
+    按秒分桶的滚动计数器
+    """
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.buckets: deque = deque()
+        self.total = 0
+        self.lifetime_total = 0
+
+    def _expire(self, now: int):
+        while self.buckets and self.buckets[0][0] <= now - self.window:
+            self.total -= self.buckets.popleft()[1]
+
+    def add(self, count: int = 1, now: Optional[float] = None):
+        """记录事件"""
+        second = int(now if now is not None else time.monotonic())
+        self._expire(second)
+        if self.buckets and self.buckets[-1][0] == second:
+            self.buckets[-1][1] += count
+        else:
+            self.buckets.append([second, count])
+        self.total += count
+        self.lifetime_total += count
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """窗口内的每秒平均事件数"""
+        self._expire(int(now if now is not None else time.monotonic()))
+        return self.total / self.window
+
+
+class TaskTable(dict):
+    """
+    任务表 (task_id -> Task)
+
+    写入时为任务挂上状态变更钩子，按状态增量计数；
+    移除任务时同步扣减计数。setdefault/update 等批量方法不触发计数，请逐个赋值。
+    设置 journal 后，新写入的 PENDING 任务和之后的状态变更会记录到任务日志。
+    """
+
+    def __init__(self, throughput_window: int = 60):
+        super().__init__()
+        self.status_counts: Dict[TaskStatus, int] = {status: 0 for status in TaskStatus}
+        self.completed = RollingCounter(throughput_window)
+        self.failed = RollingCounter(throughput_window)
+        self.journal = None
+
+    def __setitem__(self, task_id: str, task: Task):
+        previous = self.get(task_id)
+        if previous is not None:
+            self._detach(previous)
+        super().__setitem__(task_id, task)
+        task.status_listener = self._on_status_change
+        self.status_counts[task.status] += 1
+        if self.journal is not None and previous is None and task.status == TaskStatus.PENDING:
+            self.journal.enqueue(task)
+
+    def __delitem__(self, task_id: str):
+        self._detach(self[task_id])
+        super().__delitem__(task_id)
+
+    def pop(self, task_id: str, *default):
+        if task_id in self:
+            self._detach(self[task_id])
+        return super().pop(task_id, *default)
+
+    def _detach(self, task: Task):
+        task.status_listener = None
+        self.status_counts[task.status] -= 1
+
+    def _on_status_change(self, task: Task, old_status: TaskStatus, new_status: TaskStatus):
+        self.status_counts[old_status] -= 1
+        self.status_counts[new_status] += 1
+        if new_status == TaskStatus.COMPLETED:
+            self.completed.add()
+        elif new_status == TaskStatus.FAILED:
+            self.failed.add()
+        if self.journal is not None:
+            self.journal.record_status(task, new_status)
+
+    def count(self, status: TaskStatus) -> int:
+        """处于某状态的任务数"""
+        return self.status_counts[status]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取任务计数和吞吐量"""
+        return {
+            "throughput_per_second": self.completed.rate(),
+            "failures_per_second": self.failed.rate(),
+            "completed_total": self.completed.lifetime_total,
+            "failed_total": self.failed.lifetime_total
+        }
@@ -3,12 +3,23 @@ Base API Adapter - 所有API适配器的基类
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator, Sequence
+from contextlib import asynccontextmanager
 import logging
 import aiohttp
 import asyncio
 from datetime import datetime
 
+from core.monitoring.tracing import get_tracer
+from core.tools.connection_pool import get_connection_pool
+from core.tools.json_codec import get_json_codec
+from core.tools.pagination import paginate, ItemExtractor, NextParams
+from core.tools.rate_limiter import AdapterRateLimiter
+from core.tools.resilience import AdapterResilience, APIError
+from core.tools.response_cache import ResponseCache
+from core.tools.request_metrics import RequestMetrics
+from core.tools.request_window import RequestWindow
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -23,14 +34,36 @@ class BaseAPIAdapter(ABC):
         self.base_url = base_url
         self.config = config or {}
         self.session = None
+        self.connection_pool = get_connection_pool(self.config)
         self.rate_limit = self.config.get("rate_limit", 100)
+        self.rate_limiter = AdapterRateLimiter.from_config(self.config)
+        self.request_window = RequestWindow(self._window_size())
+        self.resilience = AdapterResilience.from_config(self.config)
+        self.response_cache = ResponseCache.from_config(self.config)
+        self.request_metrics = RequestMetrics.from_config(self.config)
+        self.json_codec = get_json_codec(self.config.get("json_backend", "auto"))
+        self.stream_chunk_size = self.config.get("stream_chunk_size", 64 * 1024)
         self.request_count = 0
         self.last_request_time = None
         self.is_authenticated = False
 
+    def _window_size(self) -> int:
+        """
+        在途窗口大小，不超过连接池的每主机连接数
+        
+        aiohttp 连接器的等待队列不保证公平：窗口大于每主机连接数时，释放的连接常被刚发起的请求拿走，
+        排队等连接的请求可能一直等到超时，因此让排队只发生在先进先出的窗口里。
+        """
+        size = self.config.get("max_in_flight_requests", 10)
+        per_host = self.connection_pool.limit_per_host
+        if per_host and size > per_host:
+            logger.warning(f"max_in_flight_requests={size} exceeds pool_limit_per_host={per_host}, using {per_host}")
+            return per_host
+        return size
+
     async def initialize(self):
-        """初始化API连接"""
-        self.session = aiohttp.ClientSession()
+        """初始化API连接（从共享连接池租用会话）"""
+        self.session = await self.connection_pool.acquire()
         logger.info(f"API adapter initialized: {self.__class__.__name__}")
         await self.authenticate()
 
@@ -39,18 +72,27 @@ class BaseAPIAdapter(ABC):
         pass
 
     async def close(self):
-        """关闭连接"""
+        """关闭连接（归还共享会话，最后一个适配器归还时连接池关闭）"""
         if self.session:
-            await self.session.close()
+            self.session = None
+            await self.connection_pool.release()
         logger.info(f"API adapter closed: {self.__class__.__name__}")
 
+    async def __aenter__(self) -> 'BaseAPIAdapter':
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
     async def _make_request(
         self,
         method: str,
         endpoint: str,
         params: Optional[Dict] = None,
         data: Optional[Dict] = None,
-        headers: Optional[Dict] = None
+        headers: Optional[Dict] = None,
+        response_type: Any = None
     ) -> Dict[str, Any]:
         """
         发送HTTP请求
@@ -61,45 +103,254 @@ class BaseAPIAdapter(ABC):
             params: 查询参数
             data: 请求体数据
             headers: 请求头
+            response_type: 响应的目标类型（dataclass等），为 None 时返回字典
             
         Returns:
             响应数据
         """
-        await self._check_rate_limit()
-        
         url = f"{self.base_url}{endpoint}"
         request_headers = headers or {}
         request_headers["Authorization"] = f"Bearer {self.api_key}"
         
+        if self.response_cache.is_cacheable(method, endpoint):
+            async def send(conditional_headers: Dict[str, str]):
+                meta: Dict[str, Any] = {}
+                async with self.request_window:
+                    response_data = await self._send_request(
+                        method, endpoint, url, params, data, {**request_headers, **conditional_headers}, meta,
+                        response_type
+                    )
+                return meta["status"], response_data, meta.get("etag"), meta.get("last_modified")
+            
+            return await self.response_cache.fetch(endpoint, params, send)
+        
+        # 窗口名额覆盖整个调用（包括 429 重试），等待者按到达顺序放行
         try:
-            async with self.session.request(
-                method=method,
-                url=url,
-                params=params,
-                json=data,
-                headers=request_headers
-            ) as response:
-                self.request_count += 1
-                self.last_request_time = datetime.now()
-                
-                response_data = await response.json()
-                
-                if response.status >= 400:
-                    logger.error(f"API request failed: {response.status} - {response_data}")
-                    raise Exception(f"API Error: {response.status} - {response_data}")
-                
-                return response_data
-                
-        except Exception as e:
-            logger.error(f"Request failed: {e}")
-            raise
-
-    async def _check_rate_limit(self):
-        """检查速率限制"""
-        if self.last_request_time:
-            time_since_last = (datetime.now() - self.last_request_time).total_seconds()
-            if time_since_last < 1.0:
-                await asyncio.sleep(1.0 - time_since_last)
+            async with self.request_window:
+                return await self._send_request(
+                    method, endpoint, url, params, data, request_headers, response_type=response_type
+                )
+        finally:
+            if method != "GET":
+                self.response_cache.invalidate(endpoint)
+
+    async def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        params: Optional[Dict],
+        data: Optional[Dict],
+        headers: Dict[str, str],
+        meta: Optional[Dict[str, Any]] = None,
+        response_type: Any = None
+    ) -> Dict[str, Any]:
+        """
+        经端点熔断器发送请求，幂等请求的暂时性错误按指数退避重试
+        
+        Args:
+            method: HTTP方法
+            endpoint: API端点
+            url: 完整URL
+            params: 查询参数
+            data: 请求体数据
+            headers: 请求头
+            meta: 不为 None 时填入响应状态码和 ETag / Last-Modified
+            response_type: 响应的目标类型
+            
+        Returns:
+            响应数据（304 时为 None）
+            
+        Raises:
+            APIError: 重试耗尽、不可重试的错误或端点熔断中 (CircuitOpenError)
+        """
+        breaker = self.resilience.breaker_for(method, endpoint)
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                breaker.before_call()
+                try:
+                    response_data = await self._send_once(method, endpoint, url, params, data, headers, meta, response_type)
+                except asyncio.CancelledError:
+                    breaker.release_call()
+                    raise
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = self.resilience.record_failure(breaker, e, endpoint)
+                if self.resilience.should_retry(method, endpoint, error, attempt):
+                    delay = self.resilience.backoff(attempt)
+                    logger.warning(f"{method} {endpoint} failed ({error.error_class}), retry {attempt} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error(f"Request failed: {error}")
+                if error is e:
+                    raise
+                raise error from e
+            breaker.record_success()
+            return response_data
+
+    async def _send_once(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        params: Optional[Dict],
+        data: Optional[Dict],
+        headers: Dict[str, str],
+        meta: Optional[Dict[str, Any]] = None,
+        response_type: Any = None
+    ) -> Dict[str, Any]:
+        """
+        发送一次请求并从响应字节直接解码
+        
+        Returns:
+            响应数据
+        """
+        async with self._open_response(method, endpoint, url, params, data, headers) as response:
+            if meta is not None:
+                meta["status"] = response.status
+                meta["etag"] = response.headers.get("ETag")
+                meta["last_modified"] = response.headers.get("Last-Modified")
+            if response.status == 304:
+                return None
+            body = await response.read()
+            if not body.strip():
+                return None
+            return self.json_codec.loads(body, response_type)
+
+    @asynccontextmanager
+    async def _open_response(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        params: Optional[Dict],
+        data: Optional[Dict],
+        headers: Dict[str, str]
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        在限速器放行后发送请求，429 时按 Retry-After 重新排队，错误状态抛出 APIError
+        
+        每次尝试都记入 request_metrics，耗时包括调用方读取响应体的时间。
+        
+        Returns:
+            状态码小于 400 的响应（响应体尚未读取）
+        """
+        body = None
+        if data is not None:
+            body = self.json_codec.dumps(data)
+            headers = {**headers, "Content-Type": "application/json"}
+        
+        for attempt in range(self.rate_limiter.max_retries + 1):
+            generations = await self._check_rate_limit(endpoint)
+            timing = self.request_metrics.start(method, endpoint)
+            
+            try:
+                with get_tracer().span(f"http.{method}", endpoint=endpoint):
+                    async with self.session.request(
+                        method=method,
+                        url=url,
+                        params=params,
+                        data=body,
+                        headers=headers,
+                        trace_request_ctx=timing
+                    ) as response:
+                        self.request_count += 1
+                        self.last_request_time = datetime.now()
+                        timing.status = response.status
+                        self.rate_limiter.on_response(endpoint, response.status, response.headers, generations)
+                        
+                        if response.status == 429 and attempt < self.rate_limiter.max_retries:
+                            continue
+                        
+                        if response.status >= 400:
+                            error_body = await response.text()
+                            raise APIError(
+                                f"API Error: {response.status} - {error_body[:500]}",
+                                status=response.status,
+                                endpoint=endpoint,
+                                error_class="rate_limited" if response.status == 429 else "http",
+                                body=error_body
+                            )
+                        
+                        yield response
+                        return
+            except Exception as e:
+                if timing.status is None:
+                    timing.error = type(e).__name__
+                raise
+            finally:
+                self.request_metrics.record(timing)
+
+    async def _stream_items(
+        self,
+        endpoint: str,
+        item_path: Sequence[str],
+        params: Optional[Dict] = None,
+        item_type: Any = None
+    ) -> AsyncIterator[Any]:
+        """
+        流式解码大型GET响应中的数组，边接收边逐条产出
+        
+        请求经过限速器和在途窗口，但不经过响应缓存，也不做重试（元素产出后无法重放）；
+        调用方处理完全部元素前一直占用一个在途名额。
+        
+        Args:
+            endpoint: API端点
+            item_path: 数组在响应中的键路径，如 ["payload", "Orders"]
+            params: 查询参数
+            item_type: 元素的目标类型
+            
+        Returns:
+            逐条产出元素的异步迭代器
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        async with self.request_window:
+            async with self._open_response("GET", endpoint, url, params, None, headers) as response:
+                chunks = response.content.iter_chunked(self.stream_chunk_size)
+                async for item in self.json_codec.iter_items(chunks, item_path, item_type):
+                    yield item
+
+    def _paginate(
+        self,
+        endpoint: str,
+        extract_items: ItemExtractor,
+        next_params: NextParams,
+        params: Optional[Dict] = None,
+        prefetch: int = 1
+    ) -> AsyncIterator[Any]:
+        """
+        流式遍历GET分页接口的全部结果，后台预取后续页面
+        
+        Args:
+            endpoint: API端点
+            extract_items: 从响应中取出本页结果
+            next_params: 根据响应和本页参数生成下一页参数，没有下一页时返回 None
+            params: 首页查询参数
+            prefetch: 预取页数
+            
+        Returns:
+            逐条产出结果的异步迭代器
+        """
+        async def fetch_page(page_params: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._make_request("GET", endpoint, params=page_params)
+        
+        return paginate(fetch_page, extract_items, next_params, params, prefetch)
+
+    async def _check_rate_limit(self, endpoint: str = "") -> Tuple[int, ...]:
+        """
+        检查速率限制，必要时等待到限速器放行
+        
+        Args:
+            endpoint: API端点，匹配 endpoint_rate_limits 中的前缀时同时受端点限速
+            
+        Returns:
+            限速器放行时的代数
+        """
+        return await self.rate_limiter.acquire(endpoint)
 
     @abstractmethod
     async def get_products(self, params: Optional[Dict] = None) -> List[Dict]:
@@ -132,5 +383,11 @@ class BaseAPIAdapter(ABC):
             "is_authenticated": self.is_authenticated,
             "request_count": self.request_count,
             "last_request_time": self.last_request_time.isoformat() if self.last_request_time else None,
-            "rate_limit": self.rate_limit
+            "rate_limit": self.rate_limit,
+            "rate_limiter": self.rate_limiter.get_statistics(),
+            "request_window": self.request_window.get_statistics(),
+            "connection_pool": self.connection_pool.get_statistics(),
+            "resilience": self.resilience.get_statistics(),
+            "response_cache": self.response_cache.get_statistics(),
+            "request_metrics": self.request_metrics.get_statistics()
         }
\ No newline at end of file
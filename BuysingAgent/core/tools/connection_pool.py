@@ -0,0 +1,208 @@
+"""
+Connection Pool - 适配器共享HTTP连接池
+多个适配器共享同一个 aiohttp 会话和连接器：按主机限制连接数、保持长连接、缓存DNS，并统一设置超时
+"""
+
+from typing import Dict, Any, Optional
+import asyncio
+import logging
+
+import aiohttp
+
+from core.tools.request_metrics import request_trace_config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """
+    共享连接池
+
+    适配器通过 acquire()/release() 租用同一个 ClientSession，最后一个租户释放后关闭会话。
+    会话在首次 acquire() 时于当前事件循环中创建，事件循环变化后自动重建。
+    aiohttp 在每个新连接上都会开启 TCP_NODELAY，这里不再重复设置。
+
+    Args:
+        name: 连接池名称
+        limit: 连接总数上限
+        limit_per_host: 每个主机的连接数上限
+        keepalive_timeout: 空闲长连接保留秒数
+        dns_cache_ttl: DNS缓存秒数
+        connect_timeout: 建立连接（含排队等待连接）超时秒数
+        read_timeout: 两次读取之间的超时秒数
+        total_timeout: 单个请求的总超时秒数
+    """
+
+    def __init__(self, name: str = "default", limit: int = 100, limit_per_host: int = 20,
+                 keepalive_timeout: float = 30.0, dns_cache_ttl: int = 300,
+                 connect_timeout: Optional[float] = 10.0, read_timeout: Optional[float] = 30.0,
+                 total_timeout: Optional[float] = 60.0):
+        self.name = name
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout, connect=connect_timeout, sock_read=read_timeout
+        )
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.leases = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued_waits = 0
+        self.total_queue_wait = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], name: str = "default") -> 'ConnectionPool':
+        """从适配器配置创建"""
+        return cls(
+            name=name,
+            limit=config.get("pool_limit", 100),
+            limit_per_host=config.get("pool_limit_per_host", 20),
+            keepalive_timeout=config.get("pool_keepalive_timeout", 30.0),
+            dns_cache_ttl=config.get("pool_dns_cache_ttl", 300),
+            connect_timeout=config.get("http_connect_timeout", 10.0),
+            read_timeout=config.get("http_read_timeout", 30.0),
+            total_timeout=config.get("http_total_timeout", 60.0)
+        )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """通过 aiohttp 追踪回调统计新建/复用连接和等待连接的耗时"""
+        trace_config = aiohttp.TraceConfig()
+        loop = asyncio.get_running_loop()
+
+        async def on_create(session, context, params):
+            self.connections_created += 1
+
+        async def on_reuse(session, context, params):
+            self.connections_reused += 1
+
+        async def on_queued_start(session, context, params):
+            context.queued_at = loop.time()
+
+        async def on_queued_end(session, context, params):
+            self.queued_waits += 1
+            self.total_queue_wait += loop.time() - context.queued_at
+
+        trace_config.on_connection_create_end.append(on_create)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        return trace_config
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            trace_configs=[self._trace_config(), request_trace_config()]
+        )
+
+    async def acquire(self) -> aiohttp.ClientSession:
+        """
+        租用共享会话
+
+        Returns:
+            aiohttp.ClientSession
+        """
+        loop = asyncio.get_running_loop()
+        if self.session is not None and not self.session.closed and self._loop is not loop:
+            await self._close_stale_session()
+        if self.session is None or self.session.closed or self._loop is not loop:
+            self.session = self._create_session()
+            self._loop = loop
+            self.leases = 0
+            logger.info(f"Connection pool '{self.name}' opened (limit={self.limit}, per_host={self.limit_per_host})")
+        self.leases += 1
+        return self.session
+
+    async def _close_stale_session(self):
+        """关闭在其他（可能已关闭的）事件循环中创建的会话，释放其连接"""
+        try:
+            await self.session.close()
+        except Exception as e:
+            logger.warning(f"Connection pool '{self.name}' failed to close stale session: {e}")
+        self.session = None
+
+    async def release(self):
+        """归还会话，没有租户时关闭连接池"""
+        if self.leases == 0:
+            return
+        self.leases -= 1
+        if self.leases == 0:
+            await self.close()
+
+    async def close(self):
+        """关闭会话和所有连接"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            logger.info(f"Connection pool '{self.name}' closed")
+        self.session = None
+        self._loop = None
+        self.leases = 0
+
+    async def __aenter__(self) -> aiohttp.ClientSession:
+        return await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        连接池利用率：活跃/空闲连接数、新建与复用次数、等待连接的次数和平均耗时
+
+        aiohttp 没有公开连接数，活跃/空闲连接数读取连接器的内部状态；
+        所用 aiohttp 版本没有这些属性时为 None。
+        """
+        active, idle = 0, 0
+        connector = self.session.connector if self.session is not None and not self.session.closed else None
+        if connector is not None:
+            acquired = getattr(connector, "_acquired", None)
+            conns = getattr(connector, "_conns", None)
+            active = len(acquired) if acquired is not None else None
+            idle = sum(len(connections) for connections in conns.values()) if isinstance(conns, dict) else None
+        requests = self.connections_created + self.connections_reused
+        return {
+            "name": self.name,
+            "leases": self.leases,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "active_connections": active,
+            "idle_connections": idle,
+            "utilization": active / self.limit if self.limit and active is not None else 0.0,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_rate": self.connections_reused / requests if requests else 0.0,
+            "queued_waits": self.queued_waits,
+            "average_queue_wait": self.total_queue_wait / self.queued_waits if self.queued_waits else 0.0
+        }
+
+
+_pools: Dict[str, ConnectionPool] = {}
+
+
+def get_connection_pool(config: Optional[Dict[str, Any]] = None) -> ConnectionPool:
+    """
+    获取共享连接池，同名连接池只在首次获取时按配置创建
+
+    Args:
+        config: 适配器配置，connection_pool 指定连接池名称（默认 "default"）
+
+    Returns:
+        ConnectionPool
+    """
+    config = config or {}
+    name = config.get("connection_pool", "default")
+    pool = _pools.get(name)
+    if pool is None:
+        pool = ConnectionPool.from_config(config, name)
+        _pools[name] = pool
+    return pool
@@ -0,0 +1,308 @@
+"""
+JSON Codec - API响应的JSON编解码
+安装了 orjson / msgspec 时使用它们直接从字节解码，否则回退到标准库 json；
+支持把响应解码为 dataclass 类型，以及从分块到达的响应中流式取出大数组的元素
+"""
+
+from typing import Dict, Any, Optional, List, Sequence, Union, Callable, AsyncIterable, AsyncIterator, get_args, get_origin, get_type_hints
+import codecs
+import dataclasses
+import gc
+import json
+import logging
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_raw_decoder = json.JSONDecoder()
+
+
+def available_backends() -> List[str]:
+    """已安装的JSON后端，按优先级排列"""
+    installed = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def convert(value: Any, target: Any) -> Any:
+    """
+    把解码后的JSON值转换为 target 类型
+
+    支持 dataclass（按字段名取值，忽略多余的键，缺少的键使用字段默认值）、
+    List[...]、Dict[str, ...] 和 Optional[...]，其他类型原样返回。
+
+    Args:
+        value: 解码后的JSON值
+        target: 目标类型
+
+    Returns:
+        转换后的值
+    """
+    converter = _converter(target)
+    return converter(value) if converter is not None and value is not None else value
+
+
+_converters: Dict[Any, Optional[Callable[[Any], Any]]] = {}
+
+
+def _converter(target: Any) -> Optional[Callable[[Any], Any]]:
+    """
+    按类型生成并缓存转换函数，不需要转换的类型返回 None
+
+    转换函数在首次使用时生成，之后每个值只做字段查找和构造，不再解析类型注解。
+    """
+    if target in _converters:
+        return _converters[target]
+    _converters[target] = None  # 自引用类型在生成期间按原样处理
+    converter: Optional[Callable[[Any], Any]] = None
+    origin = get_origin(target)
+    if origin is Union:
+        args = [arg for arg in get_args(target) if arg is not type(None)]
+        converter = _converter(args[0]) if len(args) == 1 else None
+    elif origin is list:
+        item_converter = _converter(get_args(target)[0]) if get_args(target) else None
+        if item_converter is not None:
+            converter = lambda value: [item if item is None else item_converter(item) for item in value]
+    elif origin is dict:
+        value_converter = _converter(get_args(target)[1]) if get_args(target) else None
+        if value_converter is not None:
+            converter = lambda value: {
+                key: item if item is None else value_converter(item) for key, item in value.items()
+            }
+    elif dataclasses.is_dataclass(target):
+        hints = get_type_hints(target)
+        fields = [(field.name, _converter(hints[field.name])) for field in dataclasses.fields(target)]
+
+        def converter(value: Any) -> Any:
+            if not isinstance(value, dict):
+                return value
+            kwargs = {}
+            for name, field_converter in fields:
+                if name in value:
+                    item = value[name]
+                    kwargs[name] = item if field_converter is None or item is None else field_converter(item)
+            return target(**kwargs)
+    _converters[target] = converter
+    return converter
+
+
+class JSONCodec:
+    """
+    JSON编解码器
+
+    解码直接接受响应字节，不先转换为字符串（标准库后端除外）。
+    类型化解码在安装了 msgspec 时由 msgspec 完成，只构造 dataclass 声明的字段；
+    否则先解码为字典再用 convert() 转换。
+    解码结果不含循环引用，大于 gc_pause_bytes 的响应解码期间暂停循环垃圾回收，
+    避免创建大量字典时反复触发回收（效果可用 benchmarks/json_decode_benchmark.py 对比 gc enabled / gc paused 两行）。
+
+    Args:
+        backend: "auto"（按 orjson、msgspec、json 的顺序选择已安装的后端）或后端名称
+        gc_pause_bytes: 解码期间暂停垃圾回收的响应大小阈值，0 表示不暂停
+    """
+
+    def __init__(self, backend: str = "auto", gc_pause_bytes: int = 1024 * 1024):
+        if backend == "auto":
+            backend = available_backends()[0]
+        if backend not in available_backends():
+            raise ValueError(f"JSON backend '{backend}' is not available (installed: {available_backends()})")
+        self.backend = backend
+        self.typed_backend = "msgspec" if msgspec is not None and backend != "json" else "convert"
+        self.gc_pause_bytes = gc_pause_bytes
+        self._typed_decoders: Dict[Any, Any] = {}
+
+    def loads(self, data: Union[bytes, str], target: Any = None) -> Any:
+        """
+        解码JSON
+
+        Args:
+            data: 响应字节或字符串
+            target: 目标类型，为 None 时返回字典/列表
+
+        Returns:
+            解码后的值
+        """
+        if self.gc_pause_bytes and len(data) >= self.gc_pause_bytes and gc.isenabled():
+            gc.disable()
+            try:
+                return self._decode(data, target)
+            finally:
+                gc.enable()
+        return self._decode(data, target)
+
+    def _decode(self, data: Union[bytes, str], target: Any) -> Any:
+        if target is not None:
+            if self.typed_backend == "msgspec":
+                decoder = self._typed_decoders.get(target)
+                if decoder is None:
+                    decoder = msgspec.json.Decoder(target)
+                    self._typed_decoders[target] = decoder
+                return decoder.decode(data)
+            return convert(self._decode(data, None), target)
+        if self.backend == "orjson":
+            return orjson.loads(data)
+        if self.backend == "msgspec":
+            return msgspec.json.decode(data)
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """编码为JSON字节"""
+        if self.backend == "orjson":
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        if self.backend == "msgspec":
+            return msgspec.json.encode(obj)
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    async def iter_items(self, chunks: AsyncIterable[bytes], path: Sequence[str] = (),
+                         target: Any = None) -> AsyncIterator[Any]:
+        """
+        从分块到达的JSON文档中逐个取出 path 处数组的元素
+
+        只有当前元素和未处理完的数据块驻留内存，适合远大于单个元素的响应。
+        数组之后的内容不再解析；path 上的键不存在或值不是数组时不产出任何元素。
+
+        Args:
+            chunks: 响应数据块
+            path: 数组在文档中的键路径，如 ["payload", "Orders"]；空路径表示文档本身是数组
+            target: 元素的目标类型
+
+        Yields:
+            数组元素
+        """
+        reader = _StreamReader(chunks)
+        for key in path:
+            if await reader.peek() != "{":
+                return
+            reader.pos += 1
+            while True:
+                char = await reader.peek()
+                if char == ",":
+                    reader.pos += 1
+                    char = await reader.peek()
+                if char != '"':
+                    return
+                name = await reader.value()
+                await reader.expect(":")
+                await reader.peek()
+                if name == key:
+                    break
+                await reader.value()
+        if await reader.peek() != "[":
+            return
+        reader.pos += 1
+        if await reader.peek() == "]":
+            return
+        while True:
+            await reader.peek()
+            item = await reader.value()
+            yield convert(item, target) if target is not None else item
+            char = await reader.peek()
+            reader.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Malformed JSON array at offset {reader.offset}")
+
+
+class _StreamReader:
+    """在分块到达的文本上逐个解析JSON值，已解析的部分及时丢弃"""
+
+    def __init__(self, chunks: AsyncIterable[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.consumed = 0
+        self.eof = False
+
+    @property
+    def offset(self) -> int:
+        return self.consumed + self.pos
+
+    async def _fill(self) -> bool:
+        """读入下一个数据块，没有更多数据时返回 False"""
+        if self.eof:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            self.buffer += self._decoder.decode(b"", final=True)
+            return False
+        if self.pos > len(self.buffer) // 2:
+            self.consumed += self.pos
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += self._decoder.decode(chunk)
+        return True
+
+    async def peek(self) -> str:
+        """跳过空白，返回下一个字符（不消耗），数据结束时返回空字符串"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not await self._fill():
+                return ""
+
+    async def expect(self, char: str):
+        if await self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.offset}")
+        self.pos += 1
+
+    async def value(self) -> Any:
+        """解析从当前位置开始的一个完整JSON值"""
+        while True:
+            try:
+                value, end = _raw_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # 值被块边界截断：至少读入与已缓冲部分等量的数据再重试，避免反复解析长值
+                pending = len(self.buffer) - self.pos
+                while len(self.buffer) - self.pos < 2 * pending:
+                    if not await self._fill():
+                        break
+                if self.eof and len(self.buffer) - self.pos <= pending:
+                    raise
+                continue
+            # 数字在块边界处可能被截断（如 "1." 或 "2e" 会解析出前半段），
+            # 确认其后的第一个非空白字符是 , ] } 或数据已结束
+            if type(value) in (int, float):
+                following = _WHITESPACE.match(self.buffer, end).end()
+                if (following >= len(self.buffer) or self.buffer[following] not in ",]}") and await self._fill():
+                    continue
+            self.pos = end
+            return value
+
+
+_codecs: Dict[str, JSONCodec] = {}
+
+
+def get_json_codec(backend: str = "auto") -> JSONCodec:
+    """
+    获取共享的编解码器
+
+    Args:
+        backend: "auto" 或后端名称
+
+    Returns:
+        JSONCodec
+    """
+    codec = _codecs.get(backend)
+    if codec is None:
+        codec = JSONCodec(backend)
+        _codecs[backend] = codec
+        logger.info(f"JSON codec backend: {codec.backend} (typed decoding: {codec.typed_backend})")
+    return codec
@@ -0,0 +1,115 @@
+"""
+Pagination - 分页接口的流式遍历
+按平台的游标/翻页规则逐页请求，在调用方处理当前页时预取后续页面，内存占用只与预取页数有关
+"""
+
+from typing import Dict, Any, Optional, List, Callable, Awaitable, AsyncIterator
+import asyncio
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PageFetcher = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+ItemExtractor = Callable[[Dict[str, Any]], List[Any]]
+NextParams = Callable[[Dict[str, Any], Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_DONE = object()
+
+
+async def paginate(
+    fetch_page: PageFetcher,
+    extract_items: ItemExtractor,
+    next_params: NextParams,
+    params: Optional[Dict[str, Any]] = None,
+    prefetch: int = 1,
+    max_pages: Optional[int] = None
+) -> AsyncIterator[Any]:
+    """
+    逐条产出分页接口的全部结果
+
+    后台任务按 next_params 连续请求页面放入容量为 prefetch 的队列，
+    调用方处理当前页时下一页已经在路上；队列满时后台任务暂停，
+    因此同时驻留内存的最多约 prefetch + 2 页（队列中的、正在处理的和刚请求到的）。
+    调用方提前退出（break / aclose）时取消后台任务。
+
+    Args:
+        fetch_page: 以查询参数请求一页，返回响应
+        extract_items: 从响应中取出本页结果
+        next_params: 根据响应和本页参数生成下一页参数，没有下一页时返回 None
+        params: 首页查询参数
+        prefetch: 预取页数，0 表示不预取（处理完当前页才请求下一页）
+        max_pages: 最多请求的页数
+
+    Yields:
+        单条结果
+
+    Raises:
+        请求失败时抛出 fetch_page 的异常（已经产出的结果不受影响）
+    """
+    if prefetch <= 0:
+        page_params: Optional[Dict[str, Any]] = dict(params or {})
+        pages = 0
+        while page_params is not None and (max_pages is None or pages < max_pages):
+            response = await fetch_page(page_params)
+            pages += 1
+            for item in extract_items(response):
+                yield item
+            page_params = next_params(response, page_params)
+        return
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=prefetch)
+
+    async def produce():
+        page_params: Optional[Dict[str, Any]] = dict(params or {})
+        pages = 0
+        try:
+            while page_params is not None and (max_pages is None or pages < max_pages):
+                response = await fetch_page(page_params)
+                pages += 1
+                page_params = next_params(response, page_params)
+                await queue.put(extract_items(response))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(_DONE)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            page = await queue.get()
+            if page is _DONE:
+                break
+            if isinstance(page, Exception):
+                raise page
+            for item in page:
+                yield item
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+
+def next_token_params(token_path: List[str], param_name: str) -> NextParams:
+    """
+    游标式翻页：响应中 token_path 处的令牌作为下一页的 param_name 参数
+
+    Args:
+        token_path: 令牌在响应中的路径，如 ["payload", "NextToken"]
+        param_name: 下一页请求的参数名
+    """
+    def next_params(response: Dict[str, Any], page_params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        value: Any = response
+        for key in token_path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        if not value:
+            return None
+        return {**page_params, param_name: value}
+    return next_params
@@ -0,0 +1,317 @@
+"""
+Rate Limiter - API请求速率限制
+基于GCRA（通用信元速率算法）的异步令牌桶，按适配器和端点限速，并根据 429/Retry-After 自适应降速
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import asyncio
+import logging
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class GCRALimiter:
+    """
+    GCRA令牌桶
+
+    只保存一个理论到达时间 (TAT)：每个请求把 TAT 推后 interval/rate 秒，
+    当 now >= TAT - (burst-1)*interval/rate 时请求可立即发出。
+    reserve() 同步完成预约，预约和更新 TAT 之间没有 await，
+    并发协程按调用顺序排队，各自只等待自己的时间片。
+
+    收到 429 时 (penalize) 速率按 backoff_factor 下降并进入新的一代 (generation)：
+    TAT 重置到 Retry-After 之后，仍在等待的旧预约醒来后重新排队；
+    同一代内只降速一次，之前发出的请求返回的 429 不再重复降速。
+    成功响应按 recovery_rate 加性恢复，每个 interval 最多恢复目标速率的 recovery_rate。
+    """
+
+    def __init__(self, rate: float, interval: float = 1.0, burst: Optional[int] = None,
+                 min_rate: Optional[float] = None, backoff_factor: float = 0.8,
+                 recovery_rate: float = 0.1, clock=None):
+        if rate <= 0 or interval <= 0:
+            raise ValueError("rate and interval must be positive")
+        self.interval = interval
+        self.target_rate = rate
+        self.rate = rate
+        self.burst = max(1, int(burst if burst is not None else 1))
+        self.min_rate = min_rate if min_rate is not None else rate / 100
+        self.backoff_factor = backoff_factor
+        self.recovery_rate = recovery_rate
+        self._clock = clock or time.monotonic
+        self._tat = self._clock()
+        self.generation = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    @property
+    def emission_interval(self) -> float:
+        """相邻两次请求的最小间隔（秒）"""
+        return self.interval / self.rate
+
+    def available_at(self) -> float:
+        """不消耗名额，返回最早可以发出下一个请求的时刻（时钟读数）"""
+        now = self._clock()
+        return max(now, self._tat - self.emission_interval * (self.burst - 1))
+
+    def reserve(self, at: Optional[float] = None) -> float:
+        """
+        预约一个请求名额
+
+        Args:
+            at: 请求实际发出的时刻（时钟读数），晚于本限速器的可用时刻时按该时刻预约
+
+        Returns:
+            发出请求前需要等待的秒数
+        """
+        now = self._clock()
+        earliest = max(now, at) if at is not None else now
+        emission = self.emission_interval
+        tat = max(self._tat, earliest)
+        start = max(earliest, tat - emission * (self.burst - 1))
+        self._tat = tat + emission
+        self.acquired += 1
+        delay = start - now
+        self.total_wait += delay
+        return delay
+
+    def try_acquire(self) -> float:
+        """
+        不排队地尝试获取名额（服务端限流使用）
+
+        Returns:
+            0 表示已获取；否则为距离下一个可用名额的秒数，此时不消耗名额
+        """
+        now = self._clock()
+        emission = self.emission_interval
+        tat = max(self._tat, now)
+        wait = tat - emission * (self.burst - 1) - now
+        if wait > 0:
+            return wait
+        self._tat = tat + emission
+        self.acquired += 1
+        return 0.0
+
+    async def acquire(self) -> int:
+        """
+        等待直到可以发出一个请求
+
+        Returns:
+            放行时的代数，响应为 429 时传给 penalize
+        """
+        while True:
+            generation = self.generation
+            delay = self.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.generation == generation:
+                return generation
+
+    def penalize(self, retry_after: Optional[float] = None, generation: Optional[int] = None):
+        """
+        收到 429 后降速
+
+        Args:
+            retry_after: 服务端要求的等待秒数
+            generation: 该请求放行时的代数，早于当前代的请求不再重复降速
+        """
+        self.throttled += 1
+        if generation is not None and generation != self.generation:
+            return
+        self.generation += 1
+        self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+        # 丢弃尚未发出的预约，Retry-After 之后按新速率重新排队
+        self._tat = self._clock() + (retry_after or 0.0) + self.emission_interval * (self.burst - 1)
+
+    def recover(self):
+        """成功响应后按 recovery_rate 逐步恢复到目标速率"""
+        if self.rate < self.target_rate:
+            step = self.recovery_rate * self.target_rate / self.rate
+            self.rate = min(self.target_rate, self.rate + step)
+
+    def set_rate(self, rate: float):
+        """更新目标速率（如服务端通过响应头告知的限额）"""
+        if rate <= 0:
+            return
+        backed_off = self.rate < self.target_rate
+        self.target_rate = rate
+        self.rate = min(self.rate, rate) if backed_off else rate
+        self.min_rate = min(self.min_rate, rate)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "target_rate": self.target_rate,
+            "interval": self.interval,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "average_wait": self.total_wait / self.acquired if self.acquired else 0.0
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 秒数（允许小数）或HTTP日期
+
+    Returns:
+        等待秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdapterRateLimiter:
+    """
+    适配器速率限制
+
+    每个适配器一个全局限速器（rate_limit 次 / rate_limit_interval 秒），
+    endpoint_rate_limits 中按路径前缀配置的端点另有独立限速器，请求需同时满足两者：
+    先取各限速器最早可用时刻的最大值作为发出时刻，再在该时刻同时预约，
+    等待端点名额的请求不会提前占用全局名额，放行后也不会集中突发超过全局速率。
+    配置 rate_limit_header 时，响应头中的限额是该操作（端点）的限额：
+    调整匹配的端点限速器，没有配置时为该路径新建一个端点限速器，全局限速不受影响。
+    """
+
+    def __init__(self, rate: float, interval: float = 1.0, burst: Optional[int] = None,
+                 endpoint_limits: Optional[Dict[str, Any]] = None,
+                 rate_limit_header: Optional[str] = None, max_retries: int = 3):
+        self.interval = interval
+        self.global_limiter = GCRALimiter(rate, interval, burst)
+        self.endpoint_limiters: Dict[str, GCRALimiter] = {}
+        for prefix, limit in (endpoint_limits or {}).items():
+            if isinstance(limit, dict):
+                self.endpoint_limiters[prefix] = GCRALimiter(
+                    limit["rate"], limit.get("interval", interval), limit.get("burst")
+                )
+            else:
+                self.endpoint_limiters[prefix] = GCRALimiter(limit, interval)
+        self._prefixes = sorted(self.endpoint_limiters, key=len, reverse=True)
+        # 按响应头限额新建的端点限速器，按路径精确匹配
+        self.operation_limiters: Dict[str, GCRALimiter] = {}
+        self.rate_limit_header = rate_limit_header
+        self.max_retries = max_retries
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'AdapterRateLimiter':
+        """从适配器配置创建"""
+        return cls(
+            rate=config.get("rate_limit", 100),
+            interval=config.get("rate_limit_interval", 1.0),
+            burst=config.get("rate_limit_burst"),
+            endpoint_limits=config.get("endpoint_rate_limits"),
+            rate_limit_header=config.get("rate_limit_header"),
+            max_retries=config.get("rate_limit_max_retries", 3)
+        )
+
+    @staticmethod
+    def _operation(endpoint: str) -> str:
+        """去掉查询参数后的端点路径"""
+        return endpoint.split("?", 1)[0]
+
+    def _limiters(self, endpoint: str) -> Tuple[Optional[GCRALimiter], List[GCRALimiter]]:
+        """端点限速器（最长前缀匹配，其次是按响应头新建的），以及该请求需要经过的全部限速器"""
+        for prefix in self._prefixes:
+            if endpoint.startswith(prefix):
+                limiter = self.endpoint_limiters[prefix]
+                return limiter, [self.global_limiter, limiter]
+        limiter = self.operation_limiters.get(self._operation(endpoint))
+        if limiter is not None:
+            return limiter, [self.global_limiter, limiter]
+        return None, [self.global_limiter]
+
+    async def acquire(self, endpoint: str = "") -> Tuple[int, ...]:
+        """
+        等待直到可以向 endpoint 发出请求
+
+        Returns:
+            各限速器放行时的代数，传给 on_response
+        """
+        _, limiters = self._limiters(endpoint)
+        while True:
+            generations = tuple(limiter.generation for limiter in limiters)
+            # 在最晚可用的时刻同时预约全部限速器，预约时刻即请求实际发出的时刻
+            fire_at = max(limiter.available_at() for limiter in limiters)
+            delay = max(limiter.reserve(fire_at) for limiter in limiters)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if generations == tuple(limiter.generation for limiter in limiters):
+                return generations
+
+    def on_response(self, endpoint: str, status: int, headers,
+                    generations: Optional[Tuple[int, ...]] = None) -> Optional[float]:
+        """
+        根据响应调整限速
+
+        Args:
+            endpoint: API端点
+            status: HTTP状态码
+            headers: 响应头
+            generations: acquire() 返回的代数
+
+        Returns:
+            429 时返回 Retry-After 秒数（未给出时为 None），否则返回 None
+        """
+        endpoint_limiter, limiters = self._limiters(endpoint)
+        target = endpoint_limiter or self.global_limiter
+        if status == 429:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            generation = generations[limiters.index(target)] if generations else None
+            target.penalize(retry_after, generation)
+            logger.warning(f"Rate limited on {endpoint}, retry after {retry_after}s, rate now {target.rate:.2f}")
+            return retry_after
+        if self.rate_limit_header:
+            advertised = headers.get(self.rate_limit_header)
+            if advertised:
+                try:
+                    rate = float(advertised)
+                except ValueError:
+                    rate = None
+                if rate and rate > 0:
+                    self._apply_operation_limit(endpoint, endpoint_limiter, rate)
+        if status < 400:
+            for limiter in limiters:
+                limiter.recover()
+        return None
+
+    def _apply_operation_limit(self, endpoint: str, limiter: Optional[GCRALimiter], rate: float):
+        """
+        按响应头给出的操作限额调整端点限速器
+
+        Args:
+            endpoint: API端点
+            limiter: 端点当前匹配的限速器，没有时为该路径新建
+            rate: 响应头给出的每秒请求数
+        """
+        if limiter is None:
+            operation = self._operation(endpoint)
+            self.operation_limiters[operation] = GCRALimiter(rate * self.interval, self.interval)
+            logger.info(f"Rate limit for {operation} set to {rate}/s from response header")
+        elif rate * limiter.interval != limiter.target_rate:
+            limiter.set_rate(rate * limiter.interval)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats = {"global": self.global_limiter.get_statistics()}
+        stats["endpoints"] = {
+            prefix: limiter.get_statistics()
+            for prefix, limiter in {**self.endpoint_limiters, **self.operation_limiters}.items()
+        }
+        return stats
@@ -0,0 +1,235 @@
+"""
+Request Metrics - 按端点的HTTP请求指标
+通过 aiohttp 追踪回调测量每个请求的DNS、建连、等待连接、首字节和总耗时，
+按端点模板统计请求数、状态码分布、收发字节数和延迟直方图，并记录慢请求
+"""
+
+from typing import Dict, Any, Optional, List
+from collections import deque
+from datetime import datetime
+import logging
+import time
+
+import aiohttp
+
+from core.monitoring.histogram import LatencyHistogram
+from core.tools.resilience import AdapterResilience
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PHASES = ("dns", "connect", "pool_wait", "ttfb", "total")
+
+
+class RequestTiming:
+    """
+    单个HTTP请求的计时和字节数
+
+    作为 trace_request_ctx 传给 session.request()，由 request_trace_config() 的回调填写各阶段时间点。
+    复用连接的请求没有 dns / connect 阶段。
+    """
+
+    __slots__ = ("method", "endpoint", "started", "marks", "status", "error", "bytes_sent", "bytes_received", "ended")
+
+    def __init__(self, method: str, endpoint: str):
+        self.method = method
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+        self.status: Optional[int] = None
+        self.error: Optional[str] = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.ended: Optional[float] = None
+
+    def mark(self, name: str):
+        self.marks[name] = time.perf_counter()
+
+    def phase(self, start: str, end: str) -> Optional[float]:
+        if start in self.marks and end in self.marks:
+            return self.marks[end] - self.marks[start]
+        return None
+
+    def durations(self) -> Dict[str, Optional[float]]:
+        """各阶段耗时（秒）：ttfb 从发出请求到收到响应头，total 包括读取响应体"""
+        ended = self.ended if self.ended is not None else time.perf_counter()
+        return {
+            "dns": self.phase("dns_start", "dns_end"),
+            "connect": self.phase("connect_start", "connect_end"),
+            "pool_wait": self.phase("queued_start", "queued_end"),
+            "ttfb": self.phase("request_start", "request_end"),
+            "total": ended - self.started
+        }
+
+
+def request_trace_config() -> aiohttp.TraceConfig:
+    """
+    把请求各阶段的时间点和收发字节数写入 trace_request_ctx 中的 RequestTiming
+
+    未传 RequestTiming 的请求（如直接使用会话上传文档）不受影响。
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def marker(name: str):
+        async def on_event(session, context, params):
+            timing = context.trace_request_ctx
+            if isinstance(timing, RequestTiming):
+                timing.mark(name)
+        return on_event
+
+    async def on_chunk_sent(session, context, params):
+        timing = context.trace_request_ctx
+        if isinstance(timing, RequestTiming):
+            timing.bytes_sent += len(params.chunk)
+
+    async def on_chunk_received(session, context, params):
+        timing = context.trace_request_ctx
+        if isinstance(timing, RequestTiming):
+            timing.bytes_received += len(params.chunk)
+
+    trace_config.on_request_start.append(marker("request_start"))
+    trace_config.on_request_end.append(marker("request_end"))
+    trace_config.on_dns_resolvehost_start.append(marker("dns_start"))
+    trace_config.on_dns_resolvehost_end.append(marker("dns_end"))
+    trace_config.on_connection_create_start.append(marker("connect_start"))
+    trace_config.on_connection_create_end.append(marker("connect_end"))
+    trace_config.on_connection_queued_start.append(marker("queued_start"))
+    trace_config.on_connection_queued_end.append(marker("queued_end"))
+    trace_config.on_request_chunk_sent.append(on_chunk_sent)
+    trace_config.on_response_chunk_received.append(on_chunk_received)
+    return trace_config
+
+
+class EndpointMetrics:
+    """一个端点模板的累计指标"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.status_codes: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.new_connections = 0
+        self.histograms = {phase: LatencyHistogram() for phase in PHASES}
+
+    def record(self, timing: RequestTiming, durations: Dict[str, Optional[float]]):
+        self.requests += 1
+        code = str(timing.status) if timing.status is not None else (timing.error or "error")
+        self.status_codes[code] = self.status_codes.get(code, 0) + 1
+        if timing.error is not None or (timing.status is not None and timing.status >= 400):
+            self.errors += 1
+        self.bytes_sent += timing.bytes_sent
+        self.bytes_received += timing.bytes_received
+        if durations["connect"] is not None:
+            self.new_connections += 1
+        for phase, seconds in durations.items():
+            if seconds is not None:
+                self.histograms[phase].record(seconds)
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.histograms["total"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "status_codes": dict(self.status_codes),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "new_connections": self.new_connections,
+            "total_time": total.total,
+            "latency": {phase: histogram.summary() for phase, histogram in self.histograms.items()}
+        }
+
+
+class RequestMetrics:
+    """
+    适配器的按端点请求指标
+
+    端点按 方法 + 路径模板 归类（与熔断器相同，ID等路径段归一化为 {id}）。
+    每次HTTP尝试（包括 429 和重试）单独计数；总耗时超过 slow_threshold 的请求写入警告日志，
+    并保留最近 slow_log_size 条供 get_status() 查看。
+
+    Args:
+        slow_threshold: 慢请求阈值（秒），None 表示不记录
+        slow_log_size: 保留的慢请求条数
+    """
+
+    def __init__(self, slow_threshold: Optional[float] = 2.0, slow_log_size: int = 100):
+        self.slow_threshold = slow_threshold
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self.slow_requests: deque = deque(maxlen=slow_log_size)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'RequestMetrics':
+        """从适配器配置创建"""
+        return cls(
+            slow_threshold=config.get("slow_request_threshold", 2.0),
+            slow_log_size=config.get("slow_request_log_size", 100)
+        )
+
+    def start(self, method: str, endpoint: str) -> RequestTiming:
+        """开始计时一次请求，返回的对象作为 trace_request_ctx 传给 aiohttp"""
+        return RequestTiming(method, endpoint)
+
+    def record(self, timing: RequestTiming):
+        """请求（包括读取响应体）结束后记录"""
+        timing.ended = time.perf_counter()
+        durations = timing.durations()
+        key = AdapterResilience.endpoint_key(timing.method, timing.endpoint)
+        metrics = self.endpoints.get(key)
+        if metrics is None:
+            metrics = EndpointMetrics()
+            self.endpoints[key] = metrics
+        metrics.record(timing, durations)
+
+        if self.slow_threshold is not None and durations["total"] >= self.slow_threshold:
+            entry = {
+                "endpoint": key,
+                "path": timing.endpoint,
+                "status": timing.status,
+                "error": timing.error,
+                "at": datetime.now().isoformat(),
+                "bytes_received": timing.bytes_received,
+                **durations
+            }
+            self.slow_requests.append(entry)
+            phases = ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in durations.items()
+                               if seconds is not None and phase != "total")
+            logger.warning(f"Slow request {timing.method} {timing.endpoint}: {durations['total']:.2f}s "
+                           f"(status {timing.status or timing.error}; {phases})")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        各端点指标，按累计耗时从高到低排列
+
+        Returns:
+            {"endpoints": {端点: 指标}, "slow_requests": [...]}；time_share 为该端点占全部请求耗时的比例
+        """
+        overall = sum(metrics.histograms["total"].total for metrics in self.endpoints.values())
+        endpoints = {}
+        for key, metrics in sorted(self.endpoints.items(), key=lambda item: -item[1].histograms["total"].total):
+            endpoints[key] = metrics.to_dict()
+            endpoints[key]["time_share"] = endpoints[key]["total_time"] / overall if overall else 0.0
+        return {
+            "endpoints": endpoints,
+            "slow_requests": list(self.slow_requests)
+        }
+
+    def top_endpoints(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """累计耗时最多的端点：请求数、p50/p99 和耗时占比"""
+        statistics = self.get_statistics()["endpoints"]
+        return [
+            {
+                "endpoint": key,
+                "requests": metrics["requests"],
+                "p50": metrics["latency"]["total"]["p50"],
+                "p99": metrics["latency"]["total"]["p99"],
+                "time_share": metrics["time_share"]
+            }
+            for key, metrics in list(statistics.items())[:limit]
+        ]
+
+    def reset(self):
+        """清空统计"""
+        self.endpoints.clear()
+        self.slow_requests.clear()
@@ -0,0 +1,87 @@
+"""
+Request Window - 在途请求窗口
+限制每个适配器同时在途的请求数，等待者严格按到达顺序获得名额
+"""
+
+from typing import Dict, Any
+from collections import deque
+import asyncio
+
+
+class RequestWindow:
+    """
+    先进先出的在途请求窗口
+
+    与 asyncio.Semaphore 不同，release() 把名额直接交给队首等待者，
+    新到达的协程不能在等待者被唤醒前抢占名额；等待中被取消的协程会把已交给它的名额继续传递。
+    """
+
+    def __init__(self, size: int = 10):
+        if size < 1:
+            raise ValueError("Request window size must be at least 1")
+        self.size = size
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self._waiters: deque = deque()
+
+    async def acquire(self):
+        """获取一个在途名额，窗口已满时排队等待"""
+        if self.in_flight < self.size and not self._waiters:
+            self._admit()
+            return
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        start = loop.time()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 名额已经交给了这个等待者，转交给下一个
+                self.in_flight -= 1
+                self._wake_next()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        self.total_wait += loop.time() - start
+
+    def _admit(self):
+        self.in_flight += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+
+    def _wake_next(self):
+        while self._waiters and self.in_flight < self.size:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._admit()
+                waiter.set_result(None)
+
+    def release(self):
+        """释放名额并交给队首等待者"""
+        self.in_flight -= 1
+        self.completed += 1
+        self._wake_next()
+
+    async def __aenter__(self) -> 'RequestWindow':
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "average_wait": self.total_wait / self.completed if self.completed else 0.0
+        }
@@ -0,0 +1,291 @@
+"""
+Resilience - API请求重试与熔断
+对幂等请求的暂时性错误做带抖动的指数退避重试，按端点熔断，统计重试次数、熔断状态和错误类别
+"""
+
+from typing import Dict, Any, Optional, Iterable
+import asyncio
+import logging
+import random
+import re
+import time
+
+import aiohttp
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+DEFAULT_RETRY_STATUSES = (500, 502, 503, 504)
+
+_VERSION_SEGMENT = re.compile(r"v\d+(\.\d+)*")
+
+
+class APIError(Exception):
+    """
+    API请求错误
+
+    Args:
+        message: 错误信息
+        status: HTTP状态码（网络错误时为 None）
+        endpoint: API端点
+        error_class: 错误类别 http_4xx / http_5xx / rate_limited / timeout / connect / connection / circuit_open
+        retryable: 是否为暂时性错误
+        body: 响应体
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None, endpoint: Optional[str] = None,
+                 error_class: str = "http", retryable: bool = False, body: Any = None):
+        super().__init__(message)
+        self.status = status
+        self.endpoint = endpoint
+        self.error_class = error_class
+        self.retryable = retryable
+        self.body = body
+
+
+class CircuitOpenError(APIError):
+    """端点熔断中，请求未发出即失败"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(
+            f"Circuit open for {endpoint}, retry in {retry_in:.1f}s",
+            endpoint=endpoint, error_class="circuit_open", retryable=False
+        )
+        self.retry_in = retry_in
+
+
+def classify_error(error: BaseException, endpoint: str,
+                   retry_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES) -> APIError:
+    """
+    把请求异常归一化为 APIError
+
+    Args:
+        error: 原始异常
+        endpoint: API端点
+        retry_statuses: 视为暂时性错误的HTTP状态码
+
+    Returns:
+        APIError（原始异常为 APIError 时原样返回）
+    """
+    if isinstance(error, APIError):
+        if error.status is not None and error.error_class == "http":
+            error.error_class = "http_5xx" if error.status >= 500 else "http_4xx"
+            error.retryable = error.status in retry_statuses
+        return error
+    if isinstance(error, asyncio.TimeoutError):
+        error_class = "timeout"
+    elif isinstance(error, aiohttp.ClientConnectorError):
+        # 连接未建立，请求一定没有发出
+        error_class = "connect"
+    elif isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, ConnectionError)):
+        error_class = "connection"
+    else:
+        return APIError(f"Request failed: {error!r}", endpoint=endpoint, error_class="unknown")
+    api_error = APIError(f"Request failed ({error_class}): {error!r}", endpoint=endpoint,
+                         error_class=error_class, retryable=True)
+    api_error.__cause__ = error
+    return api_error
+
+
+class RetryPolicy:
+    """
+    请求重试策略
+
+    只有幂等方法 (retry_methods) 的暂时性错误会重试；连接未建立 (connect) 的请求任何方法都可重试。
+    重试间隔为 random(0, min(max_delay, base_delay * 2^(attempt-1)))（full jitter）。
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 10.0,
+                 retry_methods: Iterable[str] = IDEMPOTENT_METHODS,
+                 retry_statuses: Iterable[int] = DEFAULT_RETRY_STATUSES):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_methods = {method.upper() for method in retry_methods}
+        self.retry_statuses = set(retry_statuses)
+        self._random = random.Random()
+
+    def should_retry(self, method: str, error: APIError, attempt: int) -> bool:
+        """
+        判断失败后是否重试
+
+        Args:
+            method: HTTP方法
+            error: 归一化后的错误
+            attempt: 已完成的尝试次数（从1开始）
+        """
+        if not error.retryable or attempt > self.max_retries:
+            return False
+        return error.error_class == "connect" or method.upper() in self.retry_methods
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次重试前的等待时间（秒）"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self._random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    端点熔断器
+
+    closed: 正常放行，连续 failure_threshold 次暂时性错误后转为 open；
+    open: 直接抛出 CircuitOpenError，recovery_timeout 秒后转为 half_open；
+    half_open: 最多放行 half_open_max_calls 个试探请求，成功则 closed，失败则重新 open。
+    """
+
+    def __init__(self, key: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1, clock=None):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock or time.monotonic
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+        self.opens = 0
+        self.short_circuited = 0
+
+    def before_call(self):
+        """请求发出前检查，熔断中时抛出 CircuitOpenError"""
+        if self.state == "open":
+            elapsed = self._clock() - self.opened_at
+            if elapsed < self.recovery_timeout:
+                self.short_circuited += 1
+                raise CircuitOpenError(self.key, self.recovery_timeout - elapsed)
+            self.state = "half_open"
+            self.half_open_calls = 0
+        if self.state == "half_open":
+            if self.half_open_calls >= self.half_open_max_calls:
+                self.short_circuited += 1
+                raise CircuitOpenError(self.key, 0.0)
+            self.half_open_calls += 1
+
+    def release_call(self):
+        """放弃已放行的请求（如请求被取消），归还试探名额，不计为成功或失败"""
+        if self.state == "half_open" and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def record_success(self):
+        if self.state != "closed":
+            logger.info(f"Circuit closed for {self.key}")
+        self.state = "closed"
+        self.consecutive_failures = 0
+
+    def record_failure(self, error: APIError):
+        """记录失败，只有暂时性错误计入熔断"""
+        if not error.retryable:
+            self.release_call()
+            return
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+                logger.warning(f"Circuit opened for {self.key} after {self.consecutive_failures} failures")
+            self.state = "open"
+            self.opened_at = self._clock()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opens": self.opens,
+            "short_circuited": self.short_circuited
+        }
+
+
+class AdapterResilience:
+    """
+    适配器的重试策略、按端点划分的熔断器和错误统计
+
+    端点按路径模板划分熔断器：含数字的路径段（ID、SKU等，版本号 v1 除外）归一化为 {id}。
+    """
+
+    def __init__(self, retry_policy: Optional[RetryPolicy] = None, failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.metrics = {
+            "retries": 0,
+            "retries_exhausted": 0,
+            "errors_by_class": {},
+            "retries_by_endpoint": {}
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'AdapterResilience':
+        """从适配器配置创建"""
+        return cls(
+            retry_policy=RetryPolicy(
+                max_retries=config.get("http_retry_attempts", 3),
+                base_delay=config.get("http_retry_delay", 0.5),
+                max_delay=config.get("http_retry_max_delay", 10.0),
+                retry_methods=config.get("http_retry_methods", IDEMPOTENT_METHODS),
+                retry_statuses=config.get("http_retry_statuses", DEFAULT_RETRY_STATUSES)
+            ),
+            failure_threshold=config.get("circuit_failure_threshold", 5),
+            recovery_timeout=config.get("circuit_recovery_timeout", 30.0),
+            half_open_max_calls=config.get("circuit_half_open_calls", 1)
+        )
+
+    @staticmethod
+    def endpoint_key(method: str, endpoint: str) -> str:
+        """熔断器键：方法 + 路径模板"""
+        segments = endpoint.split("?", 1)[0].split("/")
+        template = "/".join(
+            "{id}" if any(c.isdigit() for c in segment) and not _VERSION_SEGMENT.fullmatch(segment) else segment
+            for segment in segments
+        )
+        return f"{method.upper()} {template}"
+
+    def breaker_for(self, method: str, endpoint: str) -> CircuitBreaker:
+        key = self.endpoint_key(method, endpoint)
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(key, self.failure_threshold, self.recovery_timeout, self.half_open_max_calls)
+            self.breakers[key] = breaker
+        return breaker
+
+    def record_failure(self, breaker: CircuitBreaker, error: BaseException, endpoint: str) -> APIError:
+        """
+        记录一次失败
+
+        Returns:
+            归一化后的 APIError
+        """
+        api_error = classify_error(error, endpoint, self.retry_policy.retry_statuses)
+        by_class = self.metrics["errors_by_class"]
+        by_class[api_error.error_class] = by_class.get(api_error.error_class, 0) + 1
+        if not isinstance(api_error, CircuitOpenError):
+            breaker.record_failure(api_error)
+        return api_error
+
+    def should_retry(self, method: str, endpoint: str, error: APIError, attempt: int) -> bool:
+        """判断是否重试并记录重试/放弃次数"""
+        if self.retry_policy.should_retry(method, error, attempt):
+            self.metrics["retries"] += 1
+            key = self.endpoint_key(method, endpoint)
+            by_endpoint = self.metrics["retries_by_endpoint"]
+            by_endpoint[key] = by_endpoint.get(key, 0) + 1
+            return True
+        if error.retryable and attempt > self.retry_policy.max_retries:
+            self.metrics["retries_exhausted"] += 1
+        return False
+
+    def backoff(self, attempt: int) -> float:
+        return self.retry_policy.backoff(attempt)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """重试次数、错误类别分布和各端点熔断状态"""
+        return {
+            "retries": self.metrics["retries"],
+            "retries_exhausted": self.metrics["retries_exhausted"],
+            "errors_by_class": dict(self.metrics["errors_by_class"]),
+            "retries_by_endpoint": dict(self.metrics["retries_by_endpoint"]),
+            "circuits": {key: breaker.get_statistics() for key, breaker in self.breakers.items()}
+        }
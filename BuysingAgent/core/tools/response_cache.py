@@ -0,0 +1,232 @@
+"""
+Response Cache - 只读API接口的响应缓存
+按 (端点, 规范化参数) 缓存GET响应，支持按端点的TTL、ETag/Last-Modified 条件请求、
+过期后在后台重新验证 (stale-while-revalidate) 以及并发请求合并
+"""
+
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+import asyncio
+import json
+import logging
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str]
+# send(条件请求头) -> (状态码, 响应数据, ETag, Last-Modified)，304 时响应数据为 None
+ConditionalSend = Callable[[Dict[str, str]], Awaitable[Tuple[int, Any, Optional[str], Optional[str]]]]
+
+
+class CachedResponse:
+    """缓存的响应及其验证信息"""
+
+    def __init__(self, data: Any, etag: Optional[str], last_modified: Optional[str],
+                 pattern: str, ttl: float, stale_ttl: float):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.pattern = pattern
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stored_at = time.monotonic()
+
+    def is_fresh(self, now: float) -> bool:
+        return now - self.stored_at < self.ttl
+
+    def is_servable_stale(self, now: float) -> bool:
+        return now - self.stored_at < self.ttl + self.stale_ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    响应缓存
+
+    ttls 以端点通配模式（fnmatch，如 "/*/audience_insights"）配置缓存时间，值为秒数或
+    {"ttl": 秒数, "stale": 秒数}；未匹配的端点不缓存。
+    - 新鲜期内直接返回缓存；
+    - 过期但仍在 stale 窗口内时立即返回旧数据，并在后台发起一次条件请求刷新；
+    - 超过 stale 窗口时带 If-None-Match / If-Modified-Since 重新请求，304 只刷新时间戳；
+    - 同一键的并发请求只发出一次（single-flight）。
+    对匹配同一模式的端点发起写请求 (POST/PUT/PATCH/DELETE) 后，该模式下的缓存失效；
+    失效前已发出的请求仍交给原来的等待者，但不再写入缓存，之后的请求也不会合并到它上面。
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, Any]] = None, stale_ttl: float = 0.0, max_entries: int = 1000):
+        self.policies: Dict[str, Tuple[float, float]] = {}
+        for pattern, policy in (ttls or {}).items():
+            if isinstance(policy, dict):
+                self.policies[pattern] = (policy["ttl"], policy.get("stale", stale_ttl))
+            else:
+                self.policies[pattern] = (policy, stale_ttl)
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self.in_flight: Dict[CacheKey, asyncio.Task] = {}
+        # 每个模式的失效次数，请求完成时与发出时不同则不写入缓存
+        self.generations: Dict[str, int] = {}
+        self._pattern_cache: Dict[str, Optional[str]] = {}
+        self.metrics = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "revalidations": 0,
+            "not_modified": 0,
+            "refresh_failures": 0,
+            "invalidations": 0,
+            "evictions": 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ResponseCache':
+        """从适配器配置创建"""
+        return cls(
+            ttls=config.get("response_cache_ttls"),
+            stale_ttl=config.get("response_cache_stale_ttl", 0.0),
+            max_entries=config.get("response_cache_max_entries", 1000)
+        )
+
+    def match(self, endpoint: str) -> Optional[str]:
+        """端点匹配的缓存模式，未匹配时返回 None"""
+        if endpoint not in self._pattern_cache:
+            if len(self._pattern_cache) >= 4 * self.max_entries:
+                self._pattern_cache.clear()
+            self._pattern_cache[endpoint] = next(
+                (pattern for pattern in self.policies if fnmatchcase(endpoint, pattern)), None
+            )
+        return self._pattern_cache[endpoint]
+
+    def is_cacheable(self, method: str, endpoint: str) -> bool:
+        return method == "GET" and self.match(endpoint) is not None
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]]) -> CacheKey:
+        """参数按键排序后序列化，等价参数得到同一个键"""
+        return endpoint, json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+    async def fetch(self, endpoint: str, params: Optional[Dict[str, Any]], send: ConditionalSend) -> Any:
+        """
+        读取缓存或发出请求
+
+        Args:
+            endpoint: API端点
+            params: 查询参数
+            send: 以条件请求头发出请求的协程函数
+
+        Returns:
+            响应数据
+        """
+        key = self.make_key(endpoint, params)
+        entry = self.entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            if entry.is_fresh(now):
+                self.metrics["hits"] += 1
+                self.entries.move_to_end(key)
+                return entry.data
+            if entry.is_servable_stale(now):
+                self.metrics["stale_hits"] += 1
+                self.entries.move_to_end(key)
+                if key not in self.in_flight:
+                    self._start(key, endpoint, send).add_done_callback(self._log_refresh_failure)
+                return entry.data
+
+        shared = self.in_flight.get(key)
+        if shared is not None:
+            self.metrics["coalesced"] += 1
+        else:
+            self.metrics["misses"] += 1
+            shared = self._start(key, endpoint, send)
+        # 请求在独立任务中执行，单个调用方被取消不影响其他等待者
+        return await asyncio.shield(shared)
+
+    def _start(self, key: CacheKey, endpoint: str, send: ConditionalSend) -> asyncio.Task:
+        """启动（条件）请求任务，完成前同一键的请求等待该任务"""
+        task = asyncio.create_task(self._revalidate(key, endpoint, send))
+        self.in_flight[key] = task
+        task.add_done_callback(lambda _: self._finish(key, task))
+        return task
+
+    def _finish(self, key: CacheKey, task: asyncio.Task):
+        # 失效后同一键可能已有新的请求，只移除自己
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+
+    async def _revalidate(self, key: CacheKey, endpoint: str, send: ConditionalSend) -> Any:
+        """发出请求，已有缓存时带条件请求头，304 只刷新缓存时间"""
+        entry = self.entries.get(key)
+        pattern = self.match(endpoint)
+        generation = self.generations.get(pattern, 0)
+        status, data, etag, last_modified = await send(entry.conditional_headers() if entry else {})
+        if entry is not None:
+            self.metrics["revalidations"] += 1
+        if status == 304 and entry is not None:
+            self.metrics["not_modified"] += 1
+            entry.stored_at = time.monotonic()
+            return entry.data
+        if self.generations.get(pattern, 0) == generation:
+            self._store(key, endpoint, data, etag, last_modified)
+        return data
+
+    def _log_refresh_failure(self, task: asyncio.Task):
+        """后台刷新失败时保留旧数据，只记录日志"""
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.metrics["refresh_failures"] += 1
+            logger.warning(f"Background revalidation failed: {error}")
+
+    def _store(self, key: CacheKey, endpoint: str, data: Any, etag: Optional[str], last_modified: Optional[str]):
+        pattern = self.match(endpoint)
+        if pattern is None:
+            return
+        ttl, stale_ttl = self.policies[pattern]
+        self.entries[key] = CachedResponse(data, etag, last_modified, pattern, ttl, stale_ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    def invalidate(self, endpoint: Optional[str] = None):
+        """
+        使缓存失效，并让进行中的请求不再被合并或写入缓存
+
+        Args:
+            endpoint: 写请求的端点，清除与其匹配同一模式的条目；None 表示全部清除
+        """
+        if endpoint is None:
+            patterns = set(self.policies)
+        else:
+            pattern = self.match(endpoint)
+            if pattern is None:
+                return
+            patterns = {pattern}
+        for pattern in patterns:
+            self.generations[pattern] = self.generations.get(pattern, 0) + 1
+        for key in [key for key in self.in_flight if self.match(key[0]) in patterns]:
+            del self.in_flight[key]
+        stale_keys = [key for key, entry in self.entries.items() if entry.pattern in patterns]
+        for key in stale_keys:
+            del self.entries[key]
+        self.metrics["invalidations"] += len(stale_keys)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """命中率及各类计数"""
+        lookups = self.metrics["hits"] + self.metrics["stale_hits"] + self.metrics["coalesced"] + self.metrics["misses"]
+        served = self.metrics["hits"] + self.metrics["stale_hits"] + self.metrics["coalesced"]
+        return {
+            **self.metrics,
+            "entries": len(self.entries),
+            "hit_rate": served / lookups if lookups else 0.0
+        }
@@ -0,0 +1,480 @@
+"""
+API Tools Test Script - API工具行为测试
+验证连接池、熔断器、响应缓存、分页和流式JSON解码；可直接运行，也可由 pytest 收集
+"""
+
+import asyncio
+import json
+import random
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api.mock.load_test import LoadTest, PLATFORMS, create_adapter, format_report
+from api.mock.mock_server import MockPlatformServer
+from core.tools.connection_pool import ConnectionPool
+from core.tools.json_codec import JSONCodec
+from core.tools.pagination import paginate, next_token_params
+from core.tools.rate_limiter import AdapterRateLimiter
+from core.tools.request_window import RequestWindow
+from core.tools.resilience import APIError, CircuitBreaker, CircuitOpenError
+from core.tools.response_cache import ResponseCache
+
+
+def test_connection_pool_closes_session_from_previous_loop():
+    pool = ConnectionPool("test")
+
+    async def lease():
+        session = await pool.acquire()
+        statistics = pool.get_statistics()
+        assert statistics["leases"] == 1
+        assert statistics["active_connections"] == 0
+        return session
+
+    first = asyncio.run(lease())
+    second = asyncio.run(lease())
+    assert first is not second
+    assert first.closed
+    assert pool.leases == 1
+    asyncio.run(pool.close())
+
+
+def test_circuit_breaker_opens_and_recovers():
+    now = [0.0]
+    breaker = CircuitBreaker("GET /orders", failure_threshold=2, recovery_timeout=10.0, clock=lambda: now[0])
+    transient = APIError("unavailable", status=503, error_class="http_5xx", retryable=True)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure(transient)
+    assert breaker.state == "open"
+    try:
+        breaker.before_call()
+    except CircuitOpenError as e:
+        assert e.retry_in == 10.0
+    else:
+        raise AssertionError("open circuit should short-circuit calls")
+
+    now[0] = 10.0
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    try:
+        breaker.before_call()
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("only one half-open trial should be allowed")
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.get_statistics()["short_circuited"] == 2
+
+
+def test_cancelled_half_open_trial_releases_slot():
+    async def scenario():
+        async with MockPlatformServer() as server:
+            adapter = create_adapter("amazon", server.base_url, {
+                "http_retry_attempts": 0,
+                "circuit_failure_threshold": 2,
+                "circuit_recovery_timeout": 0.05
+            })
+            async with adapter:
+                server.down = True
+                for _ in range(2):
+                    try:
+                        await adapter.get_orders()
+                    except APIError as e:
+                        assert e.status == 503
+                    else:
+                        raise AssertionError("exhausted errors should propagate from get_orders")
+                try:
+                    await adapter.get_orders()
+                except CircuitOpenError:
+                    pass
+                else:
+                    raise AssertionError("open circuit should propagate from get_orders")
+
+                await asyncio.sleep(0.06)
+                server.down = False
+                server.latency = 0.5
+                trial = asyncio.create_task(adapter.get_orders())
+                await asyncio.sleep(0.1)
+                trial.cancel()
+                await asyncio.gather(trial, return_exceptions=True)
+
+                server.latency = 0.0
+                assert await adapter.get_orders() == []
+                breaker = adapter.resilience.breaker_for("GET", "/orders/v0/orders")
+                assert breaker.state == "closed"
+
+    asyncio.run(scenario())
+
+
+def make_pages(total, page_size, fetched, fail_at=None):
+    """按 next 游标分页的内存数据源，fetched 记录请求过的页面游标"""
+    async def fetch_page(params):
+        offset = int(params.get("next", 0))
+        fetched.append(offset)
+        await asyncio.sleep(0)
+        if fail_at is not None and offset >= fail_at:
+            raise APIError("page failed", status=500, retryable=False)
+        end = min(offset + page_size, total)
+        response = {"items": list(range(offset, end))}
+        if end < total:
+            response["next"] = str(end)
+        return response
+    return fetch_page
+
+
+def test_paginate_yields_every_item_in_order():
+    async def scenario():
+        for prefetch in (0, 1, 3):
+            fetched = []
+            items = [item async for item in paginate(
+                make_pages(25, 10, fetched), lambda response: response["items"],
+                next_token_params(["next"], "next"), prefetch=prefetch
+            )]
+            assert items == list(range(25))
+            assert fetched == [0, 10, 20]
+
+        fetched = []
+        items = [item async for item in paginate(
+            make_pages(25, 10, fetched), lambda response: response["items"],
+            next_token_params(["next"], "next"), max_pages=2
+        )]
+        assert items == list(range(20))
+
+    asyncio.run(scenario())
+
+
+def test_paginate_prefetch_is_bounded_and_stops_on_break():
+    async def scenario():
+        fetched = []
+        pages = paginate(make_pages(1000, 10, fetched), lambda response: response["items"],
+                         next_token_params(["next"], "next"), prefetch=2)
+        async for item in pages:
+            if item == 0:
+                for _ in range(20):
+                    await asyncio.sleep(0)
+                # 正在处理的页 + 队列中的 prefetch 页 + 等待入队的一页
+                assert len(fetched) <= 4
+            if item == 15:
+                break
+        await pages.aclose()
+        requested = len(fetched)
+        await asyncio.sleep(0.01)
+        assert len(fetched) == requested
+        assert requested < 100
+
+    asyncio.run(scenario())
+
+
+def test_paginate_raises_after_yielding_earlier_pages():
+    async def scenario():
+        for prefetch in (0, 1):
+            fetched = []
+            items = []
+            try:
+                async for item in paginate(make_pages(50, 10, fetched, fail_at=20), lambda response: response["items"],
+                                           next_token_params(["next"], "next"), prefetch=prefetch):
+                    items.append(item)
+            except APIError:
+                pass
+            else:
+                raise AssertionError("page failure should propagate")
+            assert items == list(range(20))
+
+    asyncio.run(scenario())
+
+
+def test_adapter_iter_orders_walks_all_pages():
+    async def scenario():
+        async with MockPlatformServer(item_count=250, page_size=100) as server:
+            async with create_adapter("amazon", server.base_url) as adapter:
+                orders = [order async for order in adapter.iter_orders(prefetch=1)]
+        assert len(orders) == 250
+        assert len({order["AmazonOrderId"] for order in orders}) == 250
+
+    asyncio.run(scenario())
+
+
+def test_response_cache_hits_and_coalesces():
+    async def scenario():
+        cache = ResponseCache({"/prices*": 60})
+        calls = []
+
+        async def send(headers):
+            calls.append(headers)
+            await asyncio.sleep(0.01)
+            return 200, {"price": 10}, '"v1"', None
+
+        results = await asyncio.gather(*[cache.fetch("/prices", {"sku": "A"}, send) for _ in range(5)])
+        assert results == [{"price": 10}] * 5
+        assert await cache.fetch("/prices", {"sku": "A"}, send) == {"price": 10}
+        assert len(calls) == 1
+        statistics = cache.get_statistics()
+        assert (statistics["misses"], statistics["coalesced"], statistics["hits"]) == (1, 4, 1)
+
+    asyncio.run(scenario())
+
+
+def test_response_cache_invalidate_detaches_in_flight_requests():
+    async def scenario():
+        cache = ResponseCache({"/prices*": 60})
+        version = [1]
+        old_sent = asyncio.Event()
+        release_old = asyncio.Event()
+
+        async def send(headers):
+            observed = version[0]
+            if observed == 1:
+                old_sent.set()
+                await release_old.wait()
+            return 200, {"version": observed}, None, None
+
+        before_write = asyncio.create_task(cache.fetch("/prices", None, send))
+        await old_sent.wait()
+        version[0] = 2
+        cache.invalidate("/prices")
+        # 合并到失效前的请求上会一直等待 release_old
+        after_write = await asyncio.wait_for(cache.fetch("/prices", None, send), 1.0)
+        assert after_write == {"version": 2}
+
+        release_old.set()
+        assert await before_write == {"version": 1}
+        assert await cache.fetch("/prices", None, send) == {"version": 2}
+
+    asyncio.run(scenario())
+
+
+def test_listings_feed_invalidates_pricing_and_inventory_cache():
+    async def scenario():
+        async with MockPlatformServer() as server:
+            adapter = create_adapter("amazon", server.base_url, {
+                "feed_poll_interval": 0.01,
+                "response_cache_ttls": {"/products/pricing/v0/price*": 60, "/inventory/v1/inventory*": 60}
+            })
+            async with adapter:
+                await adapter.get_pricing("SKU1")
+                await adapter.get_inventory()
+                assert len(adapter.response_cache.entries) == 2
+                requests = server.requests
+                await adapter.get_pricing("SKU1")
+                assert server.requests == requests
+
+                results = await adapter.bulk_update_pricing({"SKU1": 9.99})
+                assert results["SKU1"]["status"] == "accepted"
+                assert len(adapter.response_cache.entries) == 0
+                requests = server.requests
+                await adapter.get_pricing("SKU1")
+                assert server.requests == requests + 1
+
+    asyncio.run(scenario())
+
+
+def test_request_window_is_fifo_and_hands_over_cancelled_slots():
+    async def scenario():
+        window = RequestWindow(2)
+        order, active, peak = [], [0], [0]
+        gate = asyncio.Event()
+
+        async def call(i):
+            async with window:
+                order.append(i)
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                await gate.wait()
+                active[0] -= 1
+
+        calls = [asyncio.create_task(call(i)) for i in range(6)]
+        await asyncio.sleep(0.01)
+        assert order == [0, 1] and window.queued == 4
+        # 队首等待者被取消后，名额传给下一个等待者
+        calls[2].cancel()
+        await asyncio.sleep(0.01)
+        assert window.queued == 3
+        gate.set()
+        await asyncio.gather(*calls, return_exceptions=True)
+        assert order == [0, 1, 3, 4, 5]
+        assert peak[0] == 2
+        statistics = window.get_statistics()
+        assert statistics["in_flight"] == 0 and statistics["peak_in_flight"] == 2
+        assert statistics["completed"] == 5 and statistics["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_adapter_request_window_bounds_concurrent_requests():
+    async def scenario():
+        async with MockPlatformServer(latency=0.1) as server:
+            adapter = create_adapter("amazon", server.base_url, {"max_in_flight_requests": 3})
+            async with adapter:
+                results = await asyncio.gather(
+                    *(adapter._make_request("GET", "/fba/inventory/v1/summaries", params={"page": i}) for i in range(12))
+                )
+                statistics = adapter.request_window.get_statistics()
+            assert len(results) == 12 and server.requests == 12
+            assert statistics["peak_in_flight"] == 3
+            assert statistics["completed"] == 12 and statistics["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_load_test_drives_every_platform_against_mock_server():
+    async def scenario(platform):
+        async with MockPlatformServer(latency=0.005, seed=1) as server:
+            adapter = create_adapter(platform, server.base_url, {"rate_limit": 1000, "rate_limit_burst": 50})
+            async with adapter:
+                report = await LoadTest(adapter, PLATFORMS[platform][1](), concurrency=5, requests=40, seed=7).run()
+            assert server.requests > 0
+        return report
+
+    for platform in PLATFORMS:
+        report = asyncio.run(scenario(platform))
+        assert report["mode"] == "closed"
+        assert report["requests"] == 40 and report["errors"] == 0, (platform, report["errors_by_class"])
+        assert sum(op["requests"] for op in report["operations"].values()) == 40
+        assert report["latency"]["count"] == 40 and report["latency"]["p50"] >= 0.004
+        assert "TOTAL" in format_report(report)
+
+
+def test_load_test_open_loop_counts_injected_errors():
+    async def scenario():
+        async with MockPlatformServer(error_status=503) as server:
+            server.down = True
+            adapter = create_adapter("tiktok", server.base_url, {
+                "http_retry_attempts": 0, "circuit_failure_threshold": 1000
+            })
+            async with adapter:
+                return await LoadTest(adapter, PLATFORMS["tiktok"][1](), concurrency=4, requests=20,
+                                      rate=200, seed=3).run()
+
+    report = asyncio.run(scenario())
+    assert report["mode"] == "open" and report["target_rate"] == 200
+    assert report["requests"] == 20 and report["error_rate"] == 1.0
+    assert report["errors_by_class"] == {"http_5xx": 20}
+    # 开环按计划时刻发出：20 个请求至少跨越 19 个到达间隔
+    assert report["elapsed"] >= 19 / 200
+
+
+def test_request_metrics_per_endpoint_and_slow_log():
+    async def scenario():
+        async with MockPlatformServer() as server:
+            adapter = create_adapter("amazon", server.base_url, {"slow_request_threshold": 0.05})
+            async with adapter:
+                for i in range(3):
+                    await adapter._make_request("GET", f"/orders/v0/orders/111-{i}")
+                try:
+                    await adapter._make_request("GET", "/feeds/2021-06-30/feeds/missing")
+                    assert False, "missing feed should raise"
+                except APIError as e:
+                    assert e.status == 404
+                server.latency = 0.1
+                await adapter._make_request("GET", "/products/pricing/v0/price", params={"Skus": "SKU1"})
+                return adapter.request_metrics
+
+    metrics = asyncio.run(scenario())
+    statistics = metrics.get_statistics()
+    endpoints = statistics["endpoints"]
+    orders = endpoints["GET /orders/v0/orders/{id}"]
+    assert orders["requests"] == 3 and orders["status_codes"] == {"200": 3} and orders["errors"] == 0
+    assert orders["bytes_received"] > 0 and orders["new_connections"] >= 1
+    assert orders["latency"]["total"]["count"] == 3 and orders["latency"]["ttfb"]["count"] == 3
+    failed = [m for m in endpoints.values() if "404" in m["status_codes"]]
+    assert len(failed) == 1 and failed[0]["error_rate"] == 1.0
+
+    # 按累计耗时排序，只有超过阈值的请求进入慢请求日志
+    assert next(iter(endpoints)) == "GET /products/pricing/v0/price"
+    assert metrics.top_endpoints(1)[0]["endpoint"] == "GET /products/pricing/v0/price"
+    assert abs(sum(m["time_share"] for m in endpoints.values()) - 1.0) < 1e-9
+    slow = statistics["slow_requests"]
+    assert [entry["endpoint"] for entry in slow] == ["GET /products/pricing/v0/price"]
+    assert slow[0]["status"] == 200 and slow[0]["total"] >= 0.1 and slow[0]["ttfb"] is not None
+
+
+def test_endpoint_limited_requests_book_global_slot_at_fire_time():
+    # 全局 20 次/秒，端点 2 次/秒：排队等端点名额的请求不能提前占用全局名额
+    limiter = AdapterRateLimiter(20, endpoint_limits={"/orders": {"rate": 2}})
+
+    async def send(endpoint, fired):
+        await limiter.acquire(endpoint)
+        fired.append(time.monotonic())
+
+    async def scenario():
+        fired = []
+        await asyncio.gather(
+            *(send("/orders", fired) for _ in range(2)),
+            *(send("/inventory", fired) for _ in range(12))
+        )
+        fired.sort()
+        gaps = [later - earlier for earlier, later in zip(fired, fired[1:])]
+        assert min(gaps) > 0.03, gaps
+
+    asyncio.run(scenario())
+
+
+def test_rate_limit_header_updates_endpoint_limiter_only():
+    limiter = AdapterRateLimiter(100, endpoint_limits={"/orders": {"rate": 1}},
+                                 rate_limit_header="x-amzn-RateLimit-Limit")
+
+    limiter.on_response("/orders/v0/orders", 200, {"x-amzn-RateLimit-Limit": "0.5"})
+    assert limiter.endpoint_limiters["/orders"].target_rate == 0.5
+    assert limiter.global_limiter.target_rate == 100
+
+    limiter.on_response("/catalog/items?page=2", 200, {"x-amzn-RateLimit-Limit": "5"})
+    assert limiter.global_limiter.target_rate == 100
+    operation = limiter.operation_limiters["/catalog/items"]
+    assert operation.target_rate == 5
+    endpoint_limiter, limiters = limiter._limiters("/catalog/items?page=3")
+    assert endpoint_limiter is operation
+    assert limiters == [limiter.global_limiter, operation]
+    assert "/catalog/items" in limiter.get_statistics()["endpoints"]
+
+    # 该操作后续的 429 只降低该操作的速率
+    limiter.on_response("/catalog/items", 429, {"Retry-After": "0"})
+    assert operation.rate < 5
+    assert limiter.global_limiter.rate == 100
+
+
+def test_iter_items_with_random_chunk_splits():
+    items = [
+        {"id": i, "price": 10 + i / 8, "ratio": -2.5e-3 * i, "big": 12345678901234567890 + i, "exp": 1e22,
+         "name": f"商品-{i} \\\"quoted\\\"", "tags": ["a", "b"] if i % 2 else [], "active": i % 3 == 0, "note": None}
+        for i in range(12)
+    ] + [0, -7, 3.75, 6.02e23, "end"]
+    document = {"meta": {"count": len(items), "scale": 1.5e2}, "payload": {"skipped": [1.25, -3e-7], "Orders": items}}
+    text = json.dumps(document, ensure_ascii=False, indent=1).replace("e+23", "E+23").encode()
+    expected = json.loads(text)["payload"]["Orders"]
+    rng = random.Random(7)
+
+    async def chunked(cuts):
+        start = 0
+        for cut in cuts + [len(text)]:
+            yield text[start:cut]
+            start = cut
+
+    async def scenario():
+        codec = JSONCodec()
+        for _ in range(200):
+            cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, 60)))
+            decoded = [item async for item in codec.iter_items(chunked(cuts), ["payload", "Orders"])]
+            assert decoded == expected, cuts
+        # 每个位置单独切一刀，覆盖所有数字内部的边界
+        for cut in range(1, len(text)):
+            decoded = [item async for item in codec.iter_items(chunked([cut]), ["payload", "Orders"])]
+            assert decoded == expected, cut
+
+    asyncio.run(scenario())
+
+
+def main():
+    """主函数"""
+    tests = [(name, func) for name, func in globals().items() if name.startswith("test_") and callable(func)]
+    for name, func in tests:
+        func()
+        print(f"✓ {name}")
+    print(f"\n✅ {len(tests)} API tools tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,791 @@
+"""
+Orchestrator Test Script - 编排器行为测试
+验证DAG调度、路由、重试/取消等编排器行为；可直接运行，也可由 pytest 收集
+"""
+
+import asyncio
+import json
+import multiprocessing
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.config import config
+from core.agents.base_agent import BaseAgent, AgentCapability, TASK_RESULT_SCHEMA
+from core.orchestrator.message_bus import MessageBus, MessageBusStoppedError
+from core.orchestrator.orchestrator import Orchestrator
+from core.orchestrator.priority import FairReadyQueue
+from core.orchestrator.sharding import ShardCoordinator, ShardWorker
+from core.orchestrator.task import Task, TaskStatus
+from core.orchestrator.task_journal import TaskJournal
+from core.monitoring.agent_metrics import AgentPerformanceWindow
+from core.monitoring.histogram import LatencyHistogram, WindowedHistogram
+from core.monitoring.tracing import Tracer, get_tracer, set_tracer
+
+
+class RecordingAgent(BaseAgent):
+    """按声明的任务类型执行任务并记录执行顺序的测试Agent"""
+
+    def __init__(self, agent_id, task_types, delay=0.01, log=None):
+        super().__init__(agent_id, agent_id, "test")
+        self.delay = delay
+        self.log = log if log is not None else []
+        self.failures = {}
+        for task_type in task_types:
+            self.add_capability(AgentCapability(task_type, task_type, {}, TASK_RESULT_SCHEMA))
+
+    async def process(self, task):
+        self.log.append(("start", task["task_id"]))
+        await asyncio.sleep(self.delay)
+        if self.failures.get(task["task_id"], 0) > 0:
+            self.failures[task["task_id"]] -= 1
+            raise RuntimeError(f"injected failure for {task['task_id']}")
+        self.log.append(("end", task["task_id"]))
+        return {"status": "success", "data": {"task_id": task["task_id"]}}
+
+    async def think(self, context):
+        return {}
+
+
+class SlowShardAgent(BaseAgent):
+    """分片工作进程中按参数延迟执行的测试Agent，以 test_orchestrator:SlowShardAgent 加载"""
+
+    def __init__(self):
+        super().__init__("slow", "slow", "test")
+        self.add_capability(AgentCapability("work", "work", {}, TASK_RESULT_SCHEMA))
+
+    async def process(self, task):
+        await asyncio.sleep(task["parameters"].get("delay", 0))
+        return {"status": "success", "data": {"task_id": task["task_id"]}}
+
+    async def think(self, context):
+        return {}
+
+
+def make_task(task_id, dependencies=None, task_type="work"):
+    return Task(task_id, task_id, task_type, {}, dependencies=dependencies)
+
+
+def submit(orchestrator, *tasks):
+    for task in tasks:
+        orchestrator.tasks[task.task_id] = task
+        orchestrator.task_queue.append(task)
+
+
+def test_dag_runs_dependencies_in_order():
+    """下游任务在依赖完成后才开始，独立分支并行执行"""
+    async def scenario():
+        log = []
+        orchestrator = Orchestrator({"max_concurrent_tasks": 4})
+        orchestrator.register_agent(RecordingAgent("worker", ["work"], log=log))
+        a, b, c = make_task("a"), make_task("b"), make_task("c", ["a", "b"])
+        submit(orchestrator, c, a, b)
+        await orchestrator.run_until_complete()
+
+        assert all(t.status == TaskStatus.COMPLETED for t in (a, b, c))
+        assert log.index(("start", "c")) > log.index(("end", "a"))
+        assert log.index(("start", "c")) > log.index(("end", "b"))
+        # a 和 b 没有依赖关系，应同时在途
+        assert log.index(("start", "b")) < log.index(("end", "a"))
+        history = {entry["task_id"]: entry for entry in orchestrator.execution_history}
+        assert history["c"]["critical_path"][-1] == "c" and len(history["c"]["critical_path"]) == 2
+
+    asyncio.run(scenario())
+
+
+def test_dag_failure_cancels_dependents():
+    """依赖失败时级联取消下游任务，无关任务不受影响"""
+    async def scenario():
+        orchestrator = Orchestrator()
+        agent = RecordingAgent("worker", ["work"])
+        agent.failures["a"] = 1
+        orchestrator.register_agent(agent)
+        a, b, c, d = make_task("a"), make_task("b", ["a"]), make_task("c", ["b"]), make_task("d")
+        submit(orchestrator, a, b, c, d)
+        await orchestrator.run_until_complete()
+
+        assert a.status == TaskStatus.FAILED
+        assert b.status == TaskStatus.CANCELLED and c.status == TaskStatus.CANCELLED
+        assert d.status == TaskStatus.COMPLETED
+        assert orchestrator.get_system_status()["tasks_in_progress"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_dag_rejects_cycles_and_unknown_dependencies():
+    """依赖环和未知依赖的任务不会执行"""
+    async def scenario():
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(RecordingAgent("worker", ["work"]))
+        a, b = make_task("a", ["b"]), make_task("b", ["a"])
+        orphan = make_task("orphan", ["missing"])
+        submit(orchestrator, a, b, orphan)
+        await orchestrator.run_until_complete()
+
+        assert TaskStatus.FAILED in (a.status, b.status)
+        assert TaskStatus.COMPLETED not in (a.status, b.status)
+        assert orphan.status == TaskStatus.CANCELLED
+
+    asyncio.run(scenario())
+
+
+def test_routing_requires_declared_capability():
+    """没有Agent声明的任务类型直接失败，不会派发给无法处理它的Agent"""
+    async def scenario():
+        from agents.product.product_selection_agent import ProductSelectionAgent
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(ProductSelectionAgent())
+        worker = RecordingAgent("worker", ["work"])
+        orchestrator.register_agent(worker)
+        task = make_task("t", task_type="no_such_type")
+        submit(orchestrator, task)
+        await orchestrator.run_until_complete()
+
+        assert task.status == TaskStatus.FAILED
+        assert task.error == "No suitable agent found"
+        assert worker.log == []
+        assert orchestrator.find_best_agent(make_task("t", task_type="trend_analysis")).agent_id == "product_selection"
+
+    asyncio.run(scenario())
+
+
+def test_high_level_instruction_runs_end_to_end():
+    """高级指令和拆解产生的子任务都路由到声明了该能力的Agent并执行完成"""
+    async def scenario():
+        from agents.marketing.marketing_agent import MarketingAgent
+        from agents.product.product_selection_agent import ProductSelectionAgent
+        orchestrator = Orchestrator()
+        for agent in (ProductSelectionAgent(), MarketingAgent()):
+            await agent.initialize()
+            orchestrator.register_agent(agent)
+        tasks = await orchestrator.parse_high_level_instruction("这个月我要把这款鞋在北美市场的销量提升20%")
+        planning = next(t for t in tasks if t.task_type == "content_generation")
+        subtasks = await orchestrator.decompose_task(planning)
+        await orchestrator.run_until_complete()
+
+        assert len(tasks) == 4 and len(subtasks) == 3
+        for task in tasks + subtasks:
+            assert task.status == TaskStatus.COMPLETED, (task.task_type, task.error)
+            assert "error" not in task.result
+        assert [t.task_type for t in subtasks] == ["trend_analysis", "competitor_analysis", "content_generation"]
+
+    asyncio.run(scenario())
+
+
+def test_system_status_counters_track_task_lifecycle():
+    """状态计数和在途数由状态变更钩子增量维护，与逐个统计的结果一致"""
+    async def scenario():
+        orchestrator = Orchestrator()
+        worker = RecordingAgent("worker", ["work"], delay=0.1)
+        worker.failures["t3"] = 1
+        orchestrator.register_agent(worker)
+        tasks = [make_task(f"t{i}") for i in range(4)] + [make_task("blocked", ["t3"])]
+        submit(orchestrator, *tasks)
+
+        def recount(status):
+            return sum(task.status == status for task in orchestrator.tasks.values())
+
+        runner = asyncio.create_task(orchestrator.run_until_complete())
+        await asyncio.sleep(0.05)
+        status = orchestrator.get_system_status()
+        assert status["tasks_in_progress"] == recount(TaskStatus.IN_PROGRESS) == 4
+        assert status["tasks_in_flight"] == 4 and status["agents_busy"] == 1
+        assert status["tasks_pending"] == 1
+        assert "agents" not in status
+        await runner
+
+        status = orchestrator.get_system_status(include_agents=True)
+        for key, task_status in (("tasks_completed", TaskStatus.COMPLETED), ("tasks_failed", TaskStatus.FAILED),
+                                 ("tasks_cancelled", TaskStatus.CANCELLED), ("tasks_pending", TaskStatus.PENDING)):
+            assert status[key] == recount(task_status), key
+        assert (status["tasks_completed"], status["tasks_failed"], status["tasks_cancelled"]) == (3, 1, 1)
+        assert status["completed_total"] == 3 and status["failed_total"] == 1
+        assert status["tasks_in_flight"] == 0 and status["agents_busy"] == 0
+        assert status["agents_in_flight"] == {"worker": 0}
+        assert status["agents"]["worker"]["agent_id"] == "worker"
+
+        # 从任务表移除时同步扣减计数
+        orchestrator.tasks.pop("t0")
+        assert orchestrator.get_system_status()["tasks_completed"] == recount(TaskStatus.COMPLETED) == 2
+
+    asyncio.run(scenario())
+
+
+def test_agent_capabilities_match_handlers():
+    """各Agent声明的能力与 process 实际分发的任务类型一致"""
+    from agents.compliance.compliance_agent import ComplianceAgent
+    from agents.customer.customer_service_agent import CustomerServiceAgent
+    from agents.logistics.logistics_agent import LogisticsAgent
+    from agents.marketing.marketing_agent import MarketingAgent
+    from agents.product.product_selection_agent import ProductSelectionAgent
+
+    for agent_class in (ComplianceAgent, CustomerServiceAgent, LogisticsAgent, MarketingAgent, ProductSelectionAgent):
+        agent = agent_class()
+        assert agent.get_capabilities() == list(agent_class.TASK_HANDLERS)
+        for task_type, (method, _, _) in agent_class.TASK_HANDLERS.items():
+            assert callable(getattr(agent, method, None)), f"{agent_class.__name__}.{method} for {task_type}"
+        result = asyncio.run(agent.process({"task_type": "no_such_type", "parameters": {}}))
+        assert result == {"error": "Unknown task type: no_such_type"}
+
+
+def test_agent_pool_initializes_instances():
+    """实例池创建时的最小实例与扩容的实例一样经过初始化"""
+    async def scenario():
+        from agents.logistics.logistics_agent import LogisticsAgent
+        orchestrator = Orchestrator()
+        pool = await orchestrator.create_agent_pool(LogisticsAgent, min_size=2, max_size=3)
+        assert [agent.status for agent in pool.instances.values()] == ["ready", "ready"]
+        assert await orchestrator.scale_pool(pool.pool_id, 1) == 1
+        assert all(agent.status == "ready" for agent in pool.instances.values())
+
+    asyncio.run(scenario())
+
+
+def test_retention_keeps_pinned_tasks_until_released():
+    """超出保留上限时仍被依赖的任务暂留，下游结束后移除；停止时关闭归档"""
+    async def scenario(archive_path):
+        orchestrator = Orchestrator({"max_retained_tasks": 1, "task_archive_path": archive_path})
+        orchestrator.register_agent(RecordingAgent("worker", ["work"]))
+        chain = [make_task("t0")] + [make_task(f"t{i}", [f"t{i - 1}"]) for i in range(1, 6)]
+        submit(orchestrator, *chain)
+        await orchestrator.run_until_complete()
+
+        assert all(t.status == TaskStatus.COMPLETED for t in chain)
+        assert list(orchestrator.tasks) == ["t5"]
+        assert not orchestrator._pinned_tasks
+        assert orchestrator.evicted_tasks_count == 5
+        assert len(orchestrator.execution_history) == 6
+
+        await orchestrator.stop()
+        assert orchestrator.archive._file.closed
+        assert [t["task_id"] for t in orchestrator.archive.iter_tasks()] == [f"t{i}" for i in range(6)]
+
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(scenario(os.path.join(directory, "archive.jsonl")))
+
+
+def test_dependencies_on_retired_tasks():
+    """依赖已被保留策略移出内存的任务时，按归档中的最终状态判断；没有归档时明确报告"""
+    async def scenario(archive_path):
+        orchestrator = Orchestrator({"max_retained_tasks": 1, "task_archive_path": archive_path})
+        worker = RecordingAgent("worker", ["work"])
+        worker.failures["broken"] = 1
+        orchestrator.register_agent(worker)
+        submit(orchestrator, make_task("done"), make_task("broken"), make_task("filler"))
+        await orchestrator.run_until_complete()
+        assert "done" not in orchestrator.tasks and "broken" not in orchestrator.tasks
+
+        after_done, after_broken = make_task("after_done", ["done"]), make_task("after_broken", ["broken"])
+        submit(orchestrator, after_done, after_broken)
+        await orchestrator.run_until_complete()
+        await orchestrator.stop()
+        return after_done, after_broken
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("archive.jsonl", "archive.db"):
+            after_done, after_broken = asyncio.run(scenario(os.path.join(directory, name)))
+            assert after_done.status == TaskStatus.COMPLETED, after_done.error
+            assert after_broken.status == TaskStatus.CANCELLED
+            assert "dependency broken is failed (retired)" in after_broken.error
+
+    after_done, _ = asyncio.run(scenario(None))
+    assert after_done.status == TaskStatus.CANCELLED
+    assert "dependency done is unknown or retired" in after_done.error
+
+
+def test_fair_queue_weights_aging_and_concurrency_limits():
+    """类之间按权重出队，等待超过 max_wait 的队首提前出队，max_concurrent 限制同类并发"""
+    def ready(task_id, priority, waited=0.0):
+        task = Task(task_id, task_id, "work", {}, priority=priority)
+        task.ready_at = time.monotonic() - waited
+        return task
+
+    queue = FairReadyQueue({
+        "high": {"weight": 3, "min_priority": 5},
+        "low": {"weight": 1, "min_priority": 0, "max_wait": 0.5, "max_concurrent": 2}
+    })
+    for i in range(8):
+        queue.push(ready(f"h{i}", 9))
+        queue.push(ready(f"l{i}", 1))
+    first = [queue.pop() for _ in range(8)]
+    assert sum(t.task_id.startswith("h") for t in first) == 6
+    # low 类已有 2 个在执行，达到并发上限后只出队 high 类
+    assert [t.task_id for t in first if t.task_id.startswith("l")] == ["l0", "l1"]
+    assert all(queue.pop().task_id.startswith("h") for _ in range(2))
+    assert queue.pop() is None
+    for task in first:
+        queue.release(task)
+
+    # 老化：low 类队首等待已超过 max_wait，即使 high 类的 pass 值更小也先出队
+    aging = FairReadyQueue({
+        "high": {"weight": 100, "min_priority": 5},
+        "low": {"weight": 1, "min_priority": 0, "max_wait": 0.5}
+    })
+    aging.push(ready("h", 9))
+    aging.push(ready("l_old", 1, waited=1.0))
+    assert aging.pop().task_id == "l_old"
+    assert aging.get_statistics()["low"]["aged"] == 1
+    assert aging.pop().task_id == "h"
+
+
+def test_latency_histogram_percentiles_within_error_bound():
+    """分位数相对误差不超过 1/2^(significant_bits-1)，合并后与整体记录一致"""
+    histogram, first, second = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    samples = [i / 1000 for i in range(1, 2001)]
+    for i, seconds in enumerate(samples):
+        histogram.record(seconds)
+        (first if i % 2 else second).record(seconds)
+    first.merge(second)
+    for quantile in (0.5, 0.9, 0.99):
+        exact = samples[int(round(quantile * len(samples))) - 1]
+        assert abs(histogram.percentile(quantile) - exact) / exact <= 1 / 64, quantile
+        assert first.percentile(quantile) == histogram.percentile(quantile)
+    assert histogram.summary()["count"] == 2000
+    assert histogram.min == 0.001 and histogram.max == 2.0
+
+
+def test_tracing_records_lifecycle_spans_and_histograms():
+    """开启追踪后每个任务记录排队、选择和执行 span，并按任务类型和Agent聚合；关闭时不记录"""
+    async def scenario():
+        orchestrator = Orchestrator({"tracing_enabled": True})
+        orchestrator.register_agent(RecordingAgent("worker", ["work"], delay=0.02))
+        submit(orchestrator, *[make_task(f"t{i}") for i in range(5)])
+        await orchestrator.run_until_complete()
+        return orchestrator.tracer
+
+    previous = get_tracer()
+    try:
+        tracer = asyncio.run(scenario())
+        assert get_tracer() is tracer
+    finally:
+        set_tracer(previous)
+
+    names = [span["name"] for span in tracer.get_trace("t0")]
+    assert {"queue_wait", "agent_selection", "agent.process"} <= set(names)
+    histograms = tracer.get_histograms()
+    process = histograms["by_task_type"]["agent.process"]["work"]
+    assert process["count"] == 5
+    assert 0.015 <= process["p50"] <= process["p99"] <= process["max"]
+    assert histograms["by_agent"]["agent.process"]["worker"]["count"] == 5
+    assert 'buysing_span_seconds_count{span="agent.process",task_type="work"} 5' in tracer.render_prometheus()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.json")
+        tracer.export(path)
+        with open(path, encoding="utf-8") as f:
+            exported = json.load(f)
+        assert exported["histograms"]["by_task_type"]["agent.process"]["work"]["count"] == 5
+
+    disabled = Tracer()
+    with disabled.span("agent.process", task_id="t"):
+        pass
+    disabled.record("queue_wait", 0.1)
+    assert disabled.spans_recorded == 0 and not disabled.get_histograms()["by_task_type"]
+
+
+def test_windowed_agent_metrics_drive_routing():
+    """成功率和EWMA延迟只反映最近的调用，负载路由随之切换到当前更快、更可靠的Agent"""
+    window = AgentPerformanceWindow(ewma_alpha=0.5, outcome_window=4)
+    for _ in range(4):
+        window.record(False, 1.0)
+    for _ in range(4):
+        window.record(True, 0.2)
+    assert window.success_rate == 1.0
+    assert abs(window.ewma_latency - 0.25) < 1e-9
+
+    now = [0.0]
+    histogram = WindowedHistogram(window=10, clock=lambda: now[0])
+    histogram.record(5.0)
+    now[0] = 15
+    histogram.record(0.1)
+    assert histogram.snapshot().count == 2
+    now[0] = 25
+    histogram.record(0.1)
+    assert histogram.snapshot().count == 2 and histogram.percentile(1.0) < 1.0
+
+    async def scenario():
+        orchestrator = Orchestrator()
+        fast = RecordingAgent("fast", ["work"], delay=0.01)
+        slow = RecordingAgent("slow", ["work"], delay=0.025)
+        for agent in (fast, slow):
+            orchestrator.register_agent(agent)
+            agent.update_performance(True, agent.delay)
+        assert orchestrator.find_best_agent(make_task("probe")) is fast
+
+        # fast 连续失败后路由切换到 slow；失败的调用按实际耗时计入，不会把平均响应时间拉低
+        fast.failures.update({f"f{i}": 1 for i in range(3)})
+        tasks = [make_task(f"f{i}") for i in range(3)]
+        for task in tasks:
+            submit(orchestrator, task)
+            await orchestrator.run_until_complete()
+        assert fast.performance_metrics["tasks_failed"] == 2
+        assert fast.performance_metrics["avg_response_time"] >= 0.01
+        assert abs(fast.performance_metrics["success_rate"] - 1 / 3) < 1e-9
+        assert tasks[2].status == TaskStatus.COMPLETED and tasks[2].assigned_agent == "slow"
+        assert orchestrator.find_best_agent(make_task("probe")) is slow
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_retryable_failure():
+    """可重试的失败按退避重试，最终成功"""
+    async def scenario():
+        from core.orchestrator.execution_policy import RetryableTaskError
+
+        class FlakyAgent(RecordingAgent):
+            async def process(self, task):
+                if self.failures.get(task["task_id"], 0) > 0:
+                    self.failures[task["task_id"]] -= 1
+                    raise RetryableTaskError("platform unavailable")
+                return await super().process(task)
+
+        orchestrator = Orchestrator({"retry_attempts": 3, "retry_delay": 0.01})
+        agent = FlakyAgent("worker", ["work"])
+        agent.failures["a"] = 2
+        orchestrator.register_agent(agent)
+        a = make_task("a")
+        submit(orchestrator, a)
+        await orchestrator.run_until_complete()
+
+        assert a.status == TaskStatus.COMPLETED
+        assert orchestrator.execution_history[-1]["attempts"] == 3
+        assert orchestrator.execution_policy.get_statistics()["retries"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancel_during_retry_backoff():
+    """重试退避期间取消任务：任务置为已取消，不再计入执行中，下游被级联取消"""
+    async def scenario():
+        from core.orchestrator.execution_policy import RetryableTaskError
+
+        class FailingAgent(RecordingAgent):
+            async def process(self, task):
+                raise RetryableTaskError("platform unavailable")
+
+        orchestrator = Orchestrator({"retry_attempts": 3, "retry_delay": 30, "retry_max_delay": 30})
+        orchestrator.execution_policy.backoff = lambda attempt: 30
+        orchestrator.register_agent(FailingAgent("worker", ["work"]))
+        a, b = make_task("a"), make_task("b", ["a"])
+        submit(orchestrator, a, b)
+        orchestrator._schedule_pending()
+        await asyncio.sleep(0.1)
+        assert a.status == TaskStatus.IN_PROGRESS and orchestrator.execution_policy.metrics["retries"] == 1
+
+        assert orchestrator.cancel_task("a")
+        await asyncio.wait_for(orchestrator.run_until_complete(), 5)
+
+        assert a.status == TaskStatus.CANCELLED and a.error == "Task cancelled"
+        assert b.status == TaskStatus.CANCELLED
+        status = orchestrator.get_system_status()
+        assert status["tasks_in_progress"] == 0 and status["tasks_in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_hedge_ignores_error_results():
+    """对冲请求返回 {"error": ...} 时不算胜出，继续等待主请求的成功结果"""
+    async def scenario():
+        class ErrorAgent(RecordingAgent):
+            async def process(self, task):
+                return {"error": "upstream unavailable"}
+
+        orchestrator = Orchestrator({"hedge_task_types": ["read"], "hedge_min_samples": 5})
+        orchestrator.register_agent(RecordingAgent("primary", ["read"], delay=0.1))
+        orchestrator.register_agent(ErrorAgent("backup", ["read"]))
+        for _ in range(5):
+            orchestrator.hedging.record_latency("read", 0.01)
+        task = make_task("r", task_type="read")
+        submit(orchestrator, task)
+        await orchestrator.run_until_complete()
+
+        assert task.status == TaskStatus.COMPLETED
+        assert task.result == {"status": "success", "data": {"task_id": "r"}}
+        assert task.assigned_agent == "primary"
+        statistics = orchestrator.hedging.get_statistics()
+        assert statistics["hedged"] == 1 and statistics["primary_wins"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_hedge_delay_recomputed_every_interval():
+    """对冲延迟按样本间隔重新计算，而不是每次派发都排序"""
+    from core.orchestrator.hedging import HedgingPolicy
+    policy = HedgingPolicy(task_types=["read"], quantile=0.5, min_samples=4, recompute_interval=4)
+    for duration in (0.1, 0.2, 0.3, 0.4):
+        policy.record_latency("read", duration)
+    assert policy.delay_for("read") == 0.3
+    for _ in range(3):
+        policy.record_latency("read", 5.0)
+    assert policy.delay_for("read") == 0.3
+    policy.record_latency("read", 5.0)
+    assert policy.delay_for("read") == 5.0
+
+
+def test_result_cache_returns_independent_copies():
+    """缓存命中和合并的请求得到各自的结果副本，修改一个不影响缓存和其他任务"""
+    async def scenario():
+        orchestrator = Orchestrator({"cacheable_task_types": {"work": 60}})
+        agent = RecordingAgent("worker", ["work"], delay=0.05)
+        orchestrator.register_agent(agent)
+        first, coalesced = make_task("first"), make_task("coalesced")
+        submit(orchestrator, first, coalesced)
+        await orchestrator.run_until_complete()
+        assert orchestrator.result_cache.get_statistics()["coalesced"] == 1
+
+        first.result["data"]["task_id"] = "mutated"
+        assert coalesced.result["data"]["task_id"] == "first"
+        coalesced.result["data"]["extra"] = True
+
+        hit = make_task("hit")
+        submit(orchestrator, hit)
+        await orchestrator.run_until_complete()
+        assert hit.result == {"status": "success", "data": {"task_id": "first"}}
+        assert orchestrator.result_cache.get_statistics()["hits"] == 1
+        assert agent.log.count(("end", "first")) == 1
+
+    asyncio.run(scenario())
+
+
+class BlockingCpuAgent(RecordingAgent):
+    """在工作进程中长时间占用CPU的测试Agent（time.sleep 模拟阻塞计算）"""
+
+    def __init__(self, agent_id="blocking_cpu", config=None):
+        super().__init__(agent_id, ["crunch"])
+
+    async def process(self, task):
+        time.sleep(task["parameters"].get("seconds", 0))
+        return {"status": "success", "data": {"pid": os.getpid()}}
+
+
+def test_process_pool_terminates_timed_out_workers():
+    """进程池中超时的任务会终止工作进程，进程池之后自动重建"""
+    async def scenario():
+        orchestrator = Orchestrator({
+            "enable_process_pool": True,
+            "process_pool_workers": 1,
+            "cpu_bound_task_types": ["crunch"],
+            "task_timeouts": {"crunch": 0.5},
+            "retry_attempts": 0
+        })
+        orchestrator.register_agent(BlockingCpuAgent())
+        slow = make_task("slow", task_type="crunch")
+        slow.parameters = {"seconds": 30}
+        submit(orchestrator, slow)
+        await orchestrator.run_until_complete()
+        assert slow.status == TaskStatus.FAILED and "timed out" in slow.error
+
+        await asyncio.sleep(0.2)
+        assert not multiprocessing.active_children()
+        fast = make_task("fast", task_type="crunch")
+        submit(orchestrator, fast)
+        await orchestrator.run_until_complete()
+        assert fast.status == TaskStatus.COMPLETED
+        statistics = orchestrator.process_backend.get_statistics()
+        assert statistics["tasks_terminated"] == 1 and statistics["pool_restarts"] == 1
+
+        started = time.monotonic()
+        await orchestrator.stop()
+        assert time.monotonic() - started < 5
+
+    asyncio.run(scenario())
+
+
+def test_message_bus_rejects_sends_after_stop():
+    async def scenario():
+        bus = MessageBus()
+        agent = RecordingAgent("receiver", ["work"])
+        bus.register(agent)
+        await bus.start()
+        await bus.notify("sender", "receiver", {"n": 1})
+        await bus.stop()
+        undeliverable = bus.metrics["undeliverable"]
+        try:
+            await bus.notify("sender", "receiver", {"n": 2})
+        except MessageBusStoppedError:
+            pass
+        else:
+            raise AssertionError("send after stop() should be rejected")
+        assert bus._workers == {}
+        assert bus.metrics["undeliverable"] == undeliverable + 1
+
+        await bus.start()
+        await bus.notify("sender", "receiver", {"n": 3})
+        await bus.stop()
+
+    asyncio.run(scenario())
+
+
+def test_journal_restart_does_not_duplicate_tasks():
+    """日志在构造时恢复：运行中入队并完成的任务重启后不会被重放"""
+    async def first_run(config):
+        orchestrator = Orchestrator(config)
+        orchestrator.register_agent(RecordingAgent("worker", ["work"]))
+        a, b = make_task("a"), make_task("b", ["a"])
+        submit(orchestrator, a, b)
+        runner = asyncio.create_task(orchestrator.run())
+        while b.status != TaskStatus.COMPLETED:
+            await asyncio.sleep(0.01)
+        assert orchestrator.tasks["a"] is a
+        await orchestrator.stop()
+        await runner
+        assert orchestrator.journal._file.closed
+
+    async def interrupted_run(config):
+        orchestrator = Orchestrator(config)
+        submit(orchestrator, make_task("c"))
+        orchestrator._flush_journal()
+
+    async def restart(config):
+        orchestrator = Orchestrator(config)
+        stats = orchestrator.recovery_stats
+        assert stats["requeued"] == 1 and stats["duplicates_skipped"] == 0
+        assert list(orchestrator.tasks) == ["c"]
+        orchestrator.register_agent(RecordingAgent("worker", ["work"]))
+        await orchestrator.run_until_complete()
+        assert orchestrator.tasks["c"].status == TaskStatus.COMPLETED
+        await orchestrator.stop()
+
+    with tempfile.TemporaryDirectory() as directory:
+        config = {"task_journal_path": os.path.join(directory, "tasks.journal"), "execution_interval": 0.01}
+        asyncio.run(first_run(config))
+        asyncio.run(interrupted_run(config))
+        asyncio.run(restart(config))
+        orchestrator = Orchestrator(config)
+        assert orchestrator.recovery_stats["requeued"] == 0
+        assert len(orchestrator.tasks) == 0
+        orchestrator.journal.close()
+
+
+def test_journal_recovery_cancels_dependents_of_failed_tasks():
+    """依赖在崩溃前失败（包括压缩之后）时，恢复后的下游任务被取消而不是执行"""
+    def recover(path):
+        orchestrator = Orchestrator({"task_journal_path": path})
+        orchestrator.journal.close()
+        assert orchestrator.recovery_stats["cancelled"] == 1
+        assert orchestrator.task_queue == []
+        return orchestrator.tasks
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "failed.journal")
+        journal = TaskJournal(path)
+        a, b = make_task("a"), make_task("b", ["a"])
+        journal.enqueue(a)
+        journal.enqueue(b)
+        journal.record_status(a, TaskStatus.FAILED)
+        journal.close()
+        tasks = recover(path)
+        assert tasks["b"].status == TaskStatus.CANCELLED
+        assert tasks["b"].error == "Dependency a failed"
+
+        path = os.path.join(directory, "compacted.journal")
+        journal = TaskJournal(path)
+        c, d = make_task("c"), make_task("d", ["c"])
+        journal.enqueue(c)
+        journal.enqueue(d)
+        c.status = TaskStatus.CANCELLED
+        journal.record_status(c, TaskStatus.CANCELLED)
+        journal.compact([d], {"c": c})
+        journal.close()
+        tasks = recover(path)
+        assert tasks["d"].status == TaskStatus.CANCELLED
+        assert tasks["d"].error == "Dependency c cancelled"
+
+
+def test_shard_coordinator_routes_redispatches_and_stops():
+    """同一分片键路由到同一工作进程；工作进程断开时在途任务改派，协调器停止时在途任务失败"""
+    async def scenario():
+        with tempfile.TemporaryDirectory() as directory:
+            address = f"unix:{os.path.join(directory, 'shard.sock')}"
+            coordinator = ShardCoordinator(address, heartbeat_interval=0.05)
+            await coordinator.start()
+            workers = {
+                worker_id: asyncio.create_task(
+                    ShardWorker(address, worker_id, ["test_orchestrator:SlowShardAgent"], 0.05).serve()
+                )
+                for worker_id in ("w1", "w2")
+            }
+            await coordinator.wait_for_workers(2, timeout=5)
+
+            def shard_task(task_id, sku, delay=0.0):
+                return {"task_id": task_id, "task_type": "work", "parameters": {"sku": sku, "delay": delay}}
+
+            # 路由：同一 SKU 的任务都由哈希环上的同一个工作进程完成
+            skus = [f"sku-{i}" for i in range(8)]
+            owners = {sku: coordinator.owner_of(shard_task("probe", sku)) for sku in skus}
+            assert set(owners.values()) == {"w1", "w2"}
+            results = await asyncio.gather(*(coordinator.submit(shard_task(f"t{i}", sku)) for i, sku in enumerate(skus * 2)))
+            assert [r["data"]["task_id"] for r in results] == [f"t{i}" for i in range(16)]
+            completed = {wid: worker.tasks_completed for wid, worker in coordinator.workers.items()}
+            assert completed == {wid: 2 * list(owners.values()).count(wid) for wid in ("w1", "w2")}
+
+            # 工作进程断开：其在途任务改派到另一个工作进程
+            lost_sku = next(sku for sku in skus if owners[sku] == "w1")
+            pending = asyncio.create_task(coordinator.submit(shard_task("lost", lost_sku, delay=0.3)))
+            await asyncio.sleep(0.1)
+            assert "lost" in coordinator.workers["w1"].in_flight
+            workers.pop("w1").cancel()
+            result = await asyncio.wait_for(pending, 5)
+            assert result["data"]["task_id"] == "lost"
+            assert coordinator.metrics["redispatched"] == 1
+            assert coordinator.metrics["workers_lost"] == 1
+            assert list(coordinator.workers) == ["w2"]
+
+            # 协调器停止：仍在执行的任务以 ConnectionError 失败而不是一直等待
+            pending = asyncio.create_task(coordinator.submit(shard_task("stopped", lost_sku, delay=5)))
+            await asyncio.sleep(0.1)
+            await coordinator.stop()
+            try:
+                await asyncio.wait_for(pending, 1)
+                assert False, "in-flight task should fail when the coordinator stops"
+            except ConnectionError:
+                pass
+            try:
+                await coordinator.submit(shard_task("after", lost_sku))
+                assert False, "submit after stop should fail"
+            except ConnectionError:
+                pass
+            await asyncio.wait_for(workers.pop("w2"), 5)
+
+    asyncio.run(scenario())
+
+
+def test_shipped_config_timeouts_reach_execution_policy():
+    """config.py 中按任务类型的超时和退避上限作用于编排器的执行策略"""
+    async def scenario():
+        orchestrator = Orchestrator(config.orchestrator_config)
+        policy = orchestrator.execution_policy
+        assert policy.timeout_for("inventory_check") == config.orchestrator_config["task_timeouts"]["inventory_check"]
+        assert policy.timeout_for("trend_analysis") == config.orchestrator_config["task_timeout"]
+        assert policy.retry_max_delay == config.orchestrator_config["retry_max_delay"]
+
+        overrides = dict(config.orchestrator_config, retry_attempts=0,
+                         task_timeouts={**config.orchestrator_config["task_timeouts"], "work": 0.05})
+        orchestrator = Orchestrator(overrides)
+        orchestrator.register_agent(RecordingAgent("worker", ["work"], delay=1.0))
+        task = make_task("slow")
+        submit(orchestrator, task)
+        started = time.monotonic()
+        await orchestrator.run_until_complete()
+        assert time.monotonic() - started < 0.5
+        assert task.status == TaskStatus.FAILED
+        assert orchestrator.execution_policy.get_statistics()["timeouts_by_task_type"] == {"work": 1}
+
+    asyncio.run(scenario())
+
+
+def main():
+    """主函数"""
+    tests = [(name, func) for name, func in globals().items() if name.startswith("test_") and callable(func)]
+    for name, func in tests:
+        func()
+        print(f"✓ {name}")
+    print(f"\n✅ {len(tests)} orchestrator tests passed")
+
+
+if __name__ == "__main__":
+    main()